@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 from utils.validate import validate_parent
+from .autocomplete import Autocomplete
 
 
 class AddMemberDialog:
@@ -135,17 +135,18 @@ class AddMemberDialog:
                 row=i, column=1, sticky="ew", padx=5, pady=2
             )
 
-        # Set next available ID
-        current_ids = []
-        for member in self.family_tree.members.values():
-            member_id = member.get("id", 0)
-            try:
-                current_ids.append(int(member_id) if member_id else 0)
-            except (ValueError, TypeError):
-                current_ids.append(0)
+        # Suggest parents from the tree's name index as they are typed
+        self.parent_completions = {
+            field: Autocomplete(
+                self.detail_entries[field],
+                self.detail_vars[field],
+                lambda text, field=field: self._suggest_parents(text, field),
+            )
+            for field in ("father", "mother")
+        }
 
-        next_id = max(current_ids, default=0) + 1
-        self.detail_vars["id"].set(str(next_id))
+        # Set next available ID
+        self.detail_vars["id"].set(str(self.family_tree.next_id))
 
         # Extra Information Text Area
         ttk.Label(details_frame, text="Extra Information:", style="Dialog.TLabel").grid(
@@ -247,19 +248,9 @@ class AddMemberDialog:
             values["extra_information"] = extra_info
 
         try:
-            # Add member to family tree
+            # Add member to family tree; its journal persists the change
             self.family_tree.add_member(**values)
 
-            # Update members.json
-            members_data = []
-            for member_id, member in self.family_tree.members.items():
-                member_data = member.copy()
-                member_data["id"] = member.get("id")  # Ensure ID is included
-                members_data.append(member_data)
-
-            with open("./data/members.json", "w") as f:
-                json.dump(members_data, f, indent=4)
-
             # Call callback to refresh member list
             self.callback()
 
@@ -271,3 +262,11 @@ class AddMemberDialog:
 
         except Exception as e:
             messagebox.showerror("Error", str(e))
+
+    def _suggest_parents(self, text, parent):
+        """Suggest plausible fathers or mothers for the typed text"""
+        return self.family_tree.suggest_parents(
+            text,
+            parent,
+            child_age=self.detail_vars["age"].get(),
+        )
@@ -0,0 +1,113 @@
+import tkinter as tk
+
+# Keys that move through or close the suggestions instead of editing text
+NAVIGATION_KEYS = {"Up", "Down", "Return", "Escape", "Tab"}
+
+
+class Autocomplete:
+    """
+    Drop-down of suggestions under an entry, refreshed as the user types.
+
+    Each key press asks ``suggest`` for the values matching the entry's
+    text and shows them in a borderless popup below the entry. Down moves
+    into the list, and Return or a click puts the chosen value in the
+    entry.
+    """
+
+    def __init__(self, entry, variable, suggest, rows=8):
+        """
+        :param entry: Entry widget to complete
+        :param variable: StringVar holding the entry's text
+        :param suggest: Called with the typed text, returns a list of values
+        :param rows: Height of the list of suggestions
+        """
+        self.entry = entry
+        self.variable = variable
+        self.suggest = suggest
+        self.rows = rows
+        self.suggestions = []
+        self.popup = None
+        self.listbox = None
+
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Down>", self._focus_list, add="+")
+        entry.bind("<Escape>", lambda event: self.hide(), add="+")
+        entry.bind("<FocusOut>", self._on_focus_out, add="+")
+
+    def update(self):
+        """Show the suggestions for the entry's current text."""
+        text = self.variable.get().strip()
+        self.suggestions = self.suggest(text) if text else []
+        # Nothing to offer once the text is already a complete suggestion
+        if not self.suggestions or self.suggestions == [text]:
+            self.hide()
+            return
+        self._show()
+
+    def hide(self):
+        """Close the list of suggestions."""
+        if self.popup is not None:
+            self.popup.withdraw()
+
+    def choose(self, index):
+        """
+        Put a suggestion in the entry and close the list.
+
+        :param index: Position of the suggestion in the list
+        """
+        self.variable.set(self.suggestions[index])
+        self.hide()
+        self.entry.focus_set()
+        self.entry.icursor(tk.END)
+
+    def _show(self):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self.entry)
+            self.popup.overrideredirect(True)
+            self.listbox = tk.Listbox(
+                self.popup, height=self.rows, exportselection=False
+            )
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind("<ButtonRelease-1>", self._on_list_choose)
+            self.listbox.bind("<Return>", self._on_list_choose)
+            self.listbox.bind("<Escape>", lambda event: self._close_from_list())
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *self.suggestions)
+        self.listbox.configure(height=min(self.rows, len(self.suggestions)))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.geometry(f"+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def _on_key(self, event):
+        if event.keysym not in NAVIGATION_KEYS:
+            self.update()
+
+    def _focus_list(self, event):
+        if self.popup is None or not self.suggestions:
+            return None
+        self.listbox.focus_set()
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(0)
+        self.listbox.activate(0)
+        return "break"
+
+    def _on_list_choose(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.choose(selection[0])
+        return "break"
+
+    def _close_from_list(self):
+        self.hide()
+        self.entry.focus_set()
+
+    def _on_focus_out(self, event):
+        # Focus moves to the list when a suggestion is clicked, so only
+        # close once it has settled somewhere else
+        self.entry.after_idle(self._hide_unless_focused)
+
+    def _hide_unless_focused(self):
+        if self.listbox is None or self.entry.focus_get() is not self.listbox:
+            self.hide()
@@ -1,8 +1,16 @@
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
+from scripts.attribute_index import FILTER_FIELDS
+from scripts.member import AGES, GENDERS
+from utils.collation import get_collation_key
+from utils.sorted_list import SortedList
 from .add_member_dialog import AddMemberDialog
 from .member_details_frame import MemberDetailsFrame
+from .member_list import VirtualListbox
+
+# Most search results shown in the member list
+SEARCH_LIMIT = 200
 
 
 class FamilyTreeUI:
@@ -40,58 +48,207 @@ class FamilyTreeUI:
         self.main_frame = ttk.Frame(self.root, padding="10", style="TFrame")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
         self.current_member_id = None
-        self.member_ids = []
+        # Rows of (sort key, full name key, name, member id), kept sorted
+        # by last name and by first name so the sort can be toggled
+        # without sorting again; member_rows is the one on screen
+        self.collation_key = get_collation_key()
+        self.rows_by_last_name = SortedList()
+        self.rows_by_first_name = SortedList()
+        self.member_rows = self.rows_by_last_name
+        # member id -> (last name row, first name row), so edits find them
+        self.rows_by_id = {}
+        # Rows for the search or filter results on screen, or None when
+        # the whole list is shown
+        self.result_rows = None
+        self._results_pending = False
         self._create_widgets()
-
-    # [Previous methods remain unchanged: _get_last_name, _get_first_name, _toggle_sort, _populate_member_list]
-    def _get_last_name(self, member):
-        """Extract last name from member data for sorting"""
-        name = member.get("name", "Unknown")
+        self.family_tree.add_listener(self._on_member_change)
+
+        # Save edits on a background thread; results come back through a
+        # queue that the Tk event loop polls
+        self.save_results = queue.Queue()
+        if self.family_tree.journal is not None:
+            self.family_tree.add_listener(self._on_tree_change)
+            self.family_tree.journal.start_worker(on_complete=self.save_results.put)
+            self.root.after(100, self._poll_save_results)
+
+    def _get_last_name(self, name):
+        """Extract last name from a member's name for sorting"""
         name_parts = name.strip().split()
-        return name_parts[-1].lower() if name_parts else ""
+        return self.collation_key(name_parts[-1]) if name_parts else ("", "")
 
-    def _get_first_name(self, member):
-        """Extract first name from member data for sorting"""
-        name = member.get("name", "Unknown")
+    def _get_first_name(self, name):
+        """Extract first name from a member's name for sorting"""
         name_parts = name.strip().split()
-        return name_parts[0].lower() if name_parts else ""
+        return self.collation_key(name_parts[0]) if name_parts else ("", "")
 
     def _toggle_sort(self):
         """Toggle between first and last name sorting"""
         self.sort_by_last_name = not self.sort_by_last_name
-        self._populate_member_list()
+        # Both orderings are kept up to date, so this only switches views
+        if self.sort_by_last_name:
+            self.member_rows = self.rows_by_last_name
+        else:
+            self.member_rows = self.rows_by_first_name
+        if self.result_rows is None:
+            self.member_list.set_rows(self.member_rows)
+            self._show_row(self.current_member_id)
+        else:
+            # Filtered members follow the sort order too
+            self._update_results()
         # Update button text
         sort_text = (
             "Sort by First Name" if self.sort_by_last_name else "Sort by Last Name"
         )
         self.sort_button.configure(text=sort_text)
 
+    def _member_rows(self, member_id, full_name):
+        """Build a member's last name and first name rows"""
+        # Sort by chosen key, then by full name
+        full_name_key = self.collation_key(full_name)
+        return (
+            (self._get_last_name(full_name), full_name_key, full_name, member_id),
+            (self._get_first_name(full_name), full_name_key, full_name, member_id),
+        )
+
     def _populate_member_list(self):
         """Populate the member list sorted by chosen method"""
-        current_selection = self.member_listbox.curselection()
-        self.member_listbox.delete(0, tk.END)
-        self.member_ids = []
-
-        # Create list of members with their sorting information
-        sorted_members = []
-        for member_id, member in self.family_tree.members.items():
-            if self.sort_by_last_name:
-                sort_key = self._get_last_name(member)
+        # Only names are needed, so members are not loaded in full here
+        self.rows_by_id = {
+            member_id: self._member_rows(member_id, full_name)
+            for member_id, full_name in self.family_tree.member_names()
+        }
+        self.rows_by_last_name = SortedList(r[0] for r in self.rows_by_id.values())
+        self.rows_by_first_name = SortedList(r[1] for r in self.rows_by_id.values())
+        if self.sort_by_last_name:
+            self.member_rows = self.rows_by_last_name
+        else:
+            self.member_rows = self.rows_by_first_name
+        self.member_list.set_rows(self.member_rows)
+
+    def _on_member_change(self, event, member_id, old, new):
+        """Move the one row per ordering an add, rename or remove affects"""
+        if self.result_rows is not None and not self._results_pending:
+            # The search and attribute indexes hear about the edit after
+            # this listener, so query them again once they have
+            self._results_pending = True
+            self.root.after_idle(self._update_results)
+        if event == "update" and "name" not in new:
+            return
+        orderings = (self.rows_by_last_name, self.rows_by_first_name)
+        if event != "add":
+            for rows, row in zip(orderings, self.rows_by_id.pop(member_id)):
+                position = rows.remove(row)
+                if rows is self.member_list.rows:
+                    self.member_list.removed(position)
+        if event != "remove":
+            self.rows_by_id[member_id] = self._member_rows(member_id, new["name"])
+            for rows, row in zip(orderings, self.rows_by_id[member_id]):
+                position = rows.add(row)
+                if rows is self.member_list.rows:
+                    self.member_list.inserted(position)
+
+    def _update_results(self, event=None):
+        """Show the members matching the search box and filters, or all"""
+        self._results_pending = False
+        query = self.search_var.get().strip()
+        filters = self._get_filters()
+        if not query and not filters:
+            if self.result_rows is not None:
+                self.result_rows = None
+                self.member_list.set_rows(self.member_rows)
+            return
+        matching = set(self.family_tree.query(**filters)) if filters else None
+        if query:
+            # Best matches first, as (name, member id)
+            self.result_rows = [
+                (self.rows_by_id[member_id][0][2], member_id)
+                for member_id in self.family_tree.search(
+                    query, SEARCH_LIMIT, within=matching
+                )
+            ]
+        else:
+            # Filtered members keep the list's sort order
+            column = 0 if self.sort_by_last_name else 1
+            self.result_rows = sorted(
+                self.rows_by_id[member_id][column] for member_id in matching
+            )
+        self.member_list.top = 0
+        self.member_list.set_rows(self.result_rows)
+
+    def _get_filters(self):
+        """Collect the filter panel's choices as FamilyTree.query() filters"""
+        filters = {
+            field: var.get().strip()
+            for field, var in self.filter_vars.items()
+            if var.get().strip()
+        }
+        if self.cause_of_death_var.get():
+            filters["cause_of_death"] = True
+        return filters
+
+    def _clear_filters(self):
+        """Show every member again"""
+        self.search_var.set("")
+        for var in self.filter_vars.values():
+            var.set("")
+        self.cause_of_death_var.set("")
+        self._update_results()
+
+    def _create_filter_panel(self, parent):
+        """Add the filter panel, whose choices narrow the member list"""
+        filter_frame = ttk.LabelFrame(parent, text="Filters", padding="5")
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+
+        self.filter_vars = {}
+        fields = [field for field in FILTER_FIELDS if field != "cause_of_death"]
+        for row, field in enumerate(fields):
+            ttk.Label(filter_frame, text=field.replace("_", " ").title() + ":").grid(
+                row=row, column=0, sticky="w", padx=5, pady=1
+            )
+            self.filter_vars[field] = tk.StringVar()
+            if field in ("age", "gender"):
+                combobox = ttk.Combobox(
+                    filter_frame,
+                    textvariable=self.filter_vars[field],
+                    values=["", *(AGES if field == "age" else GENDERS)],
+                    state="readonly",
+                    style="TCombobox",
+                )
             else:
-                sort_key = self._get_first_name(member)
-            full_name = member.get("name", "Unknown")
-            sorted_members.append((sort_key, full_name, member_id))
-
-        # Sort by chosen key, then by full name
-        sorted_members.sort(key=lambda x: (x[0], x[1]))
-
-        # Populate the listbox with sorted names
-        for _, full_name, member_id in sorted_members:
-            self.member_listbox.insert(tk.END, full_name)
-            self.member_ids.append(member_id)
-
-        if current_selection:
-            self.member_listbox.selection_set(current_selection)
+                # The values in use are only listed when the list opens, so
+                # the attribute index is not built until filters are used
+                combobox = ttk.Combobox(
+                    filter_frame,
+                    textvariable=self.filter_vars[field],
+                    style="TCombobox",
+                )
+                combobox.configure(
+                    postcommand=lambda box=combobox, field=field: box.configure(
+                        values=["", *self.family_tree.attribute_index.choices(field)]
+                    )
+                )
+                combobox.bind("<Return>", self._update_results)
+            combobox.bind("<<ComboboxSelected>>", self._update_results)
+            combobox.grid(row=row, column=1, sticky="ew", padx=5, pady=1)
+
+        # Causes of death are free text, so they are only filtered on being set
+        self.cause_of_death_var = tk.StringVar()
+        ttk.Checkbutton(
+            filter_frame,
+            text="Has a cause of death",
+            variable=self.cause_of_death_var,
+            onvalue="1",
+            offvalue="",
+            command=self._update_results,
+        ).grid(row=len(fields), column=0, columnspan=2, sticky="w", padx=5)
+        ttk.Button(
+            filter_frame,
+            text="Clear Filters",
+            command=self._clear_filters,
+            style="TButton",
+        ).grid(row=len(fields) + 1, column=0, columnspan=2, pady=(5, 0))
+        filter_frame.grid_columnconfigure(1, weight=1)
 
     def _create_widgets(self):
         # Left frame for member list and sorting controls
@@ -101,9 +258,22 @@ class FamilyTreeUI:
         # Title label for members list
         ttk.Label(left_frame, text="Family Members", font=("Arial", 12, "bold")).pack()
 
-        # Member listbox with purple theme
-        self.member_listbox = tk.Listbox(
-            left_frame,
+        # Search box and filters; while either is in use the list only
+        # shows the matching members
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(left_frame, textvariable=self.search_var)
+        search_entry.pack(fill=tk.X, pady=(0, 5))
+        search_entry.bind("<KeyRelease>", self._update_results)
+        self._create_filter_panel(left_frame)
+
+        # Member listbox with purple theme; only the visible rows are in
+        # the listbox, with its own scrollbar
+        list_frame = ttk.Frame(left_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.member_list = VirtualListbox(
+            list_frame,
+            self.member_rows,
+            on_select=self._on_member_select,
             width=30,
             bg="white",
             fg="black",
@@ -111,14 +281,7 @@ class FamilyTreeUI:
             selectforeground="white",
             font=("Arial", 10),
         )
-        self.member_listbox.pack(fill=tk.BOTH, expand=True)
-
-        # Add scrollbar for member list
-        list_scrollbar = ttk.Scrollbar(
-            left_frame, orient=tk.VERTICAL, command=self.member_listbox.yview
-        )
-        list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.member_listbox.configure(yscrollcommand=list_scrollbar.set)
+        self.member_listbox = self.member_list.listbox
 
         # Add sort toggle button at the bottom
         self.sort_button = ttk.Button(
@@ -129,9 +292,6 @@ class FamilyTreeUI:
         )
         self.sort_button.pack(side=tk.BOTTOM, pady=(5, 0))
 
-        # Bind selection event
-        self.member_listbox.bind("<<ListboxSelect>>", self._on_member_select)
-
         # Populate the member list
         self._populate_member_list()
 
@@ -166,32 +326,71 @@ class FamilyTreeUI:
         )
         remove_button.pack(side=tk.LEFT, padx=5)
 
-    def _on_member_select(self, event):
-        if not self.member_listbox.curselection():
-            return
+        # Background save status
+        self.save_status = ttk.Label(right_frame, text="", style="TLabel")
+        self.save_status.pack(anchor="e")
+
+    def _on_tree_change(self, event, member_id, old, new):
+        """Show that an edit is waiting to be written"""
+        self.save_status.configure(text="Saving...")
+
+    def _poll_save_results(self):
+        """Report finished background saves on the Tk main thread"""
+        while True:
+            try:
+                error = self.save_results.get_nowait()
+            except queue.Empty:
+                break
+            if error is None:
+                self.save_status.configure(text="All changes saved")
+            else:
+                self.save_status.configure(text="Saving failed")
+                messagebox.showerror("Error", f"Failed to save changes: {str(error)}")
+        self.root.after(100, self._poll_save_results)
+
+    def _on_member_select(self, member_id):
         try:
-            selection_index = self.member_listbox.curselection()[0]
-            member_name = self.member_ids[selection_index]
-            member = self.family_tree.members[member_name]
+            member = self.family_tree.get_member(member_id)
             self.details_frame.update_details(member)
-            self.current_member_id = member_name
+            self.current_member_id = member_id
         except Exception as e:
             messagebox.showerror(
                 "Error", f"An error occurred while loading member details: {str(e)}"
             )
 
+    def select_member(self, member_id):
+        """Select a member in the list and show their details"""
+        if self._show_row(member_id):
+            self._on_member_select(member_id)
+
+    def _show_row(self, member_id):
+        """Select a member's row in the list, if they have one"""
+        rows = self.rows_by_id.get(member_id)
+        if rows is None:
+            return False
+        if self.result_rows is not None:
+            for position, row in enumerate(self.result_rows):
+                if row[-1] == member_id:
+                    self.member_list.select(position)
+                    return True
+            # Not among the results, so go back to the whole list
+            self._clear_filters()
+        row = rows[0] if self.sort_by_last_name else rows[1]
+        self.member_list.select(self.member_rows.index(row))
+        return True
+
     def _save_member_changes(self, skip_save_check=False):
         """Save changes to member details"""
         if self.current_member_id is None:
             return
 
-        # If skip_save_check is True, just refresh the member list
+        # If skip_save_check is True, the change is saved already and the
+        # member list follows the tree by itself
         if skip_save_check:
-            self._populate_member_list()
             return
 
         try:
-            member = self.family_tree.members[self.current_member_id]
+            member = self.family_tree.get_member(self.current_member_id)
             updated_values = {}
             changes_description = []
             for key, var in self.details_frame.detail_vars.items():
@@ -234,17 +433,8 @@ class FamilyTreeUI:
             confirm_message += "\n\nDo you want to save these changes?"
 
             if messagebox.askyesno("Confirm Changes", confirm_message):
-                member.update(updated_values)
-                members_data = []
-                for member_id, member in self.family_tree.members.items():
-                    member_data = member.copy()
-                    member_data["id"] = member.get("id")
-                    members_data.append(member_data)
-
-                with open("./data/members.json", "w") as f:
-                    json.dump(members_data, f, indent=4)
-
-                self._populate_member_list()
+                # The tree's journal persists the change
+                self.family_tree.update_member(self.current_member_id, **updated_values)
                 messagebox.showinfo("Success", "Member details updated successfully!")
 
         except Exception as e:
@@ -255,7 +445,7 @@ class FamilyTreeUI:
             messagebox.showinfo("No Selection", "Please select a member to remove.")
             return
 
-        member = self.family_tree.members[self.current_member_id]
+        member = self.family_tree.get_member(self.current_member_id)
         member_name = member.get("name", f"Member {self.current_member_id}")
 
         if not messagebox.askyesno(
@@ -265,20 +455,11 @@ class FamilyTreeUI:
             return
 
         try:
-            # Remove the member
-            del self.family_tree.members[self.current_member_id]
-            members_data = []
-            for member_id, member in self.family_tree.members.items():
-                member_data = member.copy()
-                member_data["id"] = member.get("id")
-                members_data.append(member_data)
-
-            with open("./data/members.json", "w") as f:
-                json.dump(members_data, f, indent=4)
+            # Remove the member along with their parent/child and spouse links
+            self.family_tree.remove_member(self.current_member_id)
 
             self.details_frame.clear_details()
             self.current_member_id = None
-            self._populate_member_list()
             messagebox.showinfo(
                 "Success", f"{member_name} has been removed from the family tree."
             )
@@ -287,7 +468,11 @@ class FamilyTreeUI:
             messagebox.showerror("Error", f"Failed to remove member: {str(e)}")
 
     def _add_member(self):
-        AddMemberDialog(self.root, self.family_tree, self._populate_member_list)
+        AddMemberDialog(self.root, self.family_tree, self.member_list.refresh)
 
     def run(self):
         self.root.mainloop()
+
+        # Fold outstanding journal entries back into members.json on exit
+        if self.family_tree.journal is not None:
+            self.family_tree.journal.close()
@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.validate import validate_parent
-import json
+from .autocomplete import Autocomplete
 
 
 class MemberDetailsFrame:
@@ -20,6 +20,9 @@ class MemberDetailsFrame:
             "father": tk.StringVar(),
             "mother": tk.StringVar(),
         }
+        self.relative_var = tk.StringVar()
+        self.relationship_var = tk.StringVar()
+        self.current_member_id = None
         self._create_widgets(parent)
 
     def _create_widgets(self, parent):
@@ -94,6 +97,16 @@ class MemberDetailsFrame:
                 row=i, column=1, sticky="ew", padx=5, pady=2
             )
 
+        # Suggest parents from the tree's name index as they are typed
+        self.parent_completions = {
+            field: Autocomplete(
+                self.detail_entries[field],
+                self.detail_vars[field],
+                lambda text, field=field: self._suggest_parents(text, field),
+            )
+            for field in ("father", "mother")
+        }
+
         # Extra Information section
         ttk.Label(details_frame, text="Extra Information:", style="TLabel").grid(
             row=len(regular_fields), column=0, sticky="nw", padx=5, pady=2
@@ -131,6 +144,29 @@ class MemberDetailsFrame:
         self.extra_info_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        # Relationship to another member, looked up by name
+        ttk.Label(details_frame, text="Relationship to:", style="TLabel").grid(
+            row=len(regular_fields) + 1, column=0, sticky="w", padx=5, pady=2
+        )
+        relationship_frame = ttk.Frame(details_frame)
+        relationship_frame.grid(
+            row=len(regular_fields) + 1, column=1, sticky="ew", padx=5, pady=2
+        )
+        self.relative_entry = ttk.Entry(
+            relationship_frame, textvariable=self.relative_var, style="TEntry"
+        )
+        self.relative_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.relative_entry.bind("<Return>", lambda event: self.show_relationship())
+        ttk.Button(
+            relationship_frame,
+            text="Show",
+            command=self.show_relationship,
+            style="TButton",
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(
+            details_frame, textvariable=self.relationship_var, style="TLabel"
+        ).grid(row=len(regular_fields) + 2, column=1, sticky="w", padx=5, pady=2)
+
         # Configure grid weights
         details_frame.grid_columnconfigure(1, weight=1)
 
@@ -142,7 +178,7 @@ class MemberDetailsFrame:
             style="TButton",
         )
         self.save_changes_btn.grid(
-            row=len(regular_fields) + 1, column=0, columnspan=2, pady=10
+            row=len(regular_fields) + 3, column=0, columnspan=2, pady=10
         )
 
         # Initially hide the save button
@@ -156,6 +192,7 @@ class MemberDetailsFrame:
 
         # Clear the extra information text widget
         self.extra_info_text.delete("1.0", tk.END)
+        self.relationship_var.set("")
 
         # Hide the save button since there's no member selected
         self.save_changes_btn.grid_remove()
@@ -179,17 +216,37 @@ class MemberDetailsFrame:
 
         self.save_changes_btn.grid()
         self.current_member_id = member.get("id")
+        self.show_relationship()
+
+    def show_relationship(self):
+        """Show how the member named in the relationship entry is related"""
+        self.relationship_var.set("")
+        relative_name = self.relative_var.get().strip()
+        if self.current_member_id is None or not relative_name:
+            return
+
+        member = self.family_tree.get_member(self.current_member_id)
+        relative = self.family_tree.find_member(relative_name)
+        if member is None:
+            return
+        if relative is None:
+            self.relationship_var.set(f"No member named {relative_name}")
+            return
+
+        relationship = self.family_tree.relationship(member["id"], relative["id"])
+        if relative["id"] == member["id"]:
+            text = "Same member"
+        elif relationship is None:
+            text = f"{relative['name']} is not related to {member['name']}"
+        else:
+            text = f"{relative['name']} is {member['name']}'s {relationship}"
+        self.relationship_var.set(text)
 
     def save_changes(self):
         if self.current_member_id is None:
             return
 
-        current_member = None
-        for member in self.family_tree.members.values():
-            if str(member.get("id")) == str(self.current_member_id):
-                current_member = member
-                break
-
+        current_member = self.family_tree.get_member(self.current_member_id)
         if not current_member:
             messagebox.showerror("Error", "Cannot find member to update")
             return
@@ -296,13 +353,9 @@ class MemberDetailsFrame:
             return
 
         try:
-            # Update member
-            current_member.update(updated_values)
-
-            # Save to file
-            members_data = [member for member in self.family_tree.members.values()]
-            with open("./data/members.json", "w") as f:
-                json.dump(members_data, f, indent=4)
+            # Update member through the tree so its indexes stay in sync and
+            # its journal persists the change
+            self.family_tree.update_member(self.current_member_id, **updated_values)
 
             messagebox.showinfo("Success", "Member details updated successfully!")
 
@@ -312,3 +365,12 @@ class MemberDetailsFrame:
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update member details: {str(e)}")
+
+    def _suggest_parents(self, text, parent):
+        """Suggest plausible fathers or mothers for the typed text"""
+        return self.family_tree.suggest_parents(
+            text,
+            parent,
+            child_age=self.detail_vars["age"].get(),
+            exclude=self.current_member_id,
+        )
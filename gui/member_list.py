@@ -0,0 +1,166 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Rows shown before the listbox has been laid out and measured
+DEFAULT_PAGE_SIZE = 50
+
+
+class VirtualListbox:
+    """
+    Listbox that only holds the rows currently on screen.
+
+    Rows come from a sequence supporting len() and slicing, such as a
+    SortedList of ``(sort key, label, member id)`` tuples. The tk.Listbox
+    is given one page of rows starting at ``top``, and the scrollbar is
+    driven by hand, so scrolling and opening the list cost one page
+    whatever the number of rows. Callers report single insertions and
+    removals with inserted() and removed(), which touch at most two
+    listbox rows.
+    """
+
+    def __init__(self, parent, rows, on_select=None, **listbox_options):
+        """
+        :param parent: Tk widget to put the list in
+        :param rows: Sequence of rows, each ending with the member ID and
+            with the text to show second to last
+        :param on_select: Called with the member ID of a selected row
+        :param listbox_options: Options passed on to the tk.Listbox
+        """
+        self.rows = rows
+        self.on_select = on_select
+        self.top = 0
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.selected_id = None
+
+        self.listbox = tk.Listbox(parent, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.listbox.bind("<Up>", lambda event: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self._move_selection(1))
+
+    def set_rows(self, rows):
+        """
+        Show a different sequence of rows, keeping the selected member.
+
+        :param rows: Sequence of rows as for the constructor
+        """
+        self.rows = rows
+        self.refresh()
+
+    def refresh(self):
+        """Fill the listbox with the page of rows starting at ``top``."""
+        self.top = max(0, min(self.top, len(self.rows) - self.page_size))
+        self.listbox.delete(0, tk.END)
+        page = self.rows[self.top : self.top + self.page_size]
+        if page:
+            self.listbox.insert(tk.END, *(row[-2] for row in page))
+        for offset, row in enumerate(page):
+            if row[-1] == self.selected_id:
+                self.listbox.selection_set(offset)
+        self._update_scrollbar()
+
+    def inserted(self, position):
+        """
+        Show a row added to ``rows`` at a position.
+
+        :param position: Index the new row was inserted at
+        """
+        if position < self.top:
+            # Keep the same rows on screen
+            self.top += 1
+        elif position < self.top + self.page_size:
+            self.listbox.insert(position - self.top, self.rows[position][-2])
+            if self.listbox.size() > self.page_size:
+                self.listbox.delete(self.page_size)
+        self._update_scrollbar()
+
+    def removed(self, position):
+        """
+        Stop showing a row removed from ``rows``.
+
+        :param position: Index the row had before it was removed
+        """
+        if position < self.top:
+            self.top -= 1
+        elif position < self.top + self.page_size:
+            self.listbox.delete(position - self.top)
+            last = self.top + self.page_size - 1
+            if last < len(self.rows):
+                self.listbox.insert(tk.END, self.rows[last][-2])
+        self._update_scrollbar()
+
+    def select(self, position):
+        """
+        Select the row at a position and scroll it into view.
+
+        :param position: Index of the row in ``rows``
+        """
+        self.selected_id = self.rows[position][-1]
+        if not self.top <= position < self.top + self.page_size:
+            self.top = position - self.page_size // 2
+            self.refresh()
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(position - self.top)
+        self.listbox.see(position - self.top)
+
+    def yview(self, *args):
+        """Scroll in response to the scrollbar, like tk.Listbox.yview."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+            self.refresh()
+        elif args[0] == "scroll":
+            count = int(args[1])
+            if args[2] == "pages":
+                count *= self.page_size
+            self._scroll_by(count)
+
+    def _scroll_by(self, count):
+        self.top += count
+        self.refresh()
+        return "break"
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.page_size:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.page_size) / total)
+
+    def _on_configure(self, event):
+        """Size the page to the rows that fit in the listbox."""
+        first, second = self.listbox.bbox(0), self.listbox.bbox(1)
+        if first and second and second[1] > first[1]:
+            page_size = max(1, event.height // (second[1] - first[1]))
+            if page_size != self.page_size:
+                self.page_size = page_size
+                self.refresh()
+
+    def _on_wheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _move_selection(self, step):
+        """Move the selection with the arrow keys across page boundaries."""
+        selection = self.listbox.curselection()
+        if not selection:
+            return "break"
+        position = self.top + selection[0] + step
+        if 0 <= position < len(self.rows):
+            self.select(position)
+            self._on_listbox_select(None)
+        return "break"
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        row = self.rows[self.top + selection[0]]
+        self.selected_id = row[-1]
+        if self.on_select is not None:
+            self.on_select(row[-1])
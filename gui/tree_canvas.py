@@ -0,0 +1,570 @@
+import tkinter as tk
+from bisect import bisect_left, insort
+from itertools import islice
+from tkinter import ttk
+
+# Sizes in layout coordinates, before zooming
+NODE_WIDTH = 120
+NODE_HEIGHT = 36
+COLUMN_WIDTH = 140
+ROW_HEIGHT = 100
+
+# Names are left out below this zoom, where they would not fit in the boxes
+LABEL_SCALE = 0.5
+MIN_SCALE = 0.1
+MAX_SCALE = 4.0
+
+# Fields that decide where members go, and fields only drawn on their node
+LAYOUT_FIELDS = ("name", "father", "mother", "spouses")
+DRAWN_FIELDS = ("name", "gender")
+
+
+class SpatialIndex:
+    """
+    Uniform grid of bounding boxes for viewport queries and hit-testing.
+
+    Each item is listed in every grid cell its box touches, so a query only
+    looks at the cells under the queried area. Long thin items such as
+    lines can be listed under the cells of a few points instead, so they
+    do not fill every cell their box spans.
+    """
+
+    def __init__(self, cell_size=512):
+        """
+        :param cell_size: Width and height of a grid cell
+        """
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> {item: None}
+        self.boxes = {}  # item -> (x0, y0, x1, y1)
+        self.points = {}  # item -> points it is listed under, if not its box
+
+    def insert(self, item, box, points=None):
+        """
+        Add an item.
+
+        :param item: Hashable item to return from queries
+        :param box: Bounding box as (x0, y0, x1, y1)
+        :param points: Points whose cells list the item instead of every
+            cell its box touches; queries then only find the item when
+            they cover one of those cells
+        """
+        self.boxes[item] = box
+        if points is not None:
+            self.points[item] = points
+        for cell in self._item_cells(item):
+            self.cells.setdefault(cell, {})[item] = None
+
+    def remove(self, item):
+        """
+        Remove an item.
+
+        :param item: Item added with insert()
+        """
+        for cell in self._item_cells(item):
+            items = self.cells[cell]
+            del items[item]
+            if not items:
+                del self.cells[cell]
+        del self.boxes[item]
+        self.points.pop(item, None)
+
+    def query(self, box):
+        """
+        Find the items whose boxes overlap an area.
+
+        :param box: Area as (x0, y0, x1, y1)
+        :return: Set of items
+        """
+        x0, y0, x1, y1 = box
+        found = set()
+        for cell in self._cells(box):
+            for item in self.cells.get(cell, ()):
+                ix0, iy0, ix1, iy1 = self.boxes[item]
+                if ix0 <= x1 and x0 <= ix1 and iy0 <= y1 and y0 <= iy1:
+                    found.add(item)
+        return found
+
+    def hit(self, x, y):
+        """
+        Find the items whose boxes contain a point.
+
+        :return: Set of items
+        """
+        return self.query((x, y, x, y))
+
+    def _item_cells(self, item):
+        """Return the grid cells listing an item."""
+        points = self.points.get(item)
+        if points is None:
+            return list(self._cells(self.boxes[item]))
+        size = self.cell_size
+        return list(dict.fromkeys((int(x // size), int(y // size)) for x, y in points))
+
+    def _cells(self, box):
+        """Yield the grid cells a box touches."""
+        x0, y0, x1, y1 = (int(value // self.cell_size) for value in box)
+        for column in range(x0, x1 + 1):
+            for row in range(y0, y1 + 1):
+                yield column, row
+
+
+class TreeLayout:
+    """
+    Positions of every member, one row per generation.
+
+    Members are placed left to right in their generation, each child as
+    close as possible to the middle of their parents and spouses next to
+    each other among the founders. The layout is computed once, in
+    O(N log N), and node and edge boxes go into SpatialIndex grids; edges
+    are listed under the cells of their two ends. After edits, update()
+    moves only the members whose parents changed and their descendants,
+    into the free places nearest where they belong, and leaves everyone
+    else where they were.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to lay out
+        """
+        self.family_tree = family_tree
+        ancestry = family_tree.ancestry
+        self.positions = {}  # member id -> center (x, y)
+        self.rows = {}  # y -> sorted list of the x of each member in the row
+        self.parents = {}  # member id -> parent ids as laid out
+        self.children = {}  # member id -> {child id: None} as laid out
+        self.nodes = SpatialIndex()
+        self.edges = SpatialIndex()  # (parent id, child id) items
+
+        for depth in sorted(ancestry.generations):
+            members = ancestry.generations[depth]
+            if depth == 0:
+                order = self._founder_order(family_tree, members)
+            else:
+                order = sorted(members, key=lambda i: (self._middle(ancestry, i), i))
+
+            x = None
+            for member_id in order:
+                wanted = self._middle(ancestry, member_id)
+                if x is None:
+                    x = wanted
+                else:
+                    x = max(wanted, x + COLUMN_WIDTH)
+                self._add(ancestry, member_id, x, depth * ROW_HEIGHT)
+
+    def update(self, member_ids, regrouped=()):
+        """
+        Move members after edits that may have changed who their parents are.
+
+        :param member_ids: IDs of members added, removed or edited; they
+            and the members naming them as parents are checked
+        :param regrouped: IDs of founders whose spouses changed, moved next
+            to them even if their parents did not change
+        :return: Set of the node and edge items that moved or went away
+        """
+        ancestry = self.family_tree.ancestry
+        candidates = {}
+        for member_id in member_ids:
+            candidates[member_id] = None
+            candidates.update(self.children.get(member_id, {}))
+            candidates.update(ancestry.children.get(member_id, {}))
+        roots = [
+            i
+            for i in candidates
+            if (i in regrouped and ancestry.depths.get(i) == 0)
+            or self._is_stale(ancestry, i)
+        ]
+
+        # Children are placed relative to their parents, so the whole
+        # subtree below a moved member moves with them
+        subtree = {}
+        while roots:
+            member_id = roots.pop()
+            if member_id not in subtree:
+                subtree[member_id] = None
+                roots.extend(self.children.get(member_id, ()))
+                roots.extend(ancestry.children.get(member_id, ()))
+
+        moved = set()
+        for member_id in subtree:
+            moved |= self._remove(member_id)
+        present = [i for i in subtree if i in ancestry.depths]
+        for member_id in sorted(present, key=lambda i: (ancestry.depths[i], i)):
+            depth = ancestry.depths[member_id]
+            x = self._free_place(depth * ROW_HEIGHT, self._wanted(ancestry, member_id))
+            self._add(ancestry, member_id, x, depth * ROW_HEIGHT)
+        return moved
+
+    def _is_stale(self, ancestry, member_id):
+        """Check whether a member's place no longer matches the tree."""
+        if member_id not in ancestry.depths:
+            return member_id in self.positions
+        if member_id not in self.positions:
+            return True
+        return (
+            self.parents[member_id] != ancestry.parents.get(member_id, ())
+            or self.positions[member_id][1] != ancestry.depths[member_id] * ROW_HEIGHT
+        )
+
+    def _wanted(self, ancestry, member_id):
+        """Return where a member being moved would ideally go."""
+        if ancestry.parents.get(member_id):
+            return self._middle(ancestry, member_id)
+        # Founders go next to a spouse, or else at the end of the row
+        for spouse_id in self.family_tree.get_spouses(member_id):
+            x, y = self.positions.get(spouse_id, (None, None))
+            if y == 0:
+                return x + COLUMN_WIDTH
+        row = self.rows.get(0)
+        return row[-1] + COLUMN_WIDTH if row else 0
+
+    def _free_place(self, y, wanted):
+        """Return the x nearest ``wanted`` with room for a node in a row."""
+        row = self.rows.get(y, [])
+        index = bisect_left(row, wanted)
+
+        right = wanted
+        if index:
+            right = max(right, row[index - 1] + COLUMN_WIDTH)
+        for x in islice(row, index, None):
+            if x - right >= COLUMN_WIDTH:
+                break
+            right = max(right, x + COLUMN_WIDTH)
+
+        left = wanted
+        if index < len(row):
+            left = min(left, row[index] - COLUMN_WIDTH)
+        for i in range(index - 1, -1, -1):
+            if left - row[i] >= COLUMN_WIDTH:
+                break
+            left = min(left, row[i] - COLUMN_WIDTH)
+
+        return right if right - wanted <= wanted - left else left
+
+    def _add(self, ancestry, member_id, x, y):
+        """Put a member, their node and the edges to their parents in place."""
+        self.positions[member_id] = (x, y)
+        insort(self.rows.setdefault(y, []), x)
+        self.nodes.insert(
+            member_id,
+            (
+                x - NODE_WIDTH / 2,
+                y - NODE_HEIGHT / 2,
+                x + NODE_WIDTH / 2,
+                y + NODE_HEIGHT / 2,
+            ),
+        )
+        parents = ancestry.parents.get(member_id, ())
+        self.parents[member_id] = parents
+        for parent_id in parents:
+            self.children.setdefault(parent_id, {})[member_id] = None
+            px, py = self.positions[parent_id]
+            self.edges.insert(
+                (parent_id, member_id),
+                (min(px, x), py, max(px, x), y),
+                points=((px, py), (x, y)),
+            )
+
+    def _remove(self, member_id):
+        """
+        Take a member, their node and the edges to their parents out.
+
+        :return: Set of the items removed
+        """
+        if member_id not in self.positions:
+            return set()
+        x, y = self.positions.pop(member_id)
+        row = self.rows[y]
+        del row[bisect_left(row, x)]
+        if not row:
+            del self.rows[y]
+        self.nodes.remove(member_id)
+
+        removed = {member_id}
+        for parent_id in self.parents.pop(member_id):
+            self.edges.remove((parent_id, member_id))
+            removed.add((parent_id, member_id))
+            children = self.children[parent_id]
+            del children[member_id]
+            if not children:
+                del self.children[parent_id]
+        return removed
+
+    def _middle(self, ancestry, member_id):
+        """Return the average x of a member's placed parents, or 0."""
+        xs = [
+            self.positions[parent_id][0]
+            for parent_id in ancestry.parents.get(member_id, ())
+            if parent_id in self.positions
+        ]
+        return sum(xs) / len(xs) if xs else 0
+
+    @staticmethod
+    def _founder_order(family_tree, members):
+        """Order members without parents, spouses side by side."""
+        order = {}
+        for member_id in sorted(members):
+            if member_id in order:
+                continue
+            order[member_id] = None
+            for spouse_id in family_tree.get_spouses(member_id):
+                if spouse_id in members:
+                    order.setdefault(spouse_id, None)
+        return list(order)
+
+
+class TreeCanvas:
+    """
+    Pan-and-zoom view of the whole tree drawn on a tk.Canvas.
+
+    Only the nodes and edges overlapping the visible area are kept on the
+    canvas; panning moves the drawn items and then adds and deletes the
+    ones crossing the edges of the view, so the work per frame follows
+    what is on screen rather than the size of the tree. Edges are found
+    by their ends, so one is drawn while either end is near the view.
+    Edits move only the members whose place changed, and only redraw
+    those and the nodes whose name or gender changed. Drag to pan, use
+    the mouse wheel to zoom and click a member to select them.
+    """
+
+    def __init__(self, parent, family_tree, on_select=None):
+        """
+        :param parent: Tk widget to put the canvas in
+        :param family_tree: FamilyTree to show; the view registers itself as
+            a listener and updates the layout after changes
+        :param on_select: Called with the ID of a member clicked on
+        """
+        self.family_tree = family_tree
+        self.on_select = on_select
+        self.layout = None
+        self.scale = 1.0
+        self.origin = (-COLUMN_WIDTH, -ROW_HEIGHT)  # layout point at top left
+        self.drawn = {}  # member id or (parent id, child id) -> canvas items
+        self.labels_shown = True
+        self.selected_id = None
+        self.drag_start = None
+        self.dragged = False
+        self.redraw_pending = False
+        # Edits waiting for the next redraw
+        self.changed = {}  # member ids whose links may have changed
+        self.regrouped = {}  # member ids whose spouses changed
+        self.restyled = {}  # member ids whose nodes look different
+
+        self.canvas = tk.Canvas(parent, bg="white", highlightthickness=0)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(1.2, event.x, event.y))
+        self.canvas.bind(
+            "<Button-5>", lambda event: self.zoom(1 / 1.2, event.x, event.y)
+        )
+
+        family_tree.add_listener(self._on_change)
+
+    def redraw(self):
+        """Draw the items that came into view and delete those that left."""
+        self.redraw_pending = False
+        self._update_layout()
+
+        box = self.visible_box()
+        visible = self.layout.nodes.query(box) | self.layout.edges.query(box)
+        for item in [item for item in self.drawn if item not in visible]:
+            self.canvas.delete(*self.drawn.pop(item))
+        for item in visible:
+            if item not in self.drawn:
+                self.drawn[item] = self._draw(item)
+        self.canvas.tag_lower("edge")
+
+    def visible_box(self):
+        """Return the layout area on screen as (x0, y0, x1, y1)."""
+        x0, y0 = self.origin
+        width = self.canvas.winfo_width() / self.scale
+        height = self.canvas.winfo_height() / self.scale
+        return x0, y0, x0 + width, y0 + height
+
+    def pan(self, dx, dy):
+        """
+        Move the view.
+
+        :param dx: Pixels to move the tree right
+        :param dy: Pixels to move the tree down
+        """
+        x0, y0 = self.origin
+        self.origin = (x0 - dx / self.scale, y0 - dy / self.scale)
+        self.canvas.move("all", dx, dy)
+        self.redraw()
+
+    def zoom(self, factor, x, y):
+        """
+        Zoom in or out, keeping the point under the cursor in place.
+
+        :param factor: Zoom factor, above 1 to zoom in
+        :param x: Canvas x coordinate to zoom around
+        :param y: Canvas y coordinate to zoom around
+        """
+        scale = min(max(self.scale * factor, MIN_SCALE), MAX_SCALE)
+        factor = scale / self.scale
+        if factor == 1:
+            return
+        x0, y0 = self.origin
+        self.origin = (
+            x0 + x / self.scale - x / scale,
+            y0 + y / self.scale - y / scale,
+        )
+        self.scale = scale
+
+        if (scale >= LABEL_SCALE) != self.labels_shown:
+            # Labels appear or disappear, so every node is drawn again
+            self.labels_shown = scale >= LABEL_SCALE
+            self._clear()
+        else:
+            self.canvas.scale("all", x, y, factor, factor)
+        self.redraw()
+
+    def center_on(self, member_id):
+        """
+        Scroll a member to the middle of the view and highlight them.
+
+        :param member_id: ID of the member
+        """
+        self._update_layout()
+        if member_id not in self.layout.positions:
+            return
+        self._set_selected(member_id)
+        x, y = self.layout.positions[member_id]
+        x0, y0, x1, y1 = self.visible_box()
+        self.pan(((x0 + x1) / 2 - x) * self.scale, ((y0 + y1) / 2 - y) * self.scale)
+
+    def _update_layout(self):
+        """Lay the tree out, or apply the edits made since the last redraw."""
+        if self.layout is None:
+            self.layout = TreeLayout(self.family_tree)
+        elif self.changed or self.restyled:
+            moved = self.layout.update(self.changed, self.regrouped)
+            for item in moved.union(self.restyled):
+                if item in self.drawn:
+                    self.canvas.delete(*self.drawn.pop(item))
+        self.changed.clear()
+        self.regrouped.clear()
+        self.restyled.clear()
+
+    def _to_canvas(self, x, y):
+        """Convert layout coordinates to canvas coordinates."""
+        x0, y0 = self.origin
+        return (x - x0) * self.scale, (y - y0) * self.scale
+
+    def _draw(self, item):
+        """Create the canvas items for a node or an edge."""
+        if isinstance(item, tuple):
+            parent_id, child_id = item
+            px, py = self._to_canvas(*self.layout.positions[parent_id])
+            cx, cy = self._to_canvas(*self.layout.positions[child_id])
+            offset = NODE_HEIGHT / 2 * self.scale
+            return [
+                self.canvas.create_line(
+                    px, py + offset, cx, cy - offset, fill="gray", tags=("edge",)
+                )
+            ]
+
+        member = self.family_tree.get_member(item)
+        # Same colors as the Graphviz view
+        color = {"female": "pink", "male": "lightblue"}.get(
+            (member.get("gender") or "").lower(), "lightgray"
+        )
+        x, y = self._to_canvas(*self.layout.positions[item])
+        half_width = NODE_WIDTH / 2 * self.scale
+        half_height = NODE_HEIGHT / 2 * self.scale
+        items = [
+            self.canvas.create_rectangle(
+                x - half_width,
+                y - half_height,
+                x + half_width,
+                y + half_height,
+                fill=color,
+                outline="#6a0dad" if item == self.selected_id else "black",
+                width=3 if item == self.selected_id else 1,
+                tags=("node", f"member{item}"),
+            )
+        ]
+        if self.labels_shown:
+            items.append(
+                self.canvas.create_text(
+                    x, y, text=member["name"], width=NODE_WIDTH * self.scale
+                )
+            )
+        return items
+
+    def _clear(self):
+        """Delete everything drawn."""
+        self.canvas.delete("all")
+        self.drawn.clear()
+
+    def _set_selected(self, member_id):
+        """Highlight a member, removing the highlight from the last one."""
+        if self.selected_id is not None:
+            self.canvas.itemconfigure(
+                f"member{self.selected_id}", outline="black", width=1
+            )
+        self.selected_id = member_id
+        self.canvas.itemconfigure(f"member{member_id}", outline="#6a0dad", width=3)
+
+    def _on_change(self, event, member_id, old, new):
+        """Note an edit, to be laid out once the current batch is done."""
+        if self.layout is None:
+            return
+        if event != "update":
+            self.changed[member_id] = None
+        else:
+            if new.keys().isdisjoint(LAYOUT_FIELDS + DRAWN_FIELDS):
+                return
+            if not new.keys().isdisjoint(LAYOUT_FIELDS):
+                self.changed[member_id] = None
+            if "spouses" in new:
+                self.regrouped[member_id] = None
+            if not new.keys().isdisjoint(DRAWN_FIELDS):
+                self.restyled[member_id] = None
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.canvas.after_idle(self.redraw)
+
+    def _on_press(self, event):
+        self.drag_start = (event.x, event.y)
+        self.dragged = False
+
+    def _on_drag(self, event):
+        if self.drag_start is None:
+            return
+        x, y = self.drag_start
+        self.drag_start = (event.x, event.y)
+        self.dragged = True
+        self.pan(event.x - x, event.y - y)
+
+    def _on_release(self, event):
+        """Select the member under the cursor, unless the view was dragged."""
+        self.drag_start = None
+        if self.dragged or self.layout is None:
+            return
+        x0, y0 = self.origin
+        hits = self.layout.nodes.hit(
+            x0 + event.x / self.scale, y0 + event.y / self.scale
+        )
+        if hits:
+            member_id = min(hits)
+            self._set_selected(member_id)
+            if self.on_select is not None:
+                self.on_select(member_id)
+
+    def _on_wheel(self, event):
+        self.zoom(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
+
+
+def add_tree_canvas_to_ui(family_tree_ui):
+    frame = ttk.LabelFrame(family_tree_ui.main_frame, text="Tree", padding="5")
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    tree_canvas = TreeCanvas(
+        frame, family_tree_ui.family_tree, on_select=family_tree_ui.select_member
+    )
+    tree_canvas.canvas.pack(fill=tk.BOTH, expand=True)
+    return tree_canvas
@@ -1,68 +1,588 @@
+import collections
+import hashlib
+import os
+import queue
+import subprocess
+import tempfile
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 import graphviz
+from scripts.households import GROUPING_FIELDS, Households
 
 
-class FamilyTreeVisualization:
+# Defaults for drawing only the members around the selected one
+FOCUS_GENERATIONS = 2
+FOCUS_LIMIT = 150
+# Most households drawn in the household view before the rest are summed up
+HOUSEHOLD_LIMIT = 300
+
+
+def _show_render_error(error):
+    messagebox.showerror(
+        "Error",
+        f"Failed to create visualization: {str(error)}\n\nPlease make sure Graphviz is installed on your system.",
+    )
+
+
+class RenderCache:
+    """
+    Cached DOT source and rendered output for one family tree.
+
+    Each member's node and parent edges are kept as a DOT fragment, made
+    the first time the member is drawn. The cache listens to the tree and
+    drops the fragments of the edited member and of the children whose
+    parent links the edit may change, so only those are re-emitted. The
+    rendered file is keyed by a hash of the DOT source, so an unchanged
+    tree is shown again without running Graphviz.
+    """
+
     def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to draw; the cache registers itself
+            as a listener
+        """
         self.family_tree = family_tree
-        self._create_visualization()
+        # member id -> (node lines, [(parent id or None, edge line)])
+        self.fragments = {}
+        self._households = None
+        self.source_digest = None
+        self.rendered = None  # (source digest, path of the rendered file)
+
+        family_tree.add_listener(self._on_change)
+
+    def build_graph(self, member_ids=None):
+        """
+        Build the Graphviz graph of the tree from the cached fragments.
+
+        :param member_ids: IDs of the members to draw, None for everyone;
+            edges to parents outside the selection are left out
+        :return: graphviz.Digraph
+        """
+        if member_ids is None:
+            member_ids = list(self.family_tree.members)
+            selected = None
+        else:
+            selected = set(member_ids)
+
+        body = []
+        for member_id in member_ids:
+            node, edges = self._fragment(member_id)
+            body.extend(node)
+            body.extend(
+                line
+                for parent_id, line in edges
+                if selected is None or parent_id in selected
+            )
 
-    def _create_visualization(self):
         # Create a new directed graph
+        dot = graphviz.Digraph(comment="Family Tree", body=body)
+        dot.attr(rankdir="TB")  # Top to bottom direction
+
+        # Keep each generation on its own row
+        depths = self.family_tree.ancestry.depths
+        generations = {}
+        for member_id in member_ids:
+            generations.setdefault(depths.get(member_id), []).append(member_id)
+        for depth in sorted(generations):
+            with dot.subgraph() as generation:
+                generation.attr(rank="same")
+                for member_id in sorted(generations[depth]):
+                    generation.node(str(member_id))
+
+        self.source_digest = hashlib.sha256(dot.source.encode()).hexdigest()
+        return dot
+
+    @property
+    def households(self):
+        """Households of the tree, grouped again after edits that regroup them."""
+        if self._households is None:
+            self._households = Households(self.family_tree)
+        return self._households
+
+    def build_household_graph(self, expanded=(), limit=HOUSEHOLD_LIMIT):
+        """
+        Build a Graphviz graph of households instead of members.
+
+        Collapsed households are drawn as one summary node, and nothing
+        below them is drawn. Expanded households show their parents and
+        children, and lead on to the households those children head.
+        Drawing starts from the oldest households, so how much is laid out
+        depends on what has been expanded rather than on the size of the
+        tree. Members with no parents, children or spouses are left out.
+
+        :param expanded: Keys of the households to draw member by member
+        :param limit: Most households to draw; the rest are summed up in one
+            node
+        :return: graphviz.Digraph
+        """
+        households = self.households
+        expanded = set(expanded)
+
         dot = graphviz.Digraph(comment="Family Tree")
         dot.attr(rankdir="TB")  # Top to bottom direction
+        shown = set()  # IDs of members drawn as their own node
 
-        # Add all members as nodes
-        for name, member in self.family_tree.members.items():
-            # Create label with name and age if available
-            label_parts = [name]
-            if member.get("age"):
-                label_parts.append(f"Age: {member['age']}")
-
-            # Set node color based on gender
-            color = "lightgray"  # default color
-            if member.get("gender"):
-                if member["gender"].lower() == "female":
-                    color = "pink"
-                elif member["gender"].lower() == "male":
-                    color = "lightblue"
-
-            # Add node
+        def show_member(member_id):
+            if member_id not in shown:
+                shown.add(member_id)
+                dot.body.extend(self._fragment(member_id)[0])
+
+        summaries = {}  # summary node name -> household key
+        queue = collections.deque(households.roots())
+        seen = set(queue)
+        drawn = 0
+        while queue and drawn < limit:
+            key = queue.popleft()
+            drawn += 1
+            children = households.children[key]
+            child_keys = households.child_households(key)
+
+            if key in expanded:
+                for member_id in (*key, *children):
+                    show_member(member_id)
+                for child_id in children:
+                    for parent_id in key:
+                        dot.edge(str(parent_id), str(child_id))
+                for child_key in child_keys:
+                    if child_key not in seen:
+                        seen.add(child_key)
+                        queue.append(child_key)
+                continue
+
+            node = "household" + "-".join(map(str, key))
+            names = [self.family_tree.get_member(i)["name"] for i in key]
+            label_parts = [" & ".join(names), f"{len(children)} children"]
+            if child_keys:
+                label_parts.append(f"{len(child_keys)} households below")
             dot.node(
-                name,  # Use name as node identifier
+                node,
                 "\n".join(label_parts),
                 style="filled",
-                fillcolor=color,
-                shape="box",
+                fillcolor="#f0e6ff",
+                shape="folder",
             )
+            summaries[node] = key
+
+        # Link summaries to the parents drawn in expanded households
+        for node, key in summaries.items():
+            for parent_id in key:
+                if parent_id in shown:
+                    dot.edge(str(parent_id), node)
+
+        if queue:
+            dot.node("more", f"{len(queue)} more households", shape="plaintext")
+
+        self.source_digest = hashlib.sha256(dot.source.encode()).hexdigest()
+        return dot
+
+    def render(self, filename="family_tree", member_ids=None, dot=None):
+        """
+        Render the tree and open the result in the system viewer.
+
+        :param filename: Path of the rendered file, without the extension
+        :param member_ids: IDs of the members to draw, None for everyone
+        :param dot: Graph built by this cache already, such as a household
+            graph, to render instead of building one from ``member_ids``
+        :return: Path of the rendered file
+        """
+        if dot is None:
+            dot = self.build_graph(member_ids)
+        path = self.cached_output()
+        if path is not None:
+            graphviz.view(path)
+            return path
+
+        path = dot.render(filename, view=True, cleanup=True)
+        self.rendered = (self.source_digest, path)
+        return path
+
+    def cached_output(self):
+        """
+        Get the rendered file for the graph built last, if there is one.
+
+        :return: Path of the file, or None if the source has not been
+            rendered yet
+        """
+        # An unchanged tree, or edits that cancel out, give the same source
+        if self.rendered is not None and self.rendered[0] == self.source_digest:
+            if os.path.exists(self.rendered[1]):
+                return self.rendered[1]
+        return None
+
+    def close(self):
+        """Stop following changes to the tree."""
+        self.family_tree.remove_listener(self._on_change)
+
+    def _on_change(self, event, member_id, old, new):
+        """Drop the fragments an add, update or remove may have changed."""
+        if event != "update" or not new.keys().isdisjoint(GROUPING_FIELDS):
+            self._households = None
+        self.fragments.pop(member_id, None)
+        # Children link to their parents by name
+        names = []
+        if event == "add":
+            names.append(new["name"])
+        elif event == "remove":
+            names.append(old["name"])
+        elif "name" in new:
+            names.extend((old["name"], new["name"]))
+        for name in names:
+            for child_id in self.family_tree.get_children_by_name(name):
+                self.fragments.pop(child_id, None)
+
+    def _fragment(self, member_id):
+        """Return the DOT lines for a member's node and parent edges."""
+        if member_id in self.fragments:
+            return self.fragments[member_id]
+
+        member = self.family_tree.get_member(member_id)
+        dot = graphviz.Digraph()
+
+        # Create label with name and age if available
+        label_parts = [member["name"]]
+        if member.get("age"):
+            label_parts.append(f"Age: {member['age']}")
+
+        # Set node color based on gender
+        color = "lightgray"  # default color
+        if member.get("gender"):
+            if member["gender"].lower() == "female":
+                color = "pink"
+            elif member["gender"].lower() == "male":
+                color = "lightblue"
+
+        # Add node, keyed by ID since names are not unique
+        dot.node(
+            str(member_id),
+            "\n".join(label_parts),
+            style="filled",
+            fillcolor=color,
+            shape="box",
+        )
+        node = list(dot.body)
 
         # Add parent-child relationships
-        for name, member in self.family_tree.members.items():
-            # Handle father relationship
-            if member.get("father"):
-                dot.edge(member["father"], name)
+        edges = []
+        for field in ("father", "mother"):
+            if not member.get(field):
+                continue
+            # Parents missing from the tree are drawn by name
+            parent = self.family_tree.find_member(member[field])
+            parent_id = parent["id"] if parent else None
+            dot.body.clear()
+            dot.edge(
+                member[field] if parent is None else str(parent_id), str(member_id)
+            )
+            edges.append((parent_id, dot.body[0]))
+
+        self.fragments[member_id] = (node, edges)
+        return self.fragments[member_id]
+
 
-            # Handle mother relationship
-            if member.get("mother"):
-                dot.edge(member["mother"], name)
+class RenderJob(threading.Thread):
+    """
+    Background thread running one Graphviz ``dot`` process.
 
-        # Render the graph
+    The process writes to a temporary file of its own, next to ``path``,
+    that replaces ``path`` only once the render has finished, so a
+    cancelled render never leaves a half-written file behind. The job
+    puts itself and None, or the exception that made the render fail, on
+    ``results`` when it is done.
+    """
+
+    def __init__(self, source, digest, path, results, engine="dot"):
+        """
+        :param source: DOT source to render
+        :param digest: Hash of the source, identifying repeated requests
+        :param path: Path of the rendered PDF file
+        :param results: Queue to report the outcome on
+        :param engine: Graphviz layout command
+        """
+        super().__init__(name="RenderJob", daemon=True)
+        self.source = source
+        self.digest = digest
+        self.path = path
+        self.results = results
+        self.engine = engine
+        self.cancelled = False
+        self.process = None
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        """Stop the render, killing ``dot`` if it is already running."""
+        with self.lock:
+            self.cancelled = True
+            if self.process is not None:
+                self.process.kill()
+
+    def run(self):
+        partial = None
         try:
-            dot.render("family_tree", view=True, cleanup=True)
-        except Exception as e:
-            messagebox.showerror(
-                "Error",
-                f"Failed to create visualization: {str(e)}\n\nPlease make sure Graphviz is installed on your system.",
+            # A file of its own, so a cancelled job cleaning up cannot
+            # remove the output of the job that replaced it
+            fd, partial = tempfile.mkstemp(
+                suffix=".part",
+                prefix=f"{os.path.basename(self.path)}.",
+                dir=os.path.dirname(os.path.abspath(self.path)),
             )
+            os.close(fd)
+            with self.lock:
+                if self.cancelled:
+                    return
+                self.process = subprocess.Popen(
+                    [self.engine, "-Tpdf", "-o", partial],
+                    stdin=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            _, stderr = self.process.communicate(self.source.encode())
+            if self.cancelled:
+                return
+            if self.process.returncode:
+                raise RuntimeError(stderr.decode(errors="replace").strip())
+            os.replace(partial, self.path)
+            self.results.put((self, None))
+        except Exception as e:
+            self.results.put((self, e))
+        finally:
+            if partial is not None and os.path.exists(partial):
+                os.remove(partial)
+
+
+class BackgroundRenderer:
+    """
+    Renders trees on a RenderJob thread so the Tk event loop keeps running.
+
+    The DOT source is built on the main thread, where the tree is edited,
+    and only the Graphviz layout runs in the background. At most one
+    ``dot`` process runs at a time: asking again for the graph being
+    rendered is ignored, and asking for a different one cancels the
+    current render. Results are picked up with ``root.after`` polling and
+    the rendered file is opened on the main thread.
+    """
+
+    def __init__(self, root, cache, on_busy=None, poll_interval=100):
+        """
+        :param root: Tk root used to schedule polling
+        :param cache: RenderCache building the graphs and remembering the
+            rendered files
+        :param on_busy: Called with True when a render starts and False
+            when it finishes, fails or is cancelled
+        :param poll_interval: Milliseconds between checks for results
+        """
+        self.root = root
+        self.cache = cache
+        self.on_busy = on_busy
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.job = None
+
+    def render(self, member_ids=None, filename="family_tree", dot=None):
+        """
+        Start rendering, or open the file at once if it is already rendered.
+
+        :param member_ids: IDs of the members to draw, None for everyone
+        :param filename: Path of the rendered file, without the extension
+        :param dot: Graph built by the cache already, such as a household
+            graph, to render instead of building one from ``member_ids``
+        :return: The RenderJob started, or None if no new render was needed
+        """
+        if dot is None:
+            dot = self.cache.build_graph(member_ids)
+        path = self.cache.cached_output()
+        if path is not None:
+            graphviz.view(path)
+            return None
+
+        digest = self.cache.source_digest
+        if self.job is not None:
+            if self.job.digest == digest:
+                return None
+            self.job.cancel()
+        else:
+            self._set_busy(True)
+            self.root.after(self.poll_interval, self._poll)
+
+        self.job = RenderJob(dot.source, digest, f"{filename}.pdf", self.results)
+        self.job.start()
+        return self.job
+
+    def cancel(self):
+        """Cancel the render in progress, if any."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+            self._set_busy(False)
+
+    def _set_busy(self, busy):
+        if self.on_busy is not None:
+            self.on_busy(busy)
+
+    def _poll(self):
+        """Open finished renders on the Tk main thread."""
+        while True:
+            try:
+                job, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # Results of cancelled or replaced renders are dropped
+            if job is not self.job:
+                continue
+            self.job = None
+            self._set_busy(False)
+            if error is None:
+                self.cache.rendered = (job.digest, job.path)
+                graphviz.view(job.path)
+            else:
+                _show_render_error(error)
+        if self.job is not None:
+            self.root.after(self.poll_interval, self._poll)
+
+
+class FamilyTreeVisualization:
+    def __init__(
+        self,
+        family_tree,
+        cache=None,
+        focus_id=None,
+        generations=FOCUS_GENERATIONS,
+        limit=FOCUS_LIMIT,
+        renderer=None,
+        expanded=None,
+    ):
+        """
+        :param family_tree: FamilyTree to draw
+        :param cache: RenderCache to reuse between visualizations; a
+            throwaway one is made when not given, and closed by close()
+        :param focus_id: ID of a member to draw only the neighborhood of,
+            None to draw the whole tree
+        :param generations: How many generations above and below the
+            focused member to draw
+        :param limit: Most members to draw around the focused member
+        :param renderer: BackgroundRenderer to render with; without one the
+            graph is rendered before returning
+        :param expanded: Keys of the households to show member by member;
+            when given, households are drawn instead of members
+        """
+        self.family_tree = family_tree
+        self.renderer = renderer
+        if renderer is not None:
+            cache = renderer.cache
+        # A cache made here listens to the tree until the visualization closes
+        self.owns_cache = cache is None
+        self.cache = cache or RenderCache(family_tree)
+        self.expanded = expanded
+        self.member_ids = None
+        if focus_id is not None:
+            self.member_ids = family_tree.neighborhood(focus_id, generations, limit)
+        self._create_visualization()
+
+    def build_graph(self):
+        """Build the Graphviz graph of the members or households being drawn"""
+        if self.expanded is not None:
+            return self.cache.build_household_graph(self.expanded)
+        return self.cache.build_graph(self.member_ids)
+
+    def close(self):
+        """Stop the cache following the tree, if this visualization made it."""
+        if self.owns_cache:
+            self.cache.close()
+
+    def _create_visualization(self):
+        if self.renderer is not None:
+            self.renderer.render(dot=self.build_graph())
+            return
+
+        # Render the graph; nothing is drawn from it again afterwards
+        try:
+            self.cache.render("family_tree", dot=self.build_graph())
+        except Exception as e:
+            _show_render_error(e)
+        finally:
+            self.close()
 
 
 def add_visualization_to_ui(family_tree_ui):
+    buttons_frame = family_tree_ui.buttons_frame
+    generations = tk.IntVar(value=FOCUS_GENERATIONS)
+
+    # Shown only while Graphviz is running
+    progress = ttk.Progressbar(buttons_frame, mode="indeterminate", length=80)
+    cancel_button = ttk.Button(buttons_frame, text="Cancel")
+
+    def show_progress(busy):
+        if busy:
+            progress.pack(side=tk.LEFT, padx=5)
+            cancel_button.pack(side=tk.LEFT)
+            progress.start()
+        else:
+            progress.stop()
+            progress.pack_forget()
+            cancel_button.pack_forget()
+
+    renderer = BackgroundRenderer(
+        family_tree_ui.root,
+        RenderCache(family_tree_ui.family_tree),
+        on_busy=show_progress,
+    )
+    cancel_button.configure(command=renderer.cancel)
+    # Households shown member by member in the household view
+    expanded = set()
+
     def show_visualization():
-        FamilyTreeVisualization(family_tree_ui.family_tree)
+        FamilyTreeVisualization(family_tree_ui.family_tree, renderer=renderer)
+
+    def show_neighborhood():
+        if family_tree_ui.current_member_id is None:
+            messagebox.showinfo("Show Relatives", "Select a member first.")
+            return
+        FamilyTreeVisualization(
+            family_tree_ui.family_tree,
+            focus_id=family_tree_ui.current_member_id,
+            generations=generations.get(),
+            renderer=renderer,
+        )
+
+    def show_households():
+        # Each selected member opens up the households leading to them
+        if family_tree_ui.current_member_id is not None:
+            expanded.update(
+                renderer.cache.households.around(family_tree_ui.current_member_id)
+            )
+        FamilyTreeVisualization(
+            family_tree_ui.family_tree, renderer=renderer, expanded=expanded
+        )
+
+    def collapse_households():
+        expanded.clear()
 
     ttk.Button(
-        family_tree_ui.buttons_frame,
+        buttons_frame,
         text="Show Family Tree",
         command=show_visualization,
     ).pack(side=tk.LEFT, padx=5)
+
+    ttk.Button(
+        buttons_frame,
+        text="Show Relatives",
+        command=show_neighborhood,
+    ).pack(side=tk.LEFT, padx=5)
+    ttk.Label(buttons_frame, text="Generations:").pack(side=tk.LEFT)
+    ttk.Spinbox(
+        buttons_frame,
+        from_=1,
+        to=10,
+        width=3,
+        textvariable=generations,
+    ).pack(side=tk.LEFT)
+
+    ttk.Button(
+        buttons_frame,
+        text="Show Households",
+        command=show_households,
+    ).pack(side=tk.LEFT, padx=5)
+    ttk.Button(
+        buttons_frame,
+        text="Collapse",
+        command=collapse_households,
+    ).pack(side=tk.LEFT)
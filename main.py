@@ -1,12 +1,26 @@
+import locale
+import os
+
 from scripts.family_tree import create_family_tree
 from gui.main_window import FamilyTreeUI
+from gui.tree_canvas import add_tree_canvas_to_ui
 from gui.tree_visualizer import add_visualization_to_ui
 
 
 def main():
-    family = create_family_tree("./data/members.json")
+    # Sort names the way the user's language expects
+    try:
+        locale.setlocale(locale.LC_COLLATE, "")
+    except locale.Error:
+        pass
+    # Prefer the binary snapshot, which opens without parsing the whole tree
+    members_file = "./data/members.snap"
+    if not os.path.exists(members_file):
+        members_file = "./data/members.json"
+    family = create_family_tree(members_file, use_journal=True)
     app = FamilyTreeUI(family)
     add_visualization_to_ui(app)
+    add_tree_canvas_to_ui(app)
     app.run()
 
 
@@ -0,0 +1,331 @@
+# Number of interval labels per member; each is built from a depth-first
+# traversal that visits children in a different order
+TRAVERSALS = 2
+
+
+class AncestryIndex:
+    """
+    Reachability labels answering ancestor and descendant queries.
+
+    Each member gets a few intervals, one per depth-first traversal over
+    children, running from the lowest post-order rank among the member's
+    descendants to the member's own rank. An ancestor's intervals contain
+    those of all its descendants, so an interval sticking out proves that
+    one member is not an ancestor of another. Labels take constant space
+    per member. When every interval fits, is_ancestor() searches upwards
+    through parents whose intervals also fit and who are deeper than the
+    possible ancestor, so it only walks the part of the tree between the
+    two members. Parent names are resolved to IDs the way
+    FamilyTree.find_member() does, taking the member with that name who has
+    the lowest ID.
+
+    Each member's generation depth is kept alongside the labels, and
+    members are bucketed by depth, which gives a topological order.
+
+    The labels are built once and then kept up to date from the tree's
+    change notifications. A new parent link widens the intervals of the
+    parent and of those of its ancestors that do not already contain the
+    child's, which keeps them correct but looser; the labels are rebuilt
+    once the widening done since the last build adds up to the size of the
+    tree. An edit that changes who someone's parents are only recomputes
+    the depths of that member and their descendants.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to index; the index registers itself
+            as a listener
+        """
+        self.family_tree = family_tree
+        self.order = {}  # member id -> position in indexing order
+        self.parents = {}  # member id -> tuple of parent ids
+        self.children = {}  # member id -> {child id: None}
+        self.intervals = {}  # member id -> (low, high) for each traversal
+        self.depths = {}  # member id -> generation depth
+        self.generations = {}  # depth -> {member id: None}
+        self._indexed = 0  # members indexed so far
+        self._next_rank = 0  # first rank not used by any interval
+        self._widened = 0  # intervals widened since the last build
+
+        links = list(family_tree.member_fields("father", "mother"))
+        for member_id, _ in links:
+            self.order[member_id] = self._indexed
+            self._indexed += 1
+        for member_id, fields in links:
+            self._set_parents(member_id, fields)
+        self._build_intervals()
+        self._set_depths(self.order)
+
+        family_tree.add_listener(self._on_change)
+
+    def is_ancestor(self, ancestor_id, member_id):
+        """
+        Check whether one member is an ancestor of another.
+
+        :param ancestor_id: ID of the possible ancestor
+        :param member_id: ID of the possible descendant
+        :return: True if ``ancestor_id`` is a parent, grandparent, ... of
+            ``member_id``
+        """
+        if ancestor_id not in self.order or member_id not in self.order:
+            return False
+        depth = self.depths[ancestor_id]
+        outer = self.intervals[ancestor_id]
+        if self.depths[member_id] <= depth or not self._within(member_id, outer):
+            return False
+
+        stack = [member_id]
+        seen = {member_id}
+        while stack:
+            for parent_id in self.parents.get(stack.pop(), ()):
+                if parent_id == ancestor_id:
+                    return True
+                if (
+                    parent_id not in seen
+                    and self.depths[parent_id] > depth
+                    and self._within(parent_id, outer)
+                ):
+                    seen.add(parent_id)
+                    stack.append(parent_id)
+        return False
+
+    def ancestors(self, member_id):
+        """
+        Get every ancestor of a member.
+
+        :param member_id: ID of the member
+        :return: List of ancestor IDs, in the order the members were indexed
+        """
+        seen = set()
+        stack = [member_id]
+        while stack:
+            for parent_id in self.parents.get(stack.pop(), ()):
+                if parent_id not in seen:
+                    seen.add(parent_id)
+                    stack.append(parent_id)
+        seen.discard(member_id)
+        return sorted(seen, key=self.order.__getitem__)
+
+    def descendants(self, member_id):
+        """
+        Get every descendant of a member.
+
+        :param member_id: ID of the member
+        :return: List of descendant IDs, children first, then grandchildren
+            and so on
+        """
+        seen = {member_id}
+        descendants = []
+        level = [member_id]
+        while level:
+            next_level = []
+            for parent_id in level:
+                for child_id in self.children.get(parent_id, ()):
+                    if child_id not in seen:
+                        seen.add(child_id)
+                        descendants.append(child_id)
+                        next_level.append(child_id)
+            level = next_level
+        return descendants
+
+    def topological_order(self):
+        """
+        Get every member ordered so that parents come before their children.
+
+        :return: List of member IDs, generation by generation
+        """
+        return [
+            member_id
+            for depth in sorted(self.generations)
+            for member_id in self.generations[depth]
+        ]
+
+    def close(self):
+        """Stop following changes to the tree."""
+        self.family_tree.remove_listener(self._on_change)
+
+    def _on_change(self, event, member_id, old, new):
+        """Update the labels after an add, update or remove."""
+        family_tree = self.family_tree
+        # Members whose parents may now resolve to different IDs
+        affected = {}
+        if event == "add":
+            self.order[member_id] = self._indexed
+            self._indexed += 1
+            affected[member_id] = None
+            affected.update(
+                dict.fromkeys(family_tree.get_children_by_name(new["name"]))
+            )
+        elif event == "update":
+            if "father" in new or "mother" in new:
+                affected[member_id] = None
+            if "name" in new:
+                for name in (old["name"], new["name"]):
+                    affected.update(
+                        dict.fromkeys(family_tree.get_children_by_name(name))
+                    )
+        elif event == "remove":
+            affected.update(self.children.get(member_id, {}))
+            affected.update(
+                dict.fromkeys(family_tree.get_children_by_name(old["name"]))
+            )
+            self._set_parents(member_id, None)
+            self._set_depth(member_id, None)
+            del self.order[member_id]
+            del self.intervals[member_id]
+
+        for child_id in affected:
+            self._set_parents(child_id, family_tree.get_member(child_id))
+        if event == "remove":
+            self.children.pop(member_id, None)
+        elif event == "add":
+            # Start inside the first parent's intervals, so only the other
+            # parent's side of the family needs widening
+            parents = self.parents[member_id]
+            if parents:
+                high = [high for _, high in self.intervals[parents[0]]]
+            else:
+                high = [self._next_rank] * TRAVERSALS
+                self._next_rank += 1
+            self.intervals[member_id] = tuple((rank, rank) for rank in high)
+
+        for child_id in affected:
+            for parent_id in self.parents.get(child_id, ()):
+                self._widen(parent_id, self.intervals[child_id])
+        if self._widened > len(self.order):
+            self._build_intervals()
+        self._set_depths(affected)
+
+    def _build_intervals(self):
+        """Label every member from scratch, one traversal at a time."""
+        roots = [i for i in self.order if not self.parents.get(i)]
+        labels = {member_id: [] for member_id in self.order}
+        rank = 0
+        for traversal in range(TRAVERSALS):
+            # Alternate the direction children are visited in, so members
+            # ranked apart by one traversal are often separated by another
+            ordered = list if traversal % 2 == 0 else reversed
+            visited = set()
+            lows = {}
+            # Members in a parent cycle have no root above them
+            for root in [*ordered(roots), *self.order]:
+                if root in visited:
+                    continue
+                visited.add(root)
+                stack = [(root, iter(ordered(list(self.children.get(root, ())))))]
+                while stack:
+                    member_id, children = stack[-1]
+                    for child_id in children:
+                        if child_id not in visited:
+                            visited.add(child_id)
+                            grandchildren = ordered(
+                                list(self.children.get(child_id, ()))
+                            )
+                            stack.append((child_id, iter(grandchildren)))
+                            break
+                    else:
+                        stack.pop()
+                        low = min(
+                            (
+                                lows[c]
+                                for c in self.children.get(member_id, ())
+                                if c in lows
+                            ),
+                            default=rank,
+                        )
+                        lows[member_id] = low
+                        labels[member_id].append((low, rank))
+                        rank += 1
+            rank += 1
+        self.intervals = {
+            member_id: tuple(label) for member_id, label in labels.items()
+        }
+        self._next_rank = rank
+        self._widened = 0
+
+    def _within(self, member_id, outer):
+        """Check whether a member's intervals all lie inside ``outer``."""
+        return all(
+            low <= inner_low and inner_high <= high
+            for (inner_low, inner_high), (low, high) in zip(
+                self.intervals[member_id], outer
+            )
+        )
+
+    def _widen(self, member_id, inner):
+        """Stretch a member's and their ancestors' intervals over ``inner``."""
+        stack = [member_id]
+        while stack:
+            member_id = stack.pop()
+            current = self.intervals[member_id]
+            widened = tuple(
+                (min(low, inner_low), max(high, inner_high))
+                for (low, high), (inner_low, inner_high) in zip(current, inner)
+            )
+            if widened != current:
+                self.intervals[member_id] = widened
+                self._widened += 1
+                stack.extend(self.parents.get(member_id, ()))
+
+    def _set_depth(self, member_id, depth):
+        """Move a member to another generation bucket, or out with None."""
+        old = self.depths.pop(member_id, None)
+        if old is not None:
+            bucket = self.generations[old]
+            del bucket[member_id]
+            if not bucket:
+                del self.generations[old]
+        if depth is not None:
+            self.depths[member_id] = depth
+            self.generations.setdefault(depth, {})[member_id] = None
+
+    def _resolve(self, name):
+        """Return the ID of the member a name refers to, or None."""
+        if not name:
+            return None
+        ids = self.family_tree._ids_by_name(name)
+        return ids[0] if ids else None
+
+    def _set_parents(self, member_id, member):
+        """Resolve a member's father and mother and record the links."""
+        for parent_id in self.parents.pop(member_id, ()):
+            self.children[parent_id].pop(member_id, None)
+        if member is None:
+            return
+
+        parents = [self._resolve(member["father"]), self._resolve(member["mother"])]
+        parents = tuple(
+            dict.fromkeys(p for p in parents if p is not None and p != member_id)
+        )
+        self.parents[member_id] = parents
+        for parent_id in parents:
+            self.children.setdefault(parent_id, {})[member_id] = None
+
+    def _set_depths(self, roots):
+        """Recompute the depths of ``roots`` and all of their descendants."""
+        # Depth-first search over children; reversed post-order puts every
+        # member after all of its affected parents
+        order = []
+        visited = set()
+        for root in roots:
+            if root in visited or root not in self.order:
+                continue
+            visited.add(root)
+            stack = [(root, iter(self.children.get(root, ())))]
+            while stack:
+                member_id, children = stack[-1]
+                for child_id in children:
+                    if child_id not in visited:
+                        visited.add(child_id)
+                        stack.append((child_id, iter(self.children.get(child_id, ()))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(member_id)
+
+        for member_id in reversed(order):
+            depth = 0
+            for parent_id in self.parents.get(member_id, ()):
+                depth = max(depth, self.depths.get(parent_id, 0) + 1)
+            if self.depths.get(member_id) != depth:
+                self._set_depth(member_id, depth)
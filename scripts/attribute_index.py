@@ -0,0 +1,122 @@
+from scripts.member import AGE_LOOKUP, GENDER_LOOKUP
+
+# Fields members can be filtered on
+FILTER_FIELDS = (
+    "age",
+    "gender",
+    "location",
+    "occupation",
+    "aspiration",
+    "cause_of_death",
+)
+
+
+class AttributeIndex:
+    """
+    Secondary indexes from field values to the members that have them.
+
+    Each filterable field maps every value (ignoring case) to the IDs of
+    the members with that value, and keeps the IDs of every member with
+    the field set at all. Conjunctive queries look up one ID set per
+    condition and walk the smallest one, keeping the IDs found in all the
+    others, so a query costs about the size of its most selective
+    condition. The index follows the tree's change notifications.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to index; the index registers itself
+            as a listener
+        """
+        self.family_tree = family_tree
+        self.values = {field: {} for field in FILTER_FIELDS}  # value -> ids
+        self.has_value = {field: {} for field in FILTER_FIELDS}  # ids
+
+        for member_id, fields in family_tree.member_fields(*FILTER_FIELDS):
+            for field, value in fields.items():
+                self._add(field, value, member_id)
+
+        family_tree.add_listener(self._on_change)
+
+    def query(self, **filters):
+        """
+        Find the members matching every filter.
+
+        :param filters: Field names mapped to the value to match, ignoring
+            case, or to True for members with any value in that field
+        :return: List of member IDs in ascending order
+        :raises ValueError: If a filter names a field that cannot be filtered
+        """
+        sets = []
+        for field, value in filters.items():
+            if field not in self.values:
+                raise ValueError(
+                    f"Cannot filter on {field}; choose from {', '.join(FILTER_FIELDS)}"
+                )
+            if value is True:
+                sets.append(self.has_value[field])
+            else:
+                sets.append(self.values[field].get(self._key(field, value), {}))
+        if not sets:
+            return sorted(self.family_tree.members)
+
+        # Start from the most selective condition
+        sets.sort(key=len)
+        smallest, others = sets[0], sets[1:]
+        return sorted(
+            member_id
+            for member_id in smallest
+            if all(member_id in ids for ids in others)
+        )
+
+    def choices(self, field):
+        """
+        Get the values a field currently has, for offering as filters.
+
+        :param field: Name of a filterable field
+        :return: Sorted list of values, as written on the first member with
+            each one
+        """
+        members = self.family_tree.members
+        return sorted(
+            (members[next(iter(ids))][field] for ids in self.values[field].values()),
+            key=str.casefold,
+        )
+
+    def close(self):
+        """Stop following changes to the tree."""
+        self.family_tree.remove_listener(self._on_change)
+
+    def _on_change(self, event, member_id, old, new):
+        """Move a member between values after an add, update or remove."""
+        for field in FILTER_FIELDS:
+            if event != "add" and field in old:
+                self._remove(field, old[field], member_id)
+            if event != "remove" and field in new:
+                self._add(field, new[field], member_id)
+
+    @staticmethod
+    def _key(field, value):
+        """Return the index key for a value, matching its stored form."""
+        if field == "age":
+            return AGE_LOOKUP.get(value.casefold(), value)
+        if field == "gender":
+            return GENDER_LOOKUP.get(value.casefold(), value)
+        return value.casefold()
+
+    def _add(self, field, value, member_id):
+        if not value:
+            return
+        key = self._key(field, value)
+        self.values[field].setdefault(key, {})[member_id] = None
+        self.has_value[field][member_id] = None
+
+    def _remove(self, field, value, member_id):
+        if not value:
+            return
+        key = self._key(field, value)
+        ids = self.values[field][key]
+        del ids[member_id]
+        if not ids:
+            del self.values[field][key]
+        del self.has_value[field][member_id]
@@ -1,13 +1,112 @@
+import codecs
+import json
+from collections import deque
+from typing import NamedTuple
+
+from scripts.ancestry import AncestryIndex
+from scripts.attribute_index import AttributeIndex
+from scripts.journal import MemberJournal
+from scripts.member import AGE_LOOKUP, AGES, GENDER_LOOKUP, GENDERS, Member
+from scripts.persistence import write_json_atomic
+from scripts.relationships import describe_relationship
+from scripts.search import SearchIndex
+from scripts.trigrams import TrigramIndex
+
+# Fields that decide who a member's parents and children are
+LINK_FIELDS = ("name", "father", "mother")
+# Gender a father or mother cannot have
+IMPLAUSIBLE_PARENT_GENDERS = {"father": "Female", "mother": "Male"}
+# Youngest age at which a member can be a parent
+YOUNGEST_PARENT_AGE = AGES.index("Young Adult")
+
+
+class MemberError(NamedTuple):
+    """A problem with one record passed to FamilyTree.add_members."""
+
+    row: int
+    field: str
+    reason: str
+    # False when the member was added with the offending field cleared
+    skipped: bool = True
+
+
 class FamilyTree:
     def __init__(self):
         """
         Initialize an empty family tree.
         The tree will be stored as a dictionary of people,
-        with names as the keys.
+        with integer IDs as the keys.
         """
         self.members = {}
         self.member_ids = []
 
+        # Next ID handed out by allocate_id; always above every stored ID
+        self.next_id = 1
+
+        # Case-insensitive lookup of members by name. Names are not unique,
+        # so each entry holds every matching ID; a name refers to the member
+        # with the lowest ID, so it resolves the same way after a reload.
+        # Values are dicts used as sets.
+        self.name_index = {}  # casefolded name -> {member id: None}
+
+        # Reverse relationship indexes, kept in sync on every add/update/remove
+        # so children and spouses can be found without scanning all members.
+        # Relationships are stored by name, so these are keyed by casefolded
+        # name and resolve forward references once the named member is added.
+        self.children_index = {}  # parent name -> {child id: None}
+        self.spouse_index = {}  # name -> {ids listing them as a spouse: None}
+
+        # Callbacks told about every add/update/remove, see add_listener
+        self.listeners = []
+
+        # Change journal persisting edits, set by MemberJournal.attach
+        self.journal = None
+
+        # Ancestry labels, built on the first ancestry query
+        self._ancestry = None
+        # Full-text index, built on the first search
+        self._search_index = None
+        # Name trigrams, built on the first parent suggestion
+        self._trigram_index = None
+        # Field value indexes, built on the first filtered query
+        self._attribute_index = None
+
+    def add_listener(self, callback):
+        """
+        Register a callback to be told about every change to the tree.
+
+        The callback is called as ``callback(event, member_id, old, new)``
+        where ``event`` is "add", "update" or "remove". ``old`` and ``new``
+        are dictionaries of field values: the full record on add (``new``)
+        and remove (``old``), and only the changed fields on update.
+
+        :param callback: Function to call after each change
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """
+        Stop telling a callback about changes to the tree.
+
+        :param callback: Function previously passed to add_listener
+        """
+        self.listeners.remove(callback)
+
+    def _notify(self, event, member_id, old, new):
+        """Tell every listener about a change."""
+        for callback in self.listeners:
+            callback(event, member_id, old, new)
+
+    def allocate_id(self):
+        """
+        Reserve the next free member ID.
+
+        :return: An integer ID not used by any member
+        """
+        member_id = self.next_id
+        self.next_id += 1
+        return member_id
+
     def add_member(
         self,
         name=None,
@@ -27,78 +126,827 @@ class FamilyTree:
         Add a new member to the family tree.
 
         :param name: Full name of the person (required)
-        :param id: Unique identifier for the person (optional)
+        :param id: Unique identifier for the person (optional, allocated if missing)
         :param age: Age of the person as integer (optional)
         ...
+        :return: The member's ID
         """
-        if not name:
-            raise ValueError("Name is required")
+        if name and (father or mother or self.get_children_by_name(name)):
+            # Refused outright here, where add_members would clear the link
+            record = {"name": name, "father": father, "mother": mother}
+            field = self._find_cycle(id, record, renamed=True)
+            if field is not None:
+                raise ValueError(
+                    f"{field.capitalize()} would make {name} their own ancestor"
+                )
+
+        added, errors = self.add_members(
+            [
+                {
+                    "id": id,
+                    "name": name,
+                    "age": age,
+                    "gender": gender,
+                    "location": location,
+                    "occupation": occupation,
+                    "aspiration": aspiration,
+                    "cause_of_death": cause_of_death,
+                    "extra_information": extra_information,
+                    "father": father,
+                    "mother": mother,
+                    "spouses": spouses,
+                }
+            ]
+        )
+        if errors:
+            raise ValueError(errors[0].reason)
+
+        return added[0]
+
+    def add_members(self, records):
+        """
+        Add many members in one step, validating the whole batch first.
+
+        Records use the same keys as add_member's parameters; other keys are
+        ignored. Invalid records are skipped and reported rather than raised,
+        and IDs are only allocated once every explicit ID in the batch is known.
+
+        :param records: Iterable of member dictionaries
+        :return: Tuple of (list of added member IDs, list of MemberError)
+        """
+        valid = []
+        errors = []
+        batch_ids = set()
+        for row, record in enumerate(records):
+            member = self._validate_record(row, record, batch_ids, errors)
+            if member is not None:
+                valid.append((row, member))
+
+        if self._ancestry is not None:
+            # The ancestry index is kept up to date, so each record can be
+            # checked against it as it goes in
+            added = []
+            for row, member in valid:
+                while field := self._find_cycle(member.id, member, renamed=True):
+                    errors.append(self._cycle_error(row, member, field))
+                    member[field] = None
+                self._insert(member)
+                added.append(member.id)
+                if self.listeners:
+                    self._notify("add", member.id, None, member.to_dict())
+            return added, errors
+
+        # Building the ancestry index partway through a bulk load would
+        # relabel whole subtrees for every later record, so the batch goes
+        # in first and is checked for cycles in one pass
+        for _, member in valid:
+            self._insert(member)
+        for row, member, field in self._batch_cycles(valid):
+            errors.append(self._cycle_error(row, member, field))
+            # Only the parent's entry moves, so the member keeps their place
+            # among members sharing their name
+            old_keys = self._index_keys(member)
+            member[field] = None
+            self._relink(member.id, old_keys, self._index_keys(member))
+            self.members[member.id] = member
+        if self.listeners:
+            for _, member in valid:
+                self._notify("add", member.id, None, member.to_dict())
+        return [member.id for _, member in valid], errors
+
+    def _insert(self, member):
+        """Store a validated member, allocating its ID if it has none."""
+        if member.id is None:
+            member.id = self.allocate_id()
+        self.members[member.id] = member
+        self._link(member.id, member)
+
+    @staticmethod
+    def _cycle_error(row, member, field):
+        """Report a parent link cleared because it closed a cycle."""
+        reason = (
+            f"{field.capitalize()} would make {member.name} their own ancestor; "
+            "the link was removed"
+        )
+        return MemberError(row, field, reason, skipped=False)
+
+    def _batch_cycles(self, batch):
+        """
+        Find the parent links in a newly inserted batch that close a cycle.
+
+        The tree had no cycles before the batch, so every cycle passes
+        through a batch member, and its members are both ancestors and
+        descendants of the batch. Ancestors and descendants are walked
+        together until either walk runs out, and only that smaller region
+        is searched, so a batch of children or of founders costs about its
+        own size. Within the region, members whose ancestry stays cyclic
+        after repeatedly removing those without parents in the region are
+        the only ones checked, one link at a time in batch order, so a
+        record only loses a link that closes a loop with earlier records.
+
+        :param batch: List of (row, Member) pairs already in the tree; the
+            members only need their ID, name, father and mother
+        :return: List of (row, Member, field) for the links to clear
+        """
+        batch_ids = [member.id for _, member in batch]
+        batch_members = {member.id: member for _, member in batch}
+        parents = {}
+
+        def member_of(member_id):
+            # Batch members are at hand, whatever the store reads them from
+            member = batch_members.get(member_id)
+            return member if member is not None else self.members[member_id]
+
+        def parents_of(member_id):
+            if member_id not in parents:
+                member = member_of(member_id)
+                ids = (self._ids_by_name(member[f] or "") for f in ("father", "mother"))
+                parents[member_id] = [i[0] for i in ids if i]
+            return parents[member_id]
+
+        def children_of(member_id):
+            name = member_of(member_id)["name"]
+            if self._ids_by_name(name)[0] != member_id:
+                # Only the member with the lowest ID is anyone's parent
+                return []
+            return self.get_children_by_name(name)
+
+        up, down = deque(batch_ids), deque(batch_ids)
+        above, below = set(batch_ids), set(batch_ids)
+        while up and down:
+            for relative_id in parents_of(up.popleft()):
+                if relative_id not in above:
+                    above.add(relative_id)
+                    up.append(relative_id)
+            for relative_id in children_of(down.popleft()):
+                if relative_id not in below:
+                    below.add(relative_id)
+                    down.append(relative_id)
+        # The walk that ran out has found every member it can reach
+        region = above if down else below
+
+        # Peel off members whose parents in the region are all peeled off
+        waiting = {}
+        children = {}
+        for member_id in region:
+            in_region = [p for p in parents_of(member_id) if p in region]
+            waiting[member_id] = len(in_region)
+            for parent_id in in_region:
+                children.setdefault(parent_id, []).append(member_id)
+        ready = [member_id for member_id, count in waiting.items() if not count]
+        while ready:
+            member_id = ready.pop()
+            del waiting[member_id]
+            for child_id in children.get(member_id, ()):
+                waiting[child_id] -= 1
+                if not waiting[child_id]:
+                    ready.append(child_id)
+        if not waiting:
+            return []
+
+        # Members left over sit on or below a cycle. Links are added back
+        # in batch order, skipping any that would close a loop
+        cyclic = waiting
+        batch_set = set(batch_ids)
+        links = {
+            member_id: [p for p in parents_of(member_id) if p in cyclic]
+            for member_id in cyclic
+            if member_id not in batch_set
+        }
+
+        def reaches(start, target):
+            stack, seen = [start], {start}
+            while stack:
+                member_id = stack.pop()
+                if member_id == target:
+                    return True
+                for parent_id in links.get(member_id, ()):
+                    if parent_id not in seen:
+                        seen.add(parent_id)
+                        stack.append(parent_id)
+            return False
+
+        cuts = []
+        for row, member in batch:
+            if member.id not in cyclic:
+                continue
+            links[member.id] = []
+            for field in ("father", "mother"):
+                ids = self._ids_by_name(member[field] or "")
+                if not ids or ids[0] not in cyclic:
+                    continue
+                if reaches(ids[0], member.id):
+                    cuts.append((row, member, field))
+                else:
+                    links[member.id].append(ids[0])
+        return cuts
+
+    def _validate_record(self, row, record, batch_ids, errors):
+        """
+        Check one add_members record against the precompiled lookup tables.
 
-        # Validate and convert gender to title case if provided
-        valid_genders = ["Male", "Female", "Alien", "Other"]
+        :return: Member record, or None after appending a MemberError
+        """
+        if not record.get("name"):
+            errors.append(MemberError(row, "name", "Name is required"))
+            return None
+
+        member_id = record.get("id")
+        if member_id is None or member_id == "":
+            member_id = None
+        else:
+            try:
+                member_id = int(member_id)
+            except (TypeError, ValueError):
+                errors.append(
+                    MemberError(row, "id", f"ID must be an integer, got: {member_id!r}")
+                )
+                return None
+            if member_id in self.members or member_id in batch_ids:
+                errors.append(
+                    MemberError(
+                        row, "id", f"A member with ID {member_id} already exists"
+                    )
+                )
+                return None
+
+        # Validate gender and age, normalizing them to title case
+        gender = record.get("gender")
         if gender:
-            gender = gender.title()
-            if gender not in valid_genders:
-                raise ValueError(f"Gender must be one of: {', '.join(valid_genders)}")
-
-        # Validate age as a string
-        valid_ages = [
-            "Infant",
-            "Toddler",
-            "Child",
-            "Teen",
-            "Young Adult",
-            "Adult",
-            "Elder",
-        ]
+            gender = (
+                GENDER_LOOKUP.get(gender.casefold())
+                if isinstance(gender, str)
+                else None
+            )
+            if gender is None:
+                errors.append(
+                    MemberError(
+                        row, "gender", f"Gender must be one of: {', '.join(GENDERS)}"
+                    )
+                )
+                return None
+
+        age = record.get("age")
         if age:
-            age = age.title()
-            if age not in valid_ages:
-                raise ValueError(f"Age must be one of: {', '.join(valid_ages)}")
-
-        # Create member dictionary
-        member = {
-            "id": id,  # Include ID in member dictionary
-            "name": name,
-            "age": age,
-            "gender": gender,
-            "location": location,
-            "occupation": occupation,
-            "aspiration": aspiration,
-            "cause_of_death": cause_of_death,
-            "extra_information": extra_information,
-            "father": father,
-            "mother": mother,
-            "spouses": [spouse for spouse in (spouses or []) if spouse is not None],
-        }
+            age = AGE_LOOKUP.get(age.casefold()) if isinstance(age, str) else None
+            if age is None:
+                errors.append(
+                    MemberError(row, "age", f"Age must be one of: {', '.join(AGES)}")
+                )
+                return None
+
+        if member_id is not None:
+            batch_ids.add(member_id)
+            self.next_id = max(self.next_id, member_id + 1)
+
+        spouses = record.get("spouses")
+        return Member(
+            id=member_id,
+            name=record["name"],
+            age=age,
+            gender=gender,
+            location=record.get("location"),
+            occupation=record.get("occupation"),
+            aspiration=record.get("aspiration"),
+            cause_of_death=record.get("cause_of_death"),
+            extra_information=record.get("extra_information"),
+            father=record.get("father"),
+            mother=record.get("mother"),
+            spouses=[spouse for spouse in spouses if spouse is not None]
+            if spouses
+            else None,
+        )
+
+    def update_member(self, member_id, /, **changes):
+        """
+        Update fields of an existing member, keeping the indexes in sync.
+
+        :param member_id: ID of the member to update
+        :param changes: Field values to set, e.g. ``father="Ben Robertson"``
+        :return: Dictionary with the updated member details
+        """
+        member = self.members.get(member_id)
+        if member is None:
+            raise KeyError(f"Member not found: {member_id}")
+
+        unknown = set(changes) - set(member)
+        if unknown:
+            raise ValueError(f"Unknown member fields: {', '.join(sorted(unknown))}")
+        if changes.get("id", member_id) != member_id:
+            raise ValueError("A member's ID cannot be changed")
+        if "name" in changes and not changes["name"]:
+            raise ValueError("Name is required")
+
+        if "spouses" in changes:
+            changes["spouses"] = [
+                spouse for spouse in (changes["spouses"] or []) if spouse is not None
+            ]
+
+        if not changes.keys().isdisjoint(("name", "father", "mother")):
+            record = {field: changes.get(field, member[field]) for field in LINK_FIELDS}
+            renamed = record["name"].casefold() != member["name"].casefold()
+            field = self._find_cycle(member_id, record, renamed)
+            if field is not None:
+                raise ValueError(
+                    f"{field.capitalize()} would make {record['name']} their own ancestor"
+                )
+            child_id = self._find_vacated_cycle(member_id) if renamed else None
+            if child_id is not None:
+                raise ValueError(
+                    f"Renaming {member['name']} would make "
+                    f"{self.members[child_id]['name']} their own ancestor"
+                )
+
+        old = {field: member[field] for field in changes}
+        old_keys = self._index_keys(member)
+        try:
+            member.update(changes)
+        except ValueError:
+            # Leave the member untouched when a value is rejected
+            member.update(old)
+            raise
+        # Only entries whose keys changed move, so editing a member keeps
+        # their place among members sharing a name
+        self._relink(member_id, old_keys, self._index_keys(member))
+        # Write the record back, for member stores that are not plain dicts
+        self.members[member_id] = member
+
+        new = {field: member[field] for field in changes}
+        changed = [field for field in changes if old[field] != new[field]]
+        if changed and self.listeners:
+            self._notify(
+                "update",
+                member_id,
+                {field: old[field] for field in changed},
+                {field: new[field] for field in changed},
+            )
+
+        return member
+
+    def remove_member(self, member_id):
+        """
+        Remove a member and every parent/child and spouse link pointing at them.
+
+        :param member_id: ID of the member to remove
+        :return: Dictionary with the removed member's details
+        """
+        member = self.members.get(member_id)
+        if member is None:
+            raise KeyError(f"Member not found: {member_id}")
+
+        child_id = self._find_vacated_cycle(member_id)
+        if child_id is not None:
+            raise ValueError(
+                f"Removing {member['name']} would make "
+                f"{self.members[child_id]['name']} their own ancestor"
+            )
 
-        # Store the member using their name as the key
-        self.members[name] = member
+        self._unlink(member_id, member)
+        del self.members[member_id]
+        if self.listeners:
+            self._notify("remove", member_id, member.to_dict(), None)
 
-        # Remove code that adds member to parents' children lists
-        # if father and father in self.members:
-        #     self.members[father]["children"].append(name)
-        # if mother and mother in self.members:
-        #     self.members[mother]["children"].append(name)
+        # Other members refer to this one by name; only clear those links if
+        # no remaining member shares the name.
+        key = member["name"].casefold()
+        if not self._ids_by_name(key):
+            for child_id in self.get_children_by_name(key):
+                child = self.members[child_id]
+                for field in ("father", "mother"):
+                    if child[field] and child[field].casefold() == key:
+                        self.update_member(child_id, **{field: None})
+            for spouse_id in self._spouse_ids_by_name(key):
+                spouses = self.members[spouse_id]["spouses"]
+                self.update_member(
+                    spouse_id, spouses=[s for s in spouses if s.casefold() != key]
+                )
 
-        return name
+        return member
 
-    def get_member(self, name):
+    def get_member(self, member_id):
         """
-        Retrieve a member's details by their name.
+        Retrieve a member's details by their ID.
 
-        :param name: Name of the member
+        :param member_id: ID of the member
         :return: Dictionary with member details
         """
-        return self.members.get(name)
+        return self.members.get(member_id)
+
+    def to_records(self):
+        """
+        Export every member as a plain dictionary, ready for ``json.dump``.
+
+        :return: List of member dictionaries in insertion order
+        """
+        return [member.to_dict() for member in self.members.values()]
+
+    def member_names(self):
+        """
+        Get every member's name, for lists that do not need other fields.
+
+        :return: Iterable of (member ID, name) pairs
+        """
+        return (
+            (member_id, member["name"]) for member_id, member in self.members.items()
+        )
+
+    def member_fields(self, *fields):
+        """
+        Get some fields of every member, for indexes that do not need the rest.
+
+        :param fields: Names of the fields to read
+        :return: Iterable of (member ID, {field: value}) pairs
+        """
+        return (
+            (member_id, {field: member[field] for field in fields})
+            for member_id, member in self.members.items()
+        )
+
+    def find_member(self, name):
+        """
+        Retrieve a member's details by their name, ignoring case.
+
+        :param name: Name of the member in any letter case
+        :return: Dictionary with member details, or None if no member matches
+        """
+        matches = self._ids_by_name(name)
+        if not matches:
+            return None
+        return self.members[matches[0]]
+
+    def find_members(self, name):
+        """
+        Retrieve every member with the given name, ignoring case.
+
+        :param name: Name of the members in any letter case
+        :return: List of member dictionaries, lowest ID first
+        """
+        return [self.members[i] for i in self._ids_by_name(name)]
+
+    def get_children(self, member_id):
+        """
+        Get the IDs of a member's children.
+
+        :param member_id: ID of the parent
+        :return: List of child IDs, in the order they were linked
+        """
+        member = self.members.get(member_id)
+        if member is None:
+            return []
+        return self.get_children_by_name(member["name"])
+
+    def get_children_by_name(self, name):
+        """
+        Get the IDs of members whose father or mother is the given name.
+
+        :param name: Parent name in any letter case
+        :return: List of child IDs, in the order they were linked
+        """
+        return list(self.children_index.get(name.casefold(), ()))
+
+    def get_spouses(self, member_id):
+        """
+        Get a member's spouses, including people who list them as a spouse.
+
+        :param member_id: ID of the member
+        :return: List of spouse IDs without duplicates; names not in the
+            tree are skipped
+        """
+        member = self.members.get(member_id)
+        if member is None:
+            return []
+        spouses = {}
+        for spouse in member["spouses"]:
+            spouses.update(dict.fromkeys(self._ids_by_name(spouse)))
+        spouses.update(dict.fromkeys(self._spouse_ids_by_name(member["name"])))
+        spouses.pop(member_id, None)
+        return list(spouses)
+
+    @property
+    def ancestry(self):
+        """AncestryIndex over the tree, built the first time it is used."""
+        if self._ancestry is None:
+            self._ancestry = AncestryIndex(self)
+        return self._ancestry
+
+    @property
+    def search_index(self):
+        """SearchIndex over the tree, built the first time it is used."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    def search(self, query, limit=20, within=None):
+        """
+        Search members' names and other text fields.
+
+        :param query: Words to look for; the last letters of a word may be
+            left out
+        :param limit: Most members to return
+        :param within: Set of member IDs to limit the search to, such as
+            the results of query()
+        :return: List of IDs of members matching every word, best first
+        """
+        return self.search_index.search(query, limit, within)
+
+    @property
+    def trigram_index(self):
+        """TrigramIndex over member names, built the first time it is used."""
+        if self._trigram_index is None:
+            self._trigram_index = TrigramIndex(self)
+        return self._trigram_index
+
+    def suggest_parents(self, text, parent, child_age=None, exclude=None, limit=8):
+        """
+        Suggest names for a father or mother field as it is typed.
+
+        Names are matched by trigrams, so typos are tolerated, and only
+        names with a member who could be the parent are suggested: not of
+        the other gender, and old enough to have children and at least as
+        old as the child.
+
+        :param text: Text typed so far
+        :param parent: "father" or "mother"
+        :param child_age: Age of the child, if known
+        :param exclude: ID of the child, who cannot be their own parent
+        :param limit: Most names to return
+        :return: List of member names, best match first
+        """
+        child_age = AGE_LOOKUP.get((child_age or "").casefold())
+        youngest = YOUNGEST_PARENT_AGE
+        if child_age is not None:
+            youngest = max(youngest, AGES.index(child_age))
+        implausible_gender = IMPLAUSIBLE_PARENT_GENDERS[parent]
+
+        names = []
+        # Ask for extra matches, since some are filtered out
+        for _, key in self.trigram_index.match(text, limit * 4):
+            for member_id in self.trigram_index.member_ids(key):
+                if member_id == exclude:
+                    continue
+                member = self.members[member_id]
+                if member["gender"] == implausible_gender:
+                    continue
+                if member["age"] and AGES.index(member["age"]) < youngest:
+                    continue
+                names.append(member["name"])
+                break
+            if len(names) == limit:
+                break
+        return names
+
+    @property
+    def attribute_index(self):
+        """AttributeIndex over the tree, built the first time it is used."""
+        if self._attribute_index is None:
+            self._attribute_index = AttributeIndex(self)
+        return self._attribute_index
+
+    def query(self, **filters):
+        """
+        Find the members matching every filter, such as all elders in
+        Newcrest with ``query(age="Elder", location="Newcrest")``.
+
+        :param filters: Any of age, gender, location, occupation,
+            aspiration and cause_of_death, mapped to the value to match
+            ignoring case, or to True for members with the field set
+        :return: List of matching member IDs in ascending order
+        :raises ValueError: If a filter names another field
+        """
+        return self.attribute_index.query(**filters)
+
+    def ancestors(self, member_id):
+        """
+        Get a member's parents, grandparents and so on.
+
+        :param member_id: ID of the member
+        :return: List of ancestor IDs
+        """
+        return self.ancestry.ancestors(member_id)
+
+    def descendants(self, member_id):
+        """
+        Get a member's children, grandchildren and so on.
+
+        :param member_id: ID of the member
+        :return: List of descendant IDs, nearest generation first
+        """
+        return self.ancestry.descendants(member_id)
+
+    def is_ancestor(self, ancestor_id, member_id):
+        """
+        Check whether one member descends from another.
+
+        :param ancestor_id: ID of the possible ancestor
+        :param member_id: ID of the possible descendant
+        :return: True if ``ancestor_id`` is an ancestor of ``member_id``
+        """
+        return self.ancestry.is_ancestor(ancestor_id, member_id)
+
+    def relationship(self, member_id, relative_id):
+        """
+        Describe how a relative is related to a member.
+
+        :param member_id: ID of the member
+        :param relative_id: ID of the relative
+        :return: What the relative is to the member, such as "aunt" or
+            "first cousin once removed", or None if they are not related
+        """
+        return describe_relationship(self, member_id, relative_id)
+
+    def generation(self, member_id):
+        """
+        Get a member's generation depth.
+
+        :param member_id: ID of the member
+        :return: 0 for members without known parents, otherwise one more
+            than their deepest parent; None for unknown members
+        """
+        return self.ancestry.depths.get(member_id)
+
+    def topological_order(self):
+        """
+        Get every member ordered so that parents come before their children.
+
+        :return: List of member IDs, generation by generation
+        """
+        return self.ancestry.topological_order()
+
+    def neighborhood(self, member_id, generations=2, limit=None):
+        """
+        Get the members within a few generations of a member.
+
+        Goes up through parents and down through children one generation at
+        a time, taking in the spouses of everyone reached, so only the
+        neighborhood is visited however large the tree is.
+
+        :param member_id: ID of the member at the center
+        :param generations: How many generations to go up and down
+        :param limit: Most members to return, None for no limit; the
+            nearest generations are kept
+        :return: List of member IDs, nearest generations first and starting
+            with the member; empty for unknown members
+        """
+        if self.get_member(member_id) is None:
+            return []
+        parents = self.ancestry.parents
+        children = self.ancestry.children
+
+        found = {}
+        ancestors = descendants = [member_id]
+        for generation in range(generations + 1):
+            if generation:
+                ancestors = list(
+                    dict.fromkeys(p for i in ancestors for p in parents.get(i, ()))
+                )
+                descendants = list(
+                    dict.fromkeys(c for i in descendants for c in children.get(i, ()))
+                )
+            for relative_id in dict.fromkeys(ancestors + descendants):
+                for i in [relative_id, *self.get_spouses(relative_id)]:
+                    if i in found:
+                        continue
+                    if limit is not None and len(found) >= limit:
+                        return list(found)
+                    found[i] = None
+        return list(found)
+
+    def _find_cycle(self, member_id, record, renamed):
+        """
+        Check whether a member's name and parents would create a cycle.
+
+        :param member_id: ID of the member, None or an unused ID when adding
+        :param record: The member's name, father and mother after the change
+        :param renamed: Whether the member takes a new name, which also
+            makes them the parent of members listing that name
+        :return: "father" or "mother" if that parent would become the
+            member's own descendant, otherwise None
+        """
+        # The member and everyone who would be their child. Taking a name
+        # makes the member its parent if no one else with the name has a
+        # lower ID; a new member without an ID gets one above all others.
+        descendants = [member_id]
+        name = record["name"]
+        others = [i for i in self._ids_by_name(name) if i != member_id]
+        takes_name = renamed and (
+            not others or (member_id is not None and member_id < others[0])
+        )
+        if takes_name:
+            descendants.extend(self.get_children_by_name(name))
+
+        for field in ("father", "mother"):
+            parent_name = record[field]
+            if not parent_name:
+                continue
+            # Resolve the parent the way find_member will after the change
+            ids = self._ids_by_name(parent_name)
+            if renamed:
+                ids = [i for i in ids if i != member_id]
+                if parent_name.casefold() == name.casefold():
+                    ids.insert(0 if takes_name else len(ids), member_id)
+            if not ids:
+                continue
+            parent_id = ids[0]
+            for descendant_id in descendants:
+                if descendant_id == parent_id:
+                    return field
+                # A member being added has no descendants yet, so adding
+                # them does not need the ancestry index
+                if descendant_id in self.members and self.is_ancestor(
+                    descendant_id, parent_id
+                ):
+                    return field
+        return None
+
+    def _find_vacated_cycle(self, member_id):
+        """
+        Check whether giving up a name, by a rename or removal, would create
+        a cycle.
+
+        Members listing the name as a parent pass to the next member with
+        it, who must not be one of their descendants.
+
+        :param member_id: ID of the member giving up their name
+        :return: ID of a member who would become their own ancestor,
+            otherwise None
+        """
+        name = self.members[member_id]["name"]
+        ids = self._ids_by_name(name)
+        if len(ids) < 2 or ids[0] != member_id:
+            return None
+        heir_id = ids[1]
+        for child_id in self.get_children_by_name(name):
+            if child_id == heir_id or self.is_ancestor(child_id, heir_id):
+                return child_id
+        return None
+
+    def _ids_by_name(self, name):
+        """Return the IDs of members with a name, ignoring case, lowest first."""
+        return sorted(self.name_index.get(name.casefold(), ()))
+
+    def _spouse_ids_by_name(self, name):
+        """Return the IDs of members listing the given name as a spouse."""
+        return list(self.spouse_index.get(name.casefold(), ()))
+
+    def _link(self, member_id, member):
+        """Add a member to the name and reverse relationship indexes."""
+        self.name_index.setdefault(member["name"].casefold(), {})[member_id] = None
+        for parent in (member["father"], member["mother"]):
+            if parent:
+                self.children_index.setdefault(parent.casefold(), {})[member_id] = None
+        for spouse in member["spouses"]:
+            if spouse:
+                self.spouse_index.setdefault(spouse.casefold(), {})[member_id] = None
+
+    def _unlink(self, member_id, member):
+        """Remove a member from the name and reverse relationship indexes."""
+        self._discard(self.name_index, member["name"], member_id)
+        for parent in (member["father"], member["mother"]):
+            self._discard(self.children_index, parent, member_id)
+        for spouse in member["spouses"]:
+            self._discard(self.spouse_index, spouse, member_id)
+
+    @staticmethod
+    def _index_keys(member):
+        """Return the (index attribute, key) entries a member is linked under."""
+        keys = {("name_index", member["name"].casefold()): None}
+        for parent in (member["father"], member["mother"]):
+            if parent:
+                keys["children_index", parent.casefold()] = None
+        for spouse in member["spouses"]:
+            if spouse:
+                keys["spouse_index", spouse.casefold()] = None
+        return keys
+
+    def _relink(self, member_id, old_keys, new_keys):
+        """Move a member between index entries, leaving kept entries in place."""
+        for index_name, key in old_keys:
+            if (index_name, key) not in new_keys:
+                self._discard(getattr(self, index_name), key, member_id)
+        for index_name, key in new_keys:
+            if (index_name, key) not in old_keys:
+                getattr(self, index_name).setdefault(key, {})[member_id] = None
+
+    @staticmethod
+    def _discard(index, name, member_id):
+        """Remove ``member_id`` from ``index[name]``, dropping the key once empty."""
+        if not name:
+            return
+        key = name.casefold()
+        entries = index.get(key)
+        if entries is None:
+            return
+        entries.pop(member_id, None)
+        if not entries:
+            del index[key]
 
     def print_family_tree(self):
         """
         Print out the entire family tree in a readable format.
         """
         print("Family Tree:")
-        for name, member in self.members.items():
-            print(f"\nMember: {name}")
+        for member_id, member in self.members.items():
+            print(f"\nMember: {member['name']}")
 
             # Print member details
             fields = [
@@ -121,10 +969,17 @@ class FamilyTree:
                 relationships.append(("Father", member["father"]))
             if member["mother"]:
                 relationships.append(("Mother", member["mother"]))
-            for spouse in member["spouses"]:
+            spouses = dict.fromkeys(member["spouses"])
+            spouses.update(
+                dict.fromkeys(
+                    self.members[spouse_id]["name"]
+                    for spouse_id in self.get_spouses(member_id)
+                )
+            )
+            for spouse in spouses:
                 relationships.append(("Spouse", spouse))
-            for child in member["children"]:
-                relationships.append(("Child", child))
+            for child_id in self.get_children(member_id):
+                relationships.append(("Child", self.members[child_id]["name"]))
 
             if relationships:
                 print("Relationships:")
@@ -132,46 +987,140 @@ class FamilyTree:
                     print(f"  {rel_type}: {rel_name}")
 
 
-def load_member_data_from_json(family_tree, members_file):
+def _utf8_len(text):
+    """Return the number of bytes ``text`` takes up in UTF-8."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def scan_member_records(members_file, chunk_size=64 * 1024):
     """
-    Load member data from a JSON file into an existing FamilyTree instance.
+    Parse member records from a JSON list one at a time, with their location.
+
+    The file is read in chunks and only the unparsed tail is kept in memory,
+    so peak memory stays around one chunk plus one record.
+
+    :param members_file: Path to UTF-8 JSON file containing a list of members
+    :param chunk_size: Number of bytes to read from the file at a time
+    :return: Generator of (member dictionary, start, end) tuples in file
+        order, where start and end are the byte offsets of the record
     """
-    import json
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    with open(members_file, "rb") as f:
+        buffer = ""
+        pos = 0
+        offset = 0  # Byte offset of buffer[pos] in the file
+        at_eof = False
+        started = False
 
-    try:
-        with open(members_file, "r") as f:
-            members_data = json.load(f)
+        def fill():
+            # Drop the parsed prefix and append the next chunk
+            nonlocal buffer, pos, at_eof
+            chunk = f.read(chunk_size)
+            at_eof = not chunk
+            buffer = buffer[pos:] + utf8.decode(chunk, final=at_eof)
+            pos = 0
 
-        # Validate members data structure
-        if not isinstance(members_data, list):
-            raise ValueError("Members JSON file must contain a list of members")
+        while True:
+            # Skip whitespace and separators up to the next token
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+                offset += 1
+            if pos == len(buffer):
+                if at_eof:
+                    raise json.JSONDecodeError("Unterminated list", buffer, pos)
+                fill()
+                continue
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Members JSON file must contain a list of members")
+                started = True
+                pos += 1
+                offset += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            if buffer[pos] != "{":
+                raise ValueError("Each member in the JSON file must be an object")
 
-        # First pass: Add all members without relationships
-        for member_data in members_data:
             try:
-                family_tree.add_member(
-                    id=member_data.get("id"),  # Include ID when adding member
-                    name=member_data.get("name"),
-                    age=member_data.get("age"),
-                    gender=member_data.get("gender"),
-                    location=member_data.get("location"),
-                    occupation=member_data.get("occupation"),
-                    aspiration=member_data.get("aspiration"),
-                    cause_of_death=member_data.get("cause_of_death"),
-                    extra_information=member_data.get("extra_information"),
-                )
-            except ValueError as e:
-                print(f"Warning: Skipping invalid member data: {str(e)}")
+                member_data, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The record may continue in the next chunk
+                if at_eof:
+                    raise
+                fill()
                 continue
+            start = offset
+            offset += _utf8_len(buffer[pos:end])
+            pos = end
+            yield member_data, start, offset
 
-        # Second pass: Add relationships
-        for member_data in members_data:
-            name = member_data.get("name")
-            if name and name in family_tree.members:
-                member = family_tree.members[name]
-                member["father"] = member_data.get("father")
-                member["mother"] = member_data.get("mother")
-                member["spouses"] = member_data.get("spouses", [])
+
+def iter_member_records(members_file, chunk_size=64 * 1024):
+    """
+    Parse member records from a JSON list one at a time.
+
+    :param members_file: Path to UTF-8 JSON file containing a list of members
+    :param chunk_size: Number of bytes to read from the file at a time
+    :return: Generator of member dictionaries, in file order
+    """
+    for member_data, _, _ in scan_member_records(members_file, chunk_size):
+        yield member_data
+
+
+def print_member_errors(errors, first_row=0):
+    """
+    Print a warning for each record add_members skipped.
+
+    :param errors: List of MemberError
+    :param first_row: Row of the first record in the batch within the file
+    """
+    for error in errors:
+        if not error.skipped:
+            print(
+                f"Warning: Cleared {error.field} of member data "
+                f"(row {first_row + error.row}): {error.reason}"
+            )
+            continue
+        print(
+            f"Warning: Skipping invalid member data (row {first_row + error.row}, "
+            f"{error.field}): {error.reason}"
+        )
+
+
+def stream_member_data_from_json(family_tree, members_file, batch_size=1000):
+    """
+    Load members from a JSON file in a single pass, yielding as they are added.
+
+    Relationships are added together with each member. Parents and spouses
+    that appear later in the file are resolved by the tree's name-keyed
+    relationship indexes once they are added, so no second pass is needed.
+    Records are inserted with add_members in batches of ``batch_size``, and
+    callers can use the tree between yields, before the whole file is parsed.
+
+    :param family_tree: FamilyTree instance to load the members into
+    :param members_file: Path to JSON file containing family member data
+    :param batch_size: Number of records validated and inserted together
+    :return: Generator of the IDs of the added members
+    """
+
+    def add_batch(batch, first_row):
+        added, errors = family_tree.add_members(batch)
+        print_member_errors(errors, first_row)
+        return added
+
+    try:
+        batch = []
+        first_row = 0
+        for member_data in iter_member_records(members_file):
+            batch.append(member_data)
+            if len(batch) >= batch_size:
+                yield from add_batch(batch, first_row)
+                first_row += len(batch)
+                batch = []
+        yield from add_batch(batch, first_row)
 
     except FileNotFoundError:
         raise FileNotFoundError(f"Members file not found: {members_file}")
@@ -179,18 +1128,55 @@ def load_member_data_from_json(family_tree, members_file):
         raise ValueError(f"Invalid JSON format in members file: {members_file}")
 
 
-def create_family_tree(members_file):
+def load_member_data_from_json(family_tree, members_file):
+    """
+    Load member data from a JSON file into an existing FamilyTree instance.
+    """
+    for _ in stream_member_data_from_json(family_tree, members_file):
+        pass
+
+
+def create_family_tree(members_file, use_journal=False, lazy=False):
     """
     Create a new family tree and load data from JSON files.
 
+    A path ending in .db, .sqlite or .sqlite3 opens a SQLite-backed tree
+    instead, which commits every edit itself and needs no journal. A path
+    ending in .snap opens a memory-mapped binary snapshot, which is
+    journaled like a JSON file and compacted back into a snapshot.
+
     :param members_file: Path to JSON file containing family member data
-    :param relationships_file: Path to JSON file containing relationship data (not used)
+    :param use_journal: Replay the change journal next to ``members_file`` and
+        keep journaling every edit made to the tree
+    :param lazy: Only index a JSON file at startup and parse each member's
+        full record when it is first read
     :return: FamilyTree instance with loaded data
     """
-    # Create new family tree
-    family_tree = FamilyTree()
+    from scripts.lazy_tree import LazyFamilyTree
+    from scripts.snapshot import SNAPSHOT_EXTENSIONS, SnapshotFamilyTree
+    from scripts.sqlite_store import SQLITE_EXTENSIONS, SQLiteFamilyTree
+
+    if str(members_file).endswith(SQLITE_EXTENSIONS):
+        return SQLiteFamilyTree(members_file)
+
+    if str(members_file).endswith(SNAPSHOT_EXTENSIONS):
+        family_tree = SnapshotFamilyTree(members_file)
+        write = family_tree.write_snapshot
+    elif lazy:
+        family_tree = LazyFamilyTree(members_file)
+        write = write_json_atomic
+    else:
+        # Create new family tree
+        family_tree = FamilyTree()
+
+        # Load member data
+        load_member_data_from_json(family_tree, members_file)
+        write = write_json_atomic
 
-    # Load member data
-    load_member_data_from_json(family_tree, members_file)
+    # Apply edits made since the snapshot was written, then record new ones
+    if use_journal:
+        journal = MemberJournal(members_file, write_snapshot=write)
+        journal.replay(family_tree)
+        journal.attach(family_tree)
 
     return family_tree
@@ -0,0 +1,99 @@
+# Fields that decide which households members belong to
+GROUPING_FIELDS = ("name", "father", "mother", "spouses")
+
+
+class Households:
+    """
+    Members grouped into households of couples and their children.
+
+    A household is keyed by the sorted tuple of its parents' IDs, so a
+    couple with children together is one household, and a parent who had
+    children with someone else heads a second one. Spouses make a
+    household too, with or without children. Parent links come from the
+    tree's ancestry index, and spouse names are resolved the same way.
+    Households link to the households their children go on to head, which
+    gives a much smaller graph than the members themselves for drawing
+    large trees.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to group
+        """
+        self.family_tree = family_tree
+        self.children = {}  # household key -> list of child IDs
+        self.headed_by = {}  # member id -> list of household keys
+
+        parents = family_tree.ancestry.parents
+        for member_id, fields in family_tree.member_fields("spouses"):
+            member_parents = parents.get(member_id, ())
+            if member_parents:
+                self._household(tuple(sorted(member_parents))).append(member_id)
+            # Spouse links are listed on one side or both, so either finds
+            # the couple
+            for spouse in fields["spouses"]:
+                ids = family_tree._ids_by_name(spouse)
+                if ids and ids[0] != member_id:
+                    self._household(tuple(sorted((member_id, ids[0]))))
+
+    def household_of(self, member_id):
+        """
+        Get the household a member grew up in.
+
+        :param member_id: ID of the member
+        :return: Household key, or None for members without known parents
+        """
+        parents = self.family_tree.ancestry.parents.get(member_id, ())
+        return tuple(sorted(parents)) if parents else None
+
+    def child_households(self, key):
+        """
+        Get the households headed by the children of a household.
+
+        :param key: Household key
+        :return: List of household keys, without duplicates
+        """
+        return list(
+            dict.fromkeys(
+                child_key
+                for child_id in self.children.get(key, ())
+                for child_key in self.headed_by.get(child_id, ())
+            )
+        )
+
+    def roots(self):
+        """
+        Get the households whose parents have no known parents themselves.
+
+        :return: List of household keys
+        """
+        parents = self.family_tree.ancestry.parents
+        return [
+            key
+            for key in self.children
+            if not any(parents.get(parent_id) for parent_id in key)
+        ]
+
+    def around(self, member_id):
+        """
+        Get the households that need to be expanded to show a member.
+
+        :param member_id: ID of the member
+        :return: List of household keys: the households of the member's
+            ancestors, the one they grew up in and the ones they head
+        """
+        keys = {}
+        for relative_id in [*self.family_tree.ancestors(member_id), member_id]:
+            key = self.household_of(relative_id)
+            if key is not None:
+                keys[key] = None
+        keys.update(dict.fromkeys(self.headed_by.get(member_id, ())))
+        return list(keys)
+
+    def _household(self, key):
+        """Return the children of a household, adding it if it is new."""
+        if key not in self.children:
+            self.children[key] = []
+            for parent_id in key:
+                self.headed_by.setdefault(parent_id, []).append(key)
+        return self.children[key]
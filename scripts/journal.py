@@ -0,0 +1,193 @@
+import json
+
+from scripts.persistence import PersistenceWorker, write_json_atomic
+
+
+class MemberJournal:
+    """
+    Append-only journal of member changes next to the members.json snapshot.
+
+    Every add, update and remove on the attached tree appends one small JSON
+    line to the journal instead of rewriting the whole snapshot. After
+    ``compact_every`` entries (and when the journal is closed) the tree is
+    written back to the snapshot and the journal is emptied. On startup,
+    replay() applies any entries written since the last compaction.
+
+    Writes happen synchronously until start_worker() moves them to a
+    background PersistenceWorker.
+    """
+
+    def __init__(
+        self,
+        snapshot_file,
+        journal_file=None,
+        compact_every=500,
+        write_snapshot=write_json_atomic,
+    ):
+        """
+        :param snapshot_file: Path to the members.json snapshot
+        :param journal_file: Path to the journal (defaults to the snapshot
+            path with a ".journal" suffix)
+        :param compact_every: Number of entries after which the journal is
+            compacted into the snapshot
+        :param write_snapshot: Function writing the tree's records to the
+            snapshot file
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or f"{snapshot_file}.journal"
+        self.compact_every = compact_every
+        self.write_snapshot = write_snapshot
+        self.entries = 0
+        self.family_tree = None
+        self.worker = None
+        self._file = None
+
+    def replay(self, family_tree):
+        """
+        Apply journal entries written since the last compaction.
+
+        Entries are applied idempotently, since a crash between writing the
+        snapshot and truncating the journal leaves entries that are already
+        part of the snapshot. Replaying those on top of the newer snapshot
+        can ask for a change the tree refuses, such as a parent link a later
+        entry undid, so refused entries are reported and skipped. A
+        partially written last line is ignored.
+
+        :param family_tree: FamilyTree loaded from the snapshot
+        :return: Number of entries replayed
+        """
+        try:
+            with open(self.journal_file, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+
+        replayed = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Warning: Ignoring incomplete journal entry: {line!r}")
+                continue
+            try:
+                self._apply(family_tree, entry)
+            except ValueError as e:
+                print(f"Warning: Skipping journal entry {line.strip()!r}: {e}")
+                continue
+            replayed += 1
+
+        self.entries += replayed
+        return replayed
+
+    @staticmethod
+    def _apply(family_tree, entry):
+        """Apply a single journal entry to the tree."""
+        member_id = entry["id"]
+        fields = entry.get("fields") or {}
+        exists = member_id in family_tree.members
+        if entry["op"] == "add" and not exists:
+            family_tree.add_member(**fields)
+        elif entry["op"] in ("add", "update") and exists:
+            fields = {key: value for key, value in fields.items() if key != "id"}
+            family_tree.update_member(member_id, **fields)
+        elif entry["op"] == "remove" and exists:
+            family_tree.remove_member(member_id)
+
+    def attach(self, family_tree):
+        """
+        Start journaling every change made to the tree.
+
+        :param family_tree: FamilyTree to persist
+        """
+        self.family_tree = family_tree
+        family_tree.journal = self
+        family_tree.add_listener(self.record)
+        self._file = open(self.journal_file, "a")
+
+    def start_worker(self, on_complete=None, delay=0.25):
+        """
+        Move journal and snapshot writes to a background thread.
+
+        :param on_complete: Called from the worker thread after each batch of
+            writes with None, or the exception that made the batch fail
+        :param delay: Seconds to wait for more edits before writing
+        """
+        if self.worker is None:
+            self.worker = PersistenceWorker(self._write, on_complete, delay)
+            self.worker.start()
+
+    def record(self, event, member_id, old, new):
+        """Journal one change; used as a FamilyTree listener."""
+        entry = {"op": event, "id": member_id}
+        if new is not None:
+            entry["fields"] = new
+        self._submit(("append", entry))
+
+        self.entries += 1
+        if self.entries >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write the tree to the snapshot and empty the journal."""
+        # Copy the records here, so a background write never sees the tree
+        # half-way through an edit made on the main thread
+        self._submit(("snapshot", self.family_tree.to_records()))
+        self.entries = 0
+
+    def flush(self):
+        """Block until every journaled change has been written."""
+        if self.worker is not None:
+            self.worker.flush()
+
+    def close(self):
+        """Compact the journal, finish pending writes and stop journaling."""
+        if self.family_tree is None:
+            return
+        self.compact()
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        self.family_tree.remove_listener(self.record)
+        self.family_tree.journal = None
+        self._file.close()
+        self._file = None
+        self.family_tree = None
+
+    def _submit(self, operation):
+        """Write an operation now, or hand it to the background worker."""
+        if self.worker is not None:
+            self.worker.submit(operation)
+        else:
+            self._write([operation])
+
+    def _write(self, operations):
+        """
+        Perform a batch of ("append", entry) and ("snapshot", records) writes.
+
+        The batch is coalesced first: entries before the last snapshot are
+        already part of it and are dropped, and consecutive updates to the
+        same member are merged into one entry.
+        """
+        snapshots = [i for i, (kind, _) in enumerate(operations) if kind == "snapshot"]
+        if snapshots:
+            _, records = operations[snapshots[-1]]
+            self.write_snapshot(self.snapshot_file, records)
+            self._file.truncate(0)
+            operations = operations[snapshots[-1] + 1 :]
+
+        entries = []
+        for _, entry in operations:
+            previous = entries[-1] if entries else None
+            if (
+                previous is not None
+                and entry["op"] == "update"
+                and previous["op"] in ("add", "update")
+                and previous["id"] == entry["id"]
+            ):
+                previous["fields"] = {**previous["fields"], **entry["fields"]}
+            else:
+                entries.append(dict(entry))
+
+        if entries:
+            self._file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self._file.flush()
@@ -0,0 +1,146 @@
+def _generations(parents, member_ids):
+    """
+    Group members into generations, each after all of its parents.
+
+    Members with no known parents form generation 0. Members in a parent
+    cycle never get a generation and are left out.
+
+    :param parents: Mapping of member ID to a tuple of parent IDs
+    :param member_ids: Every member ID
+    :return: List of lists of member IDs, one per generation
+    """
+    remaining = {member_id: len(parents.get(member_id, ())) for member_id in member_ids}
+    children = {}
+    for member_id in member_ids:
+        for parent_id in parents.get(member_id, ()):
+            children.setdefault(parent_id, []).append(member_id)
+
+    generations = []
+    level = [member_id for member_id, count in remaining.items() if count == 0]
+    while level:
+        generations.append(level)
+        next_level = []
+        for parent_id in level:
+            for child_id in children.get(parent_id, ()):
+                remaining[child_id] -= 1
+                if remaining[child_id] == 0:
+                    next_level.append(child_id)
+        level = next_level
+    return generations
+
+
+def _iter_kinship(family_tree, rows, retire):
+    """
+    Compute kinship rows one generation at a time.
+
+    ``rows`` is a sparse symmetric kinship matrix, ``rows[i][j]`` being the
+    kinship coefficient of members i and j; pairs with no common ancestor
+    have no entry. A member's row is the average of its parents' rows, so
+    each generation is a sparse row update rather than a recursion over
+    pairs, and the member's inbreeding coefficient is its parents' kinship.
+
+    :param family_tree: FamilyTree to compute coefficients for
+    :param rows: Dictionary filled with the kinship rows
+    :param retire: Drop the rows of members once all of their children are
+        processed, so only the living edge of the tree is kept in memory
+    :return: Generator of {member id: inbreeding coefficient} per generation
+    """
+    parents = family_tree.ancestry.parents
+    member_ids = list(family_tree.members)
+    unprocessed_children = {}
+    for member_id in member_ids:
+        for parent_id in parents.get(member_id, ()):
+            unprocessed_children[parent_id] = unprocessed_children.get(parent_id, 0) + 1
+
+    for generation in _generations(parents, member_ids):
+        inbreeding = {}
+        for member_id in generation:
+            member_parents = parents.get(member_id, ())
+            row = {}
+            for parent_id in member_parents:
+                for relative_id, value in rows[parent_id].items():
+                    row[relative_id] = row.get(relative_id, 0.0) + value / 2
+            if len(member_parents) == 2:
+                father_id, mother_id = member_parents
+                coefficient = rows[father_id].get(mother_id, 0.0)
+            else:
+                coefficient = 0.0
+            row[member_id] = (1 + coefficient) / 2
+            inbreeding[member_id] = coefficient
+
+            for relative_id, value in row.items():
+                if relative_id != member_id:
+                    rows[relative_id][member_id] = value
+            rows[member_id] = row
+
+        if retire:
+            done = [i for i in generation if not unprocessed_children.get(i)]
+            for member_id in generation:
+                for parent_id in parents.get(member_id, ()):
+                    unprocessed_children[parent_id] -= 1
+                    if not unprocessed_children[parent_id]:
+                        done.append(parent_id)
+            for member_id in done:
+                for relative_id in rows.pop(member_id):
+                    if relative_id != member_id and relative_id in rows:
+                        del rows[relative_id][member_id]
+
+        yield inbreeding
+
+
+def iter_inbreeding_by_generation(family_tree):
+    """
+    Compute inbreeding coefficients one generation at a time.
+
+    Only the kinship rows of members who still have unprocessed children
+    are kept, so memory follows the widest generation rather than the
+    whole tree.
+
+    :param family_tree: FamilyTree to compute coefficients for
+    :return: Generator of {member id: inbreeding coefficient}, one
+        dictionary per generation starting with the founders
+    """
+    return _iter_kinship(family_tree, {}, retire=True)
+
+
+class KinshipTable:
+    """
+    Kinship and inbreeding coefficients for every member of a tree.
+
+    The kinship coefficient of two members is the probability that an
+    allele picked at random from each is identical by descent; a member's
+    inbreeding coefficient is the kinship of its parents. Coefficients are
+    computed once, in generation order, when the table is created.
+
+    Only related pairs are stored, but a tree where most members are
+    related still needs memory for every pair; use
+    iter_inbreeding_by_generation() when only inbreeding is needed.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to compute coefficients for
+        """
+        self.rows = {}
+        self.inbreeding_coefficients = {}
+        for generation in _iter_kinship(family_tree, self.rows, retire=False):
+            self.inbreeding_coefficients.update(generation)
+
+    def kinship(self, member_id, other_id):
+        """
+        Get the kinship coefficient of two members.
+
+        :param member_id: ID of the first member
+        :param other_id: ID of the second member
+        :return: Coefficient between 0 and 1; 0 for unrelated members
+        """
+        return self.rows.get(member_id, {}).get(other_id, 0.0)
+
+    def inbreeding(self, member_id):
+        """
+        Get a member's inbreeding coefficient.
+
+        :param member_id: ID of the member
+        :return: Coefficient between 0 and 1; 0 if the parents are unrelated
+        """
+        return self.inbreeding_coefficients.get(member_id, 0.0)
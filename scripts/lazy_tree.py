@@ -0,0 +1,221 @@
+import json
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from scripts.family_tree import FamilyTree, print_member_errors, scan_member_records
+from scripts.member import Member
+
+
+class LazyMembers(MutableMapping):
+    """
+    ``FamilyTree.members`` mapping that parses records from the JSON file on
+    demand.
+
+    Only each member's name and the byte range of its record are kept for
+    every member. Full records are parsed when they are looked up and the
+    most recently used ``cache_size`` of them are cached. Added and updated
+    members are kept in ``changed`` and removed IDs in ``removed``, both
+    taking precedence over the file.
+    """
+
+    def __init__(self, members_file, hydrate, cache_size=256):
+        """
+        :param members_file: Path to the members.json file
+        :param hydrate: Function building a Member from an ID and its parsed
+            record
+        :param cache_size: Number of parsed members kept in memory
+        """
+        self.members_file = members_file
+        self.hydrate = hydrate
+        self.cache_size = cache_size
+        self.offsets = {}
+        self.names = {}
+        self.changed = {}
+        self.removed = set()
+        self.cache = OrderedDict()
+        self._file = None
+
+    def index(self, member_id, name, start, end):
+        """Record where a member's record is stored in the file."""
+        self.offsets[member_id] = (start, end)
+        self.names[member_id] = name
+
+    def name(self, member_id):
+        """Return a member's name without parsing its record."""
+        member = self.changed.get(member_id)
+        return member["name"] if member is not None else self.names[member_id]
+
+    def __getitem__(self, member_id):
+        member = self.changed.get(member_id)
+        if member is not None:
+            return member
+        member = self.cache.get(member_id)
+        if member is not None:
+            self.cache.move_to_end(member_id)
+            return member
+        if member_id in self.removed or member_id not in self.offsets:
+            raise KeyError(member_id)
+
+        member = self._load(member_id)
+        self.cache[member_id] = member
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return member
+
+    def __setitem__(self, member_id, member):
+        self.changed[member_id] = member
+        self.removed.discard(member_id)
+        self.cache.pop(member_id, None)
+
+    def __delitem__(self, member_id):
+        if member_id not in self:
+            raise KeyError(member_id)
+        self.changed.pop(member_id, None)
+        self.cache.pop(member_id, None)
+        if member_id in self.offsets:
+            self.removed.add(member_id)
+
+    def __contains__(self, member_id):
+        if member_id in self.changed:
+            return True
+        return member_id in self.offsets and member_id not in self.removed
+
+    def __iter__(self):
+        for member_id in self.offsets:
+            if member_id not in self.removed:
+                yield member_id
+        for member_id in self.changed:
+            if member_id not in self.offsets:
+                yield member_id
+
+    def __len__(self):
+        added = sum(1 for member_id in self.changed if member_id not in self.offsets)
+        return len(self.offsets) - len(self.removed) + added
+
+    def values(self):
+        """Yield every member without evicting the cached ones."""
+        for member_id in self:
+            if member_id in self.changed:
+                yield self.changed[member_id]
+            elif member_id in self.cache:
+                yield self.cache[member_id]
+            else:
+                yield self._load(member_id)
+
+    def items(self):
+        """Yield ``(id, member)`` pairs in file order."""
+        return ((member.id, member) for member in self.values())
+
+    def close(self):
+        """Close the members file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load(self, member_id):
+        """Read and parse one member's record from the file."""
+        start, end = self.offsets[member_id]
+        if self._file is None:
+            self._file = open(self.members_file, "rb")
+        self._file.seek(start)
+        return self.hydrate(member_id, json.loads(self._file.read(end - start)))
+
+
+class LazyFamilyTree(FamilyTree):
+    """
+    FamilyTree that keeps only an index of a members.json file in memory.
+
+    Loading parses the file once to validate every record, build the name
+    and relationship indexes and note where each record is stored, then
+    drops the records. A member's full record, including long
+    ``extra_information`` text, is read back from the file when it is first
+    looked up.
+    """
+
+    def __init__(self, members_file, cache_size=256):
+        """
+        :param members_file: Path to JSON file containing family member data
+        :param cache_size: Number of parsed members kept in memory
+        """
+        super().__init__()
+        self.members = LazyMembers(members_file, self._hydrate, cache_size)
+        try:
+            self._build_index(members_file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Members file not found: {members_file}")
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON format in members file: {members_file}")
+
+    def get_children(self, member_id):
+        # Only the parent's name is needed, which is always in memory
+        if member_id not in self.members:
+            return []
+        return self.get_children_by_name(self.members.name(member_id))
+
+    def member_names(self):
+        return ((member_id, self.members.name(member_id)) for member_id in self.members)
+
+    def close(self):
+        """Close the members file."""
+        self.members.close()
+
+    def _build_index(self, members_file):
+        """Validate and index every record in the file."""
+        errors = []
+        batch_ids = set()
+        unassigned = []
+        links = []
+        records = scan_member_records(members_file)
+        for row, (record, start, end) in enumerate(records):
+            member = self._validate_record(row, record, batch_ids, errors)
+            if member is None:
+                continue
+            if member.id is None:
+                # Allocated once every explicit ID in the file is known
+                unassigned.append((row, member, start, end))
+                continue
+            links.append((row, self._index(member, start, end)))
+
+        for row, member, start, end in unassigned:
+            member.id = self.allocate_id()
+            links.append((row, self._index(member, start, end)))
+
+        # Checked the same way as an eager load of the file
+        for row, member, field in self._batch_cycles(links):
+            errors.append(self._cycle_error(row, member, field))
+            old_keys = self._index_keys(member)
+            member[field] = None
+            self._relink(member.id, old_keys, self._index_keys(member))
+            # Records are read back from the file, so the member is kept
+            # in memory without the link
+            stored = self.members[member.id]
+            stored[field] = None
+            self.members[member.id] = stored
+        print_member_errors(errors)
+
+    def _index(self, member, start, end):
+        """
+        Add a validated member to the offset and relationship indexes.
+
+        :return: Copy of the member holding only the fields that link it to
+            other members, for the cycle check
+        """
+        self.members.index(member.id, member["name"], start, end)
+        self._link(member.id, member)
+        return Member(
+            id=member.id,
+            name=member["name"],
+            father=member["father"],
+            mother=member["mother"],
+        )
+
+    def _hydrate(self, member_id, record):
+        """Build the Member for a record read back from the file."""
+        # The record was validated while indexing, so validating it again
+        # without its ID only normalizes the age and gender
+        errors = []
+        member = self._validate_record(0, {**record, "id": None}, set(), errors)
+        if member is None:
+            raise ValueError(errors[0].reason)
+        member.id = member_id
+        return member
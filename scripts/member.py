@@ -0,0 +1,165 @@
+import sys
+from collections.abc import MutableMapping
+
+AGES = ("Infant", "Toddler", "Child", "Teen", "Young Adult", "Adult", "Elder")
+GENDERS = ("Male", "Female", "Alien", "Other")
+
+# Small integer codes stored in place of the age/gender strings. Code 0 means
+# the value is not set.
+AGE_CODES = {age: code for code, age in enumerate(AGES, start=1)}
+GENDER_CODES = {gender: code for code, gender in enumerate(GENDERS, start=1)}
+
+# Case-insensitive lookup tables used to validate and normalize input values
+AGE_LOOKUP = {age.casefold(): age for age in AGES}
+GENDER_LOOKUP = {gender.casefold(): gender for gender in GENDERS}
+
+FIELDS = (
+    "id",
+    "name",
+    "age",
+    "gender",
+    "location",
+    "occupation",
+    "aspiration",
+    "cause_of_death",
+    "extra_information",
+    "father",
+    "mother",
+    "spouses",
+)
+
+# Short fields whose values repeat across many members (locations, parent
+# names, ...). These are interned so every member shares one string object.
+INTERNED_FIELDS = frozenset(
+    {
+        "name",
+        "location",
+        "occupation",
+        "aspiration",
+        "cause_of_death",
+        "father",
+        "mother",
+    }
+)
+
+
+def _intern(value):
+    """Intern strings, passing every other value through unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Member(MutableMapping):
+    """
+    Compact record for a single family member.
+
+    Fields live in ``__slots__`` instead of a per-member dict, age and gender
+    are stored as small integer codes and repeated strings are interned. The
+    record still behaves like the member dictionaries the GUI works with:
+    ``member["name"]``, ``member.get("age")``, ``member.copy()`` and
+    ``member.update(...)`` all work.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "age_code",
+        "gender_code",
+        "location",
+        "occupation",
+        "aspiration",
+        "cause_of_death",
+        "extra_information",
+        "father",
+        "mother",
+        "_spouses",
+    )
+
+    def __init__(
+        self,
+        id=None,
+        name=None,
+        age=None,
+        gender=None,
+        location=None,
+        occupation=None,
+        aspiration=None,
+        cause_of_death=None,
+        extra_information=None,
+        father=None,
+        mother=None,
+        spouses=None,
+    ):
+        # Slots are assigned directly here rather than through __setitem__,
+        # since members are created in bulk when a tree is loaded
+        self.id = id
+        self.name = _intern(name)
+        self.age_code = self._encode(age, AGE_LOOKUP, AGE_CODES, "Age")
+        self.gender_code = self._encode(gender, GENDER_LOOKUP, GENDER_CODES, "Gender")
+        self.location = _intern(location)
+        self.occupation = _intern(occupation)
+        self.aspiration = _intern(aspiration)
+        self.cause_of_death = _intern(cause_of_death)
+        self.extra_information = extra_information
+        self.father = _intern(father)
+        self.mother = _intern(mother)
+        self._spouses = tuple(map(_intern, spouses)) if spouses else ()
+
+    def __getitem__(self, field):
+        if field == "age":
+            return AGES[self.age_code - 1] if self.age_code else None
+        if field == "gender":
+            return GENDERS[self.gender_code - 1] if self.gender_code else None
+        if field == "spouses":
+            return list(self._spouses)
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field == "age":
+            self.age_code = self._encode(value, AGE_LOOKUP, AGE_CODES, "Age")
+        elif field == "gender":
+            self.gender_code = self._encode(
+                value, GENDER_LOOKUP, GENDER_CODES, "Gender"
+            )
+        elif field == "spouses":
+            self._spouses = tuple(_intern(spouse) for spouse in value or ())
+        elif field in INTERNED_FIELDS:
+            setattr(self, field, _intern(value))
+        elif field in FIELDS:
+            setattr(self, field, value)
+        else:
+            raise KeyError(field)
+
+    def __delitem__(self, field):
+        raise TypeError("Member fields cannot be removed")
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def __repr__(self):
+        return f"Member({self.to_dict()!r})"
+
+    def copy(self):
+        """Return the member as a plain dictionary."""
+        return self.to_dict()
+
+    def to_dict(self):
+        """Return the member as a plain, JSON-serializable dictionary."""
+        return {field: self[field] for field in FIELDS}
+
+    @staticmethod
+    def _encode(value, lookup, codes, label):
+        """Convert an age/gender string to its code, ignoring case; 0 is unset."""
+        if not value:
+            return 0
+        try:
+            return codes[lookup[value.casefold()]]
+        except (AttributeError, KeyError):
+            raise ValueError(f"{label} must be one of: {', '.join(codes)}") from None
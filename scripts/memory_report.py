@@ -0,0 +1,95 @@
+"""
+Compare the memory used by plain member dictionaries with compact Member
+records.
+
+Usage: python -m scripts.memory_report [members_file] [copies]
+"""
+
+import json
+import sys
+import tracemalloc
+
+from scripts.member import FIELDS, Member
+
+
+def _scaled_json(members_data, copies):
+    """
+    Build the JSON text of ``copies`` renamed copies of the members, so the
+    report can simulate large trees from the small sample data file.
+    """
+
+    def rename(name, copy):
+        return f"{name} #{copy}" if name else name
+
+    records = []
+    for copy in range(copies):
+        for member_data in members_data:
+            record = {field: member_data.get(field) for field in FIELDS}
+            record["id"] = copy * len(members_data) + (member_data.get("id") or 0)
+            for field in ("name", "father", "mother"):
+                record[field] = rename(record[field], copy)
+            record["spouses"] = [
+                rename(spouse, copy) for spouse in record["spouses"] or []
+            ]
+            records.append(record)
+    return json.dumps(records)
+
+
+def _traced_size(build, text):
+    """Return the memory still held by whatever ``build(text)`` returns."""
+    tracemalloc.start()
+    try:
+        result = build(text)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def _build_dicts(text):
+    return {record["id"]: record for record in json.loads(text)}
+
+
+def _build_members(text):
+    return {record["id"]: Member(**record) for record in json.loads(text)}
+
+
+def compare_member_memory(members_data, copies=1):
+    """
+    Measure both member representations for the given member data.
+
+    :param members_data: List of member dictionaries as stored in members.json
+    :param copies: How many renamed copies of the data to load
+    :return: Dictionary with the member count and bytes used by each representation
+    """
+    text = _scaled_json(members_data, copies)
+    return {
+        "members": len(members_data) * copies,
+        "dict_bytes": _traced_size(_build_dicts, text),
+        "member_bytes": _traced_size(_build_members, text),
+    }
+
+
+def print_memory_report(report):
+    """Print a report produced by compare_member_memory."""
+    count = max(report["members"], 1)
+    print(f"Members:        {report['members']:,}")
+    for label, key in (
+        ("dict records", "dict_bytes"),
+        ("Member records", "member_bytes"),
+    ):
+        size = report[key]
+        print(
+            f"{label + ':':<16}{size / 2**20:8.2f} MiB ({size // count:,} bytes/member)"
+        )
+    saved = 1 - report["member_bytes"] / max(report["dict_bytes"], 1)
+    print(f"Saved:          {saved:.1%}")
+
+
+if __name__ == "__main__":
+    members_file = sys.argv[1] if len(sys.argv) > 1 else "./data/members.json"
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    with open(members_file, "r") as f:
+        members_data = json.load(f)
+    print_memory_report(compare_member_memory(members_data, copies))
@@ -0,0 +1,123 @@
+import json
+import os
+import queue
+import threading
+import time
+
+
+def write_json_atomic(path, data):
+    """
+    Write JSON to ``path`` without ever leaving a half-written file behind.
+
+    The data is written and synced to a temporary file next to ``path``,
+    which then replaces ``path`` in a single rename.
+
+    :param path: Destination file
+    :param data: JSON-serializable data
+    """
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+
+def write_bytes_atomic(path, data, replace=os.replace):
+    """
+    Write binary data to ``path`` the same way write_json_atomic() does.
+
+    :param path: Destination file
+    :param data: Bytes-like object to write
+    :param replace: Function moving the finished temporary file over
+        ``path``, called like os.replace()
+    """
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    replace(temp_file, path)
+
+
+class PersistenceWorker(threading.Thread):
+    """
+    Background thread that runs file writes off the Tk main thread.
+
+    Submitted operations are collected until no new one has arrived for
+    ``delay`` seconds (or ``max_delay`` seconds have passed), then handed to
+    ``write`` as one batch so bursts of edits are coalesced into a single
+    write. ``on_complete`` is called from the worker thread after each batch
+    with the exception raised while writing, or None on success. The
+    operations of a batch that failed are written again, ahead of the newer
+    ones, with the next batch, so a passing error loses nothing.
+    """
+
+    _STOP = object()
+
+    def __init__(self, write, on_complete=None, delay=0.25, max_delay=2.0):
+        """
+        :param write: Function taking a list of submitted operations
+        :param on_complete: Function called with None or the exception raised
+        :param delay: Seconds without new operations before writing
+        :param max_delay: Longest time an operation waits during a burst
+        """
+        super().__init__(name="PersistenceWorker", daemon=True)
+        self.write = write
+        self.on_complete = on_complete
+        self.delay = delay
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.failed = []  # operations of the last batch that failed
+
+    def submit(self, operation):
+        """Queue an operation for the next batch."""
+        self.queue.put(operation)
+
+    def flush(self):
+        """Block until every submitted operation has been written."""
+        self.queue.join()
+
+    def stop(self):
+        """Write outstanding operations and stop the thread."""
+        self.queue.put(self._STOP)
+        self.join()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            operation = self.queue.get()
+            if operation is self._STOP:
+                self.queue.task_done()
+                break
+
+            # Debounce: keep collecting until the burst of edits is over
+            batch = [operation]
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                timeout = min(self.delay, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    operation = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if operation is self._STOP:
+                    stopping = True
+                    self.queue.task_done()
+                    break
+                batch.append(operation)
+
+            error = None
+            try:
+                self.write(self.failed + batch)
+                self.failed = []
+            except Exception as e:
+                error = e
+                self.failed += batch
+            try:
+                if self.on_complete:
+                    self.on_complete(error)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
@@ -0,0 +1,213 @@
+ORDINALS = (
+    "first",
+    "second",
+    "third",
+    "fourth",
+    "fifth",
+    "sixth",
+    "seventh",
+    "eighth",
+    "ninth",
+    "tenth",
+)
+TIMES = {1: "once", 2: "twice"}
+# Most "great-" prefixes written out; more read "3rd great-" and so on
+SPELLED_GREATS = 2
+
+# Relationship terms by the relative's gender: male, female, anything else
+TERMS = {
+    "parent": ("father", "mother", "parent"),
+    "child": ("son", "daughter", "child"),
+    "sibling": ("brother", "sister", "sibling"),
+    "parent's sibling": ("uncle", "aunt", "parent's sibling"),
+    "sibling's child": ("nephew", "niece", "sibling's child"),
+    "spouse": ("husband", "wife", "spouse"),
+}
+
+
+def _term(relation, gender):
+    """Return the word for a relation, matching the relative's gender."""
+    male, female, neutral = TERMS[relation]
+    return {"Male": male, "Female": female}.get(gender, neutral)
+
+
+def _greats(count):
+    """Return the "great-" prefixes for ``count`` extra generations."""
+    if count <= SPELLED_GREATS:
+        return "great-" * count
+    return f"{_numbered(count)} great-"
+
+
+def _numbered(number):
+    """Return "1st", "2nd", "3rd", "4th", ... for a positive number."""
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    if number % 100 in (11, 12, 13):
+        suffix = "th"
+    return f"{number}{suffix}"
+
+
+def _ordinal(number):
+    """Return "first", "second", ... for a positive number."""
+    return ORDINALS[number - 1] if number <= len(ORDINALS) else _numbered(number)
+
+
+def _may_descend(ancestry, member_id, ancestor_ids):
+    """
+    Check whether a member may descend from any of some members.
+
+    A descendant's intervals lie inside its ancestors', so a member whose
+    first interval lies inside none of theirs descends from none of them.
+    """
+    low, high = ancestry.intervals[member_id][0]
+    return any(
+        outer_low <= low and high <= outer_high
+        for outer_low, outer_high in (ancestry.intervals[i][0] for i in ancestor_ids)
+    )
+
+
+def _common_ancestor(ancestry, member_id, relative_id):
+    """
+    Find the common ancestor with the fewest generations to two members.
+
+    Both members' ancestors are walked a generation at a time, always
+    moving the side that is fewer generations up, until no ancestor left
+    unseen could be nearer than the best one found. Once one side runs out
+    of ancestors, only those can be common, so if the interval labels show
+    the other member descends from none of them the walk stops there.
+
+    :param ancestry: AncestryIndex of the tree
+    :param member_id: ID of the member
+    :param relative_id: ID of the relative
+    :return: (generations up from the member, generations up from the
+        relative) to the common ancestor, preferring the member's side
+        when several are as near; None if they have no common ancestor
+    """
+    seen = ({member_id: 0}, {relative_id: 0})
+    frontiers = [[member_id], [relative_id]]
+    levels = [0, 0]
+    best = None
+    ran_out = False
+    while frontiers[0] or frontiers[1]:
+        side = min((i for i in (0, 1) if frontiers[i]), key=levels.__getitem__)
+        # Common ancestors not found yet are at least this many
+        # generations away in total
+        if best is not None and levels[side] + 1 > best[0]:
+            break
+        own, other = seen[side], seen[1 - side]
+        if not frontiers[1 - side] and not ran_out:
+            ran_out = True
+            start_id = (member_id, relative_id)[side]
+            if best is None and not _may_descend(ancestry, start_id, other):
+                # None of the other side's ancestors can be common
+                break
+
+        levels[side] += 1
+        frontier = []
+        for child_id in frontiers[side]:
+            for parent_id in ancestry.parents.get(child_id, ()):
+                if parent_id in own:
+                    continue
+                own[parent_id] = levels[side]
+                frontier.append(parent_id)
+                if parent_id in other:
+                    up, down = seen[0][parent_id], seen[1][parent_id]
+                    if best is None or (up + down, up, down) < best:
+                        best = (up + down, up, down)
+        frontiers[side] = frontier
+    return best and best[1:]
+
+
+def _blood_relationship(ancestry, member_id, relative_id, gender):
+    """Describe a relationship through a lowest common ancestor, or None."""
+    found = _common_ancestor(ancestry, member_id, relative_id)
+    if found is None:
+        return None
+    up, down = found
+
+    if up == 0:
+        # The relative descends from the member
+        if down == 1:
+            return _term("child", gender)
+        return _greats(down - 2) + "grand" + _term("child", gender)
+    if down == 0:
+        if up == 1:
+            return _term("parent", gender)
+        return _greats(up - 2) + "grand" + _term("parent", gender)
+    if up == down == 1:
+        shared = set(ancestry.parents[member_id]) & set(ancestry.parents[relative_id])
+        both_known = (
+            len(ancestry.parents[member_id]) == len(ancestry.parents[relative_id]) == 2
+        )
+        half = "half-" if both_known and len(shared) == 1 else ""
+        return half + _term("sibling", gender)
+    if down == 1:
+        return _greats(up - 2) + _term("parent's sibling", gender)
+    if up == 1:
+        return _greats(down - 2) + _term("sibling's child", gender)
+
+    description = f"{_ordinal(min(up, down) - 1)} cousin"
+    removed = abs(up - down)
+    if removed:
+        description += f" {TIMES.get(removed, f'{removed} times')} removed"
+    return description
+
+
+def _relationship_by_marriage(family_tree, member_id, relative_id, gender):
+    """Describe a spouse, step or in-law relationship, or None."""
+    parents = family_tree.ancestry.parents
+    own_parents = parents.get(member_id, ())
+    relative_parents = parents.get(relative_id, ())
+    spouses = family_tree.get_spouses(member_id)
+    relative_spouses = family_tree.get_spouses(relative_id)
+
+    def are_siblings(a, b):
+        return bool(set(parents.get(a, ())) & set(parents.get(b, ())))
+
+    if relative_id in spouses:
+        return _term("spouse", gender)
+    if any(relative_id in family_tree.get_spouses(p) for p in own_parents):
+        return "step" + _term("parent", gender)
+    if any(member_id in family_tree.get_spouses(p) for p in relative_parents):
+        return "step" + _term("child", gender)
+    if any(
+        other in family_tree.get_spouses(own)
+        for own in own_parents
+        for other in relative_parents
+    ):
+        return "step" + _term("sibling", gender)
+    if any(relative_id in parents.get(spouse, ()) for spouse in spouses):
+        return _term("parent", gender) + "-in-law"
+    if any(member_id in parents.get(spouse, ()) for spouse in relative_spouses):
+        return _term("child", gender) + "-in-law"
+    if any(are_siblings(spouse, relative_id) for spouse in spouses) or any(
+        are_siblings(member_id, spouse) for spouse in relative_spouses
+    ):
+        return _term("sibling", gender) + "-in-law"
+    return None
+
+
+def describe_relationship(family_tree, member_id, relative_id):
+    """
+    Describe how one member is related to another.
+
+    Blood relationships are found through the lowest common ancestor of the
+    two members. Otherwise spouses, step-parents, step-children,
+    step-siblings and in-laws are checked through ``spouses``.
+
+    :param family_tree: FamilyTree containing both members
+    :param member_id: ID of the member the relationship is described from
+    :param relative_id: ID of the relative
+    :return: What the relative is to the member, for example "mother",
+        "half-brother", "second cousin twice removed" or "stepfather"; None
+        if they are not related or either member does not exist
+    """
+    if member_id == relative_id:
+        return None
+    relative = family_tree.get_member(relative_id)
+    if relative is None or family_tree.get_member(member_id) is None:
+        return None
+
+    gender = relative["gender"]
+    return _blood_relationship(
+        family_tree.ancestry, member_id, relative_id, gender
+    ) or _relationship_by_marriage(family_tree, member_id, relative_id, gender)
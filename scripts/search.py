@@ -0,0 +1,190 @@
+import heapq
+import re
+
+from utils.collation import fold
+from utils.sorted_list import SortedList
+
+# How much a word found in each field counts towards a member's score
+FIELD_WEIGHTS = {
+    "name": 4.0,
+    "occupation": 2.0,
+    "location": 2.0,
+    "aspiration": 1.5,
+    "cause_of_death": 1.5,
+    "extra_information": 1.0,
+}
+# Most words a search term is expanded to as a prefix
+MAX_PREFIX_WORDS = 64
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into case- and accent-folded words."""
+    return WORD.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """
+    Inverted index of the words in members' text fields.
+
+    Each word maps to the members whose name, location, occupation,
+    aspiration, cause of death or extra information contains it, grouped
+    by a weight for the fields it was found in. The words themselves are
+    kept in a SortedList, so the words starting with a prefix are one
+    binary search away. The index follows the tree's change notifications,
+    re-indexing only the member that changed.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to index; the index registers itself
+            as a listener
+        """
+        self.family_tree = family_tree
+        self.postings = {}  # word -> {weight: {member id: None}}
+        self.counts = {}  # word -> number of members with the word
+        self.member_words = {}  # member id -> {word: weight}
+        self.words = SortedList()
+
+        for member_id, fields in family_tree.member_fields(*FIELD_WEIGHTS):
+            self._index(member_id, fields)
+
+        family_tree.add_listener(self._on_change)
+
+    def search(self, query, limit=20, within=None):
+        """
+        Find the members matching every word of a query, best first.
+
+        Query words match whole words, or the start of longer words, and
+        score the weight of the field times how much of the word they
+        cover; a member's score is the sum of each query word's best match.
+        The query word matching the fewest members drives the search: its
+        weight groups are read best first and the other words only filter
+        those candidates, stopping once no unread group can beat the
+        results found so far.
+
+        :param query: Text to search for
+        :param limit: Most members to return
+        :param within: Set of member IDs to limit the search to, or None
+            to search every member
+        :return: List of member IDs, highest score first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        expansions = {term: self._expand(term) for term in terms}
+        if not all(expansions.values()):
+            return []
+
+        terms.sort(key=lambda term: sum(self.counts[w] for w in expansions[term]))
+        driver, others = terms[0], terms[1:]
+        groups = sorted(
+            (
+                (weight * len(driver) / len(word), word, weight)
+                for word in expansions[driver]
+                for weight in self.postings[word]
+            ),
+            reverse=True,
+        )
+        # The most the other query words can add to a member's score
+        others_best = sum(
+            max(
+                w * len(term) / len(word)
+                for word in expansions[term]
+                for w in self.postings[word]
+            )
+            for term in others
+        )
+        other_words = [dict.fromkeys(expansions[term]) for term in others]
+
+        best = []  # heap of (score, -member id) holding the top results
+        seen = set()
+        for group_score, word, weight in groups:
+            bound = group_score + others_best
+            if len(best) == limit and best[0][0] >= bound:
+                break
+            for member_id in self.postings[word][weight]:
+                if len(best) == limit and best[0][0] >= bound:
+                    break
+                # Groups are read best first, so this is the member's best
+                # match for the driving word
+                if member_id in seen:
+                    continue
+                seen.add(member_id)
+                if within is not None and member_id not in within:
+                    continue
+                score = group_score
+                words = self.member_words[member_id]
+                for term, matches in zip(others, other_words):
+                    term_score = max(
+                        (
+                            w * len(term) / len(word)
+                            for word, w in words.items()
+                            if word in matches
+                        ),
+                        default=0.0,
+                    )
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    item = (score, -member_id)
+                    if len(best) < limit:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+
+        return [-member_id for _, member_id in sorted(best, reverse=True)]
+
+    def close(self):
+        """Stop following changes to the tree."""
+        self.family_tree.remove_listener(self._on_change)
+
+    def _expand(self, term):
+        """Return the indexed words starting with ``term``."""
+        start = self.words.bisect_left(term)
+        words = []
+        for word in self.words[start : start + MAX_PREFIX_WORDS]:
+            if not word.startswith(term):
+                break
+            words.append(word)
+        return words
+
+    def _on_change(self, event, member_id, old, new):
+        """Re-index a member after an add, update or remove."""
+        if event == "update" and not FIELD_WEIGHTS.keys() & new.keys():
+            return
+        self._unindex(member_id)
+        if event != "remove":
+            self._index(member_id, self.family_tree.get_member(member_id))
+
+    def _index(self, member_id, member):
+        """Add a member's words to the index."""
+        words = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for word in tokenize(member[field]):
+                words[word] = words.get(word, 0.0) + weight
+        self.member_words[member_id] = words
+        for word, weight in words.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = {}
+                self.counts[word] = 0
+                self.words.add(word)
+            posting.setdefault(weight, {})[member_id] = None
+            self.counts[word] += 1
+
+    def _unindex(self, member_id):
+        """Remove a member's words from the index."""
+        for word, weight in self.member_words.pop(member_id, {}).items():
+            posting = self.postings[word]
+            group = posting[weight]
+            del group[member_id]
+            if not group:
+                del posting[weight]
+            self.counts[word] -= 1
+            if not self.counts[word]:
+                del self.postings[word]
+                del self.counts[word]
+                self.words.remove(word)
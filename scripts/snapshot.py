@@ -0,0 +1,464 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import MutableMapping
+
+from scripts.family_tree import FamilyTree, create_family_tree
+from scripts.member import AGE_CODES, AGES, GENDER_CODES, GENDERS, Member
+from scripts.persistence import write_bytes_atomic, write_json_atomic
+
+SNAPSHOT_EXTENSIONS = (".snap",)
+MAGIC = b"FTSNAP01"
+
+# A snapshot file is laid out as:
+#
+#   header | string offsets | member records | spouse references
+#          | name table | children table | spouse table | string data
+#
+# All integers are little-endian. Strings are stored once in the string data
+# and referred to by index; reference 0 means None. Member records are sorted
+# by ID, and the three tables hold (casefolded name, member ID) entries sorted
+# by name, so every lookup is a binary search over the mapped file.
+
+# Magic, then the number of strings, members, spouse references and entries
+# in the name, children and spouse tables
+HEADER = struct.Struct("<8s6I")
+# ID, references to the STRING_FIELDS, age and gender codes, and the first
+# index and count of the member's spouses in the spouse references
+RECORD = struct.Struct("<q8IBBII")
+OFFSET = struct.Struct("<I")
+ENTRY = struct.Struct("<Iq")
+
+STRING_FIELDS = (
+    "name",
+    "location",
+    "occupation",
+    "aspiration",
+    "cause_of_death",
+    "extra_information",
+    "father",
+    "mother",
+)
+
+# Lookup tables: members by name, children by parent name and members by the
+# name of a spouse they list
+NAMES, CHILDREN, SPOUSES = range(3)
+
+
+def write_snapshot(path, records, replace=os.replace):
+    """
+    Write member records to a binary snapshot file.
+
+    :param path: Destination file
+    :param records: Iterable of member dictionaries, as returned by
+        FamilyTree.to_records()
+    :param replace: Function moving the finished temporary file over
+        ``path``, called like os.replace()
+    """
+    strings = {}
+    offsets = [0, 0]
+    string_data = bytearray()
+
+    def reference(value):
+        if value is None:
+            return 0
+        value = str(value)
+        index = strings.get(value)
+        if index is None:
+            string_data.extend(value.encode("utf-8"))
+            offsets.append(len(string_data))
+            index = strings[value] = len(offsets) - 2
+        return index
+
+    member_records = []
+    spouse_references = []
+    tables = ([], [], [])
+    for record in sorted(records, key=lambda record: record["id"]):
+        member_id = record["id"]
+        spouses = [spouse for spouse in record.get("spouses") or () if spouse]
+        member_records.append(
+            RECORD.pack(
+                member_id,
+                *(reference(record.get(field)) for field in STRING_FIELDS),
+                AGE_CODES.get(record.get("age"), 0),
+                GENDER_CODES.get(record.get("gender"), 0),
+                len(spouse_references),
+                len(spouses),
+            )
+        )
+        spouse_references.extend(reference(spouse) for spouse in spouses)
+
+        tables[NAMES].append((record["name"].casefold(), member_id))
+        parents = {
+            p.casefold() for p in (record.get("father"), record.get("mother")) if p
+        }
+        tables[CHILDREN].extend((parent, member_id) for parent in parents)
+        listed = {spouse.casefold() for spouse in spouses}
+        tables[SPOUSES].extend((spouse, member_id) for spouse in listed)
+
+    packed_tables = [
+        b"".join(
+            ENTRY.pack(reference(key), member_id) for key, member_id in sorted(table)
+        )
+        for table in tables
+    ]
+    header = HEADER.pack(
+        MAGIC,
+        len(offsets) - 1,
+        len(member_records),
+        len(spouse_references),
+        *(len(table) for table in tables),
+    )
+    write_bytes_atomic(
+        path,
+        b"".join(
+            [
+                header,
+                struct.pack(f"<{len(offsets)}I", *offsets),
+                *member_records,
+                struct.pack(f"<{len(spouse_references)}I", *spouse_references),
+                *packed_tables,
+                string_data,
+            ]
+        ),
+        replace,
+    )
+
+
+class Snapshot:
+    """
+    Read-only view of a binary snapshot file through a memory map.
+
+    Opening a snapshot only reads its header; members and lookup table
+    entries are decoded from the mapped file when they are asked for.
+    replace() may run on another thread, so readers hold ``lock`` around
+    reads that must all see the same version of the file.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path to a file written by write_snapshot()
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self._open()
+
+    def _open(self):
+        """Map the file and read its header."""
+        path = self.path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a family tree snapshot: {path}")
+
+        _, string_count, self.member_count, spouse_count, *table_sizes = (
+            HEADER.unpack_from(self._map)
+        )
+        self._offsets = HEADER.size
+        self._records = self._offsets + (string_count + 1) * OFFSET.size
+        self._spouses = self._records + self.member_count * RECORD.size
+        self._tables = []
+        position = self._spouses + spouse_count * OFFSET.size
+        for size in table_sizes:
+            self._tables.append((position, size))
+            position += size * ENTRY.size
+        self._strings = position
+
+    def string(self, index):
+        """Return the string with the given reference."""
+        if not index:
+            return None
+        start, end = struct.unpack_from("<2I", self._map, self._offsets + index * 4)
+        return str(self._map[self._strings + start : self._strings + end], "utf-8")
+
+    def member_id(self, index):
+        """Return the ID of the member record at ``index``."""
+        offset = self._records + index * RECORD.size
+        return struct.unpack_from("<q", self._map, offset)[0]
+
+    def member(self, index):
+        """Decode the member record at ``index``."""
+        member_id, *references, age, gender, first, count = RECORD.unpack_from(
+            self._map, self._records + index * RECORD.size
+        )
+        spouses = struct.unpack_from(
+            f"<{count}I", self._map, self._spouses + first * OFFSET.size
+        )
+        return Member(
+            id=member_id,
+            age=AGES[age - 1] if age else None,
+            gender=GENDERS[gender - 1] if gender else None,
+            spouses=[self.string(spouse) for spouse in spouses],
+            **dict(zip(STRING_FIELDS, map(self.string, references))),
+        )
+
+    def find(self, member_id):
+        """Return the record index of a member ID, or None if it is missing."""
+        if not isinstance(member_id, int):
+            return None
+        low, high = 0, self.member_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.member_id(middle) < member_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.member_count and self.member_id(low) == member_id:
+            return low
+        return None
+
+    def max_id(self):
+        """Return the largest member ID, or 0 for an empty snapshot."""
+        return self.member_id(self.member_count - 1) if self.member_count else 0
+
+    def lookup(self, table, key):
+        """
+        Return the member IDs stored under a casefolded name in a table.
+
+        :param table: NAMES, CHILDREN or SPOUSES
+        :param key: Casefolded name
+        :return: List of member IDs in ID order
+        """
+        start, size = self._tables[table]
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            reference, _ = ENTRY.unpack_from(self._map, start + middle * ENTRY.size)
+            if self.string(reference) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        ids = []
+        for index in range(low, size):
+            reference, member_id = ENTRY.unpack_from(
+                self._map, start + index * ENTRY.size
+            )
+            if self.string(reference) != key:
+                break
+            ids.append(member_id)
+        return ids
+
+    def replace(self, source):
+        """
+        Move a newly written snapshot over the mapped file and map it.
+
+        Windows refuses to replace a file that is still mapped, so the
+        mapping is closed for the move and reopened afterwards, whether or
+        not the move succeeded.
+
+        :param source: Path of the new snapshot file
+        """
+        with self.lock:
+            self._map.close()
+            try:
+                os.replace(source, self.path)
+            finally:
+                self._open()
+
+    def close(self):
+        """Unmap the snapshot file."""
+        self._map.close()
+
+
+class SnapshotMembers(MutableMapping):
+    """
+    ``FamilyTree.members`` mapping over a Snapshot.
+
+    The snapshot itself is never modified: added and updated members are kept
+    in ``changed`` and removed IDs in ``removed``, both taking precedence over
+    the snapshot's records.
+    """
+
+    def __init__(self, snapshot):
+        """
+        :param snapshot: Open Snapshot
+        """
+        self.snapshot = snapshot
+        self.changed = {}
+        self.removed = set()
+
+    def shadows(self, member_id):
+        """Return whether the snapshot's record for an ID is out of date."""
+        return member_id in self.changed or member_id in self.removed
+
+    def __getitem__(self, member_id):
+        member = self.changed.get(member_id)
+        if member is not None:
+            return member
+        if member_id not in self.removed:
+            with self.snapshot.lock:
+                index = self.snapshot.find(member_id)
+                if index is not None:
+                    return self.snapshot.member(index)
+        raise KeyError(member_id)
+
+    def __setitem__(self, member_id, member):
+        self.changed[member_id] = member
+        self.removed.discard(member_id)
+
+    def __delitem__(self, member_id):
+        if member_id not in self:
+            raise KeyError(member_id)
+        self.changed.pop(member_id, None)
+        with self.snapshot.lock:
+            if self.snapshot.find(member_id) is not None:
+                self.removed.add(member_id)
+
+    def __contains__(self, member_id):
+        if member_id in self.changed:
+            return True
+        with self.snapshot.lock:
+            return (
+                member_id not in self.removed
+                and self.snapshot.find(member_id) is not None
+            )
+
+    def __iter__(self):
+        with self.snapshot.lock:
+            for index in range(self.snapshot.member_count):
+                member_id = self.snapshot.member_id(index)
+                if member_id not in self.removed:
+                    yield member_id
+            yield from self._added()
+
+    def __len__(self):
+        with self.snapshot.lock:
+            return (
+                self.snapshot.member_count
+                - len(self.removed)
+                + sum(1 for _ in self._added())
+            )
+
+    def values(self):
+        """Yield every member, decoding each snapshot record once."""
+        with self.snapshot.lock:
+            for index in range(self.snapshot.member_count):
+                member_id = self.snapshot.member_id(index)
+                if member_id in self.changed:
+                    yield self.changed[member_id]
+                elif member_id not in self.removed:
+                    yield self.snapshot.member(index)
+            for member_id in self._added():
+                yield self.changed[member_id]
+
+    def items(self):
+        """Yield ``(id, member)`` pairs, snapshot members first."""
+        return ((member.id, member) for member in self.values())
+
+    def _added(self):
+        """Yield the IDs of members that are not in the snapshot."""
+        return (i for i in self.changed if self.snapshot.find(i) is None)
+
+    def replace_snapshot(self, source):
+        """
+        Map a newer snapshot of the same tree in place of the current one.
+
+        Edits made since ``source`` was written keep shadowing its records,
+        and members it no longer holds stop counting as removed.
+
+        :param source: Path of the new snapshot file
+        """
+        with self.snapshot.lock:
+            self.snapshot.replace(source)
+            self.removed = {
+                i for i in self.removed if self.snapshot.find(i) is not None
+            }
+
+
+class SnapshotFamilyTree(FamilyTree):
+    """
+    FamilyTree opened from a binary snapshot with near-zero startup cost.
+
+    The snapshot is memory-mapped and members are decoded only when they are
+    read. Edits are kept in memory on top of the snapshot; journal them with
+    a MemberJournal to persist them. Compacting the journal into the mapped
+    file remaps it through write_snapshot(), which the journal may call from
+    its worker thread.
+    """
+
+    def __init__(self, snapshot_file):
+        """
+        :param snapshot_file: Path to a file written by write_snapshot()
+        """
+        super().__init__()
+        self.snapshot = Snapshot(snapshot_file)
+        self.members = SnapshotMembers(self.snapshot)
+        self.next_id = self.snapshot.max_id() + 1
+
+    def get_children_by_name(self, name):
+        return self._merge(CHILDREN, name, super().get_children_by_name(name))
+
+    def _ids_by_name(self, name):
+        return self._merge(NAMES, name, super()._ids_by_name(name))
+
+    def _spouse_ids_by_name(self, name):
+        return self._merge(SPOUSES, name, super()._spouse_ids_by_name(name))
+
+    def _relink(self, member_id, old_keys, new_keys):
+        if not self.members.shadows(member_id):
+            # First edit since the snapshot was opened: the member is only
+            # in the snapshot's tables so far
+            old_keys = {}
+        super()._relink(member_id, old_keys, new_keys)
+
+    def _merge(self, table, name, changed_ids):
+        """
+        Combine snapshot lookups with the in-memory indexes.
+
+        The in-memory indexes only hold members added or updated since the
+        snapshot was opened, so their snapshot entries are skipped. IDs are
+        returned lowest first, the order the tree resolves names in.
+        """
+        with self.snapshot.lock:
+            merged = [
+                member_id
+                for member_id in self.snapshot.lookup(table, name.casefold())
+                if not self.members.shadows(member_id)
+            ]
+        merged.extend(changed_ids)
+        return sorted(merged)
+
+    def write_snapshot(self, path, records):
+        """
+        Write member records to a binary snapshot file, remapping the
+        tree's own file when ``path`` is the one it was opened from.
+
+        :param path: Destination file
+        :param records: Iterable of member dictionaries, as returned by
+            FamilyTree.to_records()
+        """
+        if os.path.abspath(path) != os.path.abspath(self.snapshot.path):
+            write_snapshot(path, records)
+            return
+        write_snapshot(
+            path, records, lambda source, _: self.members.replace_snapshot(source)
+        )
+
+    def close(self):
+        """Unmap the snapshot file."""
+        self.snapshot.close()
+
+
+def convert(source, destination):
+    """
+    Convert between a binary snapshot and a members.json file.
+
+    :param source: Snapshot or members.json file to read
+    :param destination: members.json file or snapshot to write
+    """
+    if str(source).endswith(SNAPSHOT_EXTENSIONS):
+        family_tree = SnapshotFamilyTree(source)
+        write_json_atomic(destination, family_tree.to_records())
+        family_tree.close()
+    else:
+        write_snapshot(destination, create_family_tree(source).to_records())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m scripts.snapshot SOURCE DESTINATION")
+    convert(sys.argv[1], sys.argv[2])
@@ -0,0 +1,338 @@
+import sqlite3
+import sys
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+from scripts.family_tree import FamilyTree, load_member_data_from_json
+from scripts.member import Member
+from scripts.persistence import write_json_atomic
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# Member columns, in the order they are selected. The *_key columns hold the
+# casefolded names used for case-insensitive lookups; SQLite's NOCASE
+# collation only folds ASCII letters.
+COLUMNS = (
+    "id",
+    "name",
+    "age",
+    "gender",
+    "location",
+    "occupation",
+    "aspiration",
+    "cause_of_death",
+    "extra_information",
+    "father",
+    "mother",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    age TEXT,
+    gender TEXT,
+    location TEXT,
+    occupation TEXT,
+    aspiration TEXT,
+    cause_of_death TEXT,
+    extra_information TEXT,
+    father TEXT,
+    mother TEXT,
+    name_key TEXT NOT NULL,
+    father_key TEXT,
+    mother_key TEXT
+);
+CREATE TABLE IF NOT EXISTS spouses (
+    member_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    spouse TEXT NOT NULL,
+    spouse_key TEXT NOT NULL,
+    PRIMARY KEY (member_id, position)
+);
+CREATE INDEX IF NOT EXISTS members_name ON members (name_key);
+CREATE INDEX IF NOT EXISTS members_father ON members (father_key);
+CREATE INDEX IF NOT EXISTS members_mother ON members (mother_key);
+CREATE INDEX IF NOT EXISTS spouses_spouse ON spouses (spouse_key);
+"""
+
+
+def _key(name):
+    """Return the lookup key stored next to a name."""
+    return name.casefold() if name else None
+
+
+class SQLiteMembers(MutableMapping):
+    """
+    ``FamilyTree.members`` mapping backed by a SQLite database.
+
+    Members are read from the database when they are looked up, so nothing
+    is loaded up front. Every assignment or deletion is committed as its own
+    transaction unless it happens inside batch().
+    """
+
+    def __init__(self, connection):
+        """
+        :param connection: Open sqlite3 connection with the schema created
+        """
+        self.connection = connection
+        self._batch_depth = 0
+
+    def __getitem__(self, member_id):
+        row = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM members WHERE id = ?", (member_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(member_id)
+        spouses = [
+            spouse
+            for (spouse,) in self.connection.execute(
+                "SELECT spouse FROM spouses WHERE member_id = ? ORDER BY position",
+                (member_id,),
+            )
+        ]
+        return Member(*row, spouses=spouses)
+
+    def __setitem__(self, member_id, member):
+        with self.batch():
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO members ({', '.join(COLUMNS)}, name_key, "
+                f"father_key, mother_key) VALUES ({', '.join('?' * 14)})",
+                (
+                    *(member[column] for column in COLUMNS),
+                    _key(member["name"]),
+                    _key(member["father"]),
+                    _key(member["mother"]),
+                ),
+            )
+            self.connection.execute(
+                "DELETE FROM spouses WHERE member_id = ?", (member_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO spouses VALUES (?, ?, ?, ?)",
+                [
+                    (member_id, position, spouse, _key(spouse))
+                    for position, spouse in enumerate(member["spouses"])
+                ],
+            )
+
+    def __delitem__(self, member_id):
+        with self.batch():
+            cursor = self.connection.execute(
+                "DELETE FROM members WHERE id = ?", (member_id,)
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(member_id)
+            self.connection.execute(
+                "DELETE FROM spouses WHERE member_id = ?", (member_id,)
+            )
+
+    def __contains__(self, member_id):
+        row = self.connection.execute(
+            "SELECT 1 FROM members WHERE id = ?", (member_id,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        ids = self.connection.execute("SELECT id FROM members ORDER BY id").fetchall()
+        return (member_id for (member_id,) in ids)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def values(self):
+        """Yield every member using two table scans instead of one query each."""
+        members = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM members ORDER BY id"
+        )
+        spouses = self.connection.execute(
+            "SELECT member_id, spouse FROM spouses ORDER BY member_id, position"
+        )
+        spouse_row = next(spouses, None)
+        for row in members:
+            member_spouses = []
+            while spouse_row is not None and spouse_row[0] == row[0]:
+                member_spouses.append(spouse_row[1])
+                spouse_row = next(spouses, None)
+            yield Member(*row, spouses=member_spouses)
+
+    def items(self):
+        """Yield ``(id, member)`` pairs in ID order."""
+        return ((member.id, member) for member in self.values())
+
+    def max_id(self):
+        """Return the largest member ID, or 0 for an empty database."""
+        return self.connection.execute("SELECT MAX(id) FROM members").fetchone()[0] or 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Group writes into a single transaction.
+
+        Batches can be nested; the transaction is committed when the
+        outermost one finishes and rolled back if it raises.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._batch_depth == 1:
+                self.connection.rollback()
+            raise
+        else:
+            if self._batch_depth == 1:
+                self.connection.commit()
+        finally:
+            self._batch_depth -= 1
+
+
+class SQLiteFamilyTree(FamilyTree):
+    """
+    FamilyTree stored in a SQLite database instead of a members.json file.
+
+    The tree keeps no in-memory copy of its members or relationship indexes.
+    Lookups by name, parent and spouse are answered by indexed queries, so
+    opening a large database is instant and memory use stays flat. Edits
+    are checked for parent cycles with a recursive query until an ancestry
+    query builds the in-memory ancestry index. Each edit is committed as
+    one transaction.
+    """
+
+    def __init__(self, database_file):
+        """
+        :param database_file: Path to the SQLite database, created if missing
+        """
+        super().__init__()
+        self.database_file = database_file
+        self.connection = sqlite3.connect(database_file)
+        self.connection.executescript(SCHEMA)
+        self.members = SQLiteMembers(self.connection)
+        self.next_id = self.members.max_id() + 1
+
+    def add_members(self, records):
+        with self.members.batch():
+            return super().add_members(records)
+
+    def update_member(self, member_id, /, **changes):
+        with self.members.batch():
+            return super().update_member(member_id, **changes)
+
+    def remove_member(self, member_id):
+        # Clearing the removed member from children and spouses is part of
+        # the same transaction
+        with self.members.batch():
+            return super().remove_member(member_id)
+
+    def member_names(self):
+        rows = self.connection.execute("SELECT id, name FROM members ORDER BY id")
+        return iter(rows.fetchall())
+
+    def member_fields(self, *fields):
+        if not set(fields) <= set(COLUMNS):
+            # Spouses live in their own table
+            return super().member_fields(*fields)
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(fields)} FROM members ORDER BY id"
+        )
+        return ((row[0], dict(zip(fields, row[1:]))) for row in rows.fetchall())
+
+    def get_children_by_name(self, name):
+        key = name.casefold()
+        rows = self.connection.execute(
+            "SELECT id FROM members WHERE father_key = ? "
+            "UNION SELECT id FROM members WHERE mother_key = ? ORDER BY id",
+            (key, key),
+        )
+        return [member_id for (member_id,) in rows]
+
+    def is_ancestor(self, ancestor_id, member_id):
+        if self._ancestry is not None:
+            return super().is_ancestor(ancestor_id, member_id)
+        # Until the ancestry index is built, walk up from the member in the
+        # database, so checking an edit for cycles does not read every row
+        row = self.connection.execute(
+            """
+            WITH RECURSIVE ancestors(id) AS (
+                SELECT ?
+                UNION
+                SELECT parent.id FROM ancestors
+                JOIN members AS member ON member.id = ancestors.id
+                JOIN members AS parent
+                    ON parent.name_key IN (member.father_key, member.mother_key)
+                WHERE parent.id = (
+                    SELECT MIN(id) FROM members WHERE name_key = parent.name_key
+                )
+            )
+            SELECT 1 FROM ancestors WHERE id = ?
+            """,
+            (member_id, ancestor_id),
+        ).fetchone()
+        return row is not None and ancestor_id != member_id
+
+    def _ids_by_name(self, name):
+        rows = self.connection.execute(
+            "SELECT id FROM members WHERE name_key = ? ORDER BY id",
+            (name.casefold(),),
+        )
+        return [member_id for (member_id,) in rows]
+
+    def _spouse_ids_by_name(self, name):
+        rows = self.connection.execute(
+            "SELECT DISTINCT member_id FROM spouses WHERE spouse_key = ? "
+            "ORDER BY member_id",
+            (name.casefold(),),
+        )
+        return [member_id for (member_id,) in rows]
+
+    def _link(self, member_id, member):
+        # The indexes are part of the rows written to the database
+        pass
+
+    def _unlink(self, member_id, member):
+        pass
+
+    def _relink(self, member_id, old_keys, new_keys):
+        pass
+
+    def import_json(self, members_file):
+        """
+        Add every member from a members.json file in a single transaction.
+
+        :param members_file: Path to JSON file containing family member data
+        """
+        with self.members.batch():
+            load_member_data_from_json(self, members_file)
+
+    def export_json(self, members_file):
+        """
+        Write every member to a members.json file.
+
+        :param members_file: Destination path
+        """
+        write_json_atomic(members_file, self.to_records())
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+
+def convert(source, destination):
+    """
+    Convert between a members.json file and a SQLite database.
+
+    :param source: members.json file or SQLite database to read
+    :param destination: SQLite database or members.json file to write
+    """
+    if str(source).endswith(SQLITE_EXTENSIONS):
+        family_tree = SQLiteFamilyTree(source)
+        family_tree.export_json(destination)
+    else:
+        family_tree = SQLiteFamilyTree(destination)
+        family_tree.import_json(source)
+    family_tree.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m scripts.sqlite_store SOURCE DESTINATION")
+    convert(sys.argv[1], sys.argv[2])
@@ -0,0 +1,139 @@
+import heapq
+from itertools import islice
+
+from utils.collation import fold
+
+# Share of a typed name's trigrams a member's name must contain to match
+MIN_SIMILARITY = 0.6
+# Most postings read for one lookup; short or very common text stops here
+MAX_SCANNED = 10000
+# Most names scored for one lookup, taken from those sharing the most of
+# the rarest trigrams
+MAX_CANDIDATES = 500
+
+
+def trigrams(text, complete=True):
+    """
+    Split folded text into its overlapping three-letter pieces.
+
+    :param text: Text to split
+    :param complete: Whether the text is a whole name; typed text may stop
+        mid-word, so its end is not marked
+    :return: Set of trigrams
+    """
+    padded = "  " + " ".join(fold(text).split()) + (" " if complete else "")
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Index of member names by their trigrams, for typo-tolerant lookups.
+
+    Each distinct name (ignoring case) is split into trigrams once, and
+    each trigram maps to the names containing it. A typed name matches the
+    names sharing most of its trigrams, so a letter missed, swapped or
+    mistyped only loses the few trigrams around it. Only the names holding
+    one of the typed name's rarest trigrams are scored, and reading those
+    postings stops after MAX_SCANNED entries, so a lookup costs the same
+    on any size of tree; text made only of very common trigrams is
+    answered from the names read so far. The index follows the tree's
+    change notifications.
+    """
+
+    def __init__(self, family_tree):
+        """
+        :param family_tree: FamilyTree to index; the index registers itself
+            as a listener
+        """
+        self.family_tree = family_tree
+        self.postings = {}  # trigram -> {name key: None}
+        self.names = {}  # name key -> {member id: None}
+        self.name_trigrams = {}  # name key -> set of trigrams
+
+        for member_id, name in family_tree.member_names():
+            self._add(member_id, name)
+
+        family_tree.add_listener(self._on_change)
+
+    def match(self, text, limit=10):
+        """
+        Find the names most like some typed text.
+
+        :param text: Name, or the start of one, possibly misspelled
+        :param limit: Most names to return
+        :return: List of (similarity, name key) pairs, best first;
+            similarity is the share of the text's trigrams the name has
+        """
+        query = trigrams(text, complete=False)
+        if not text.strip() or limit <= 0:
+            return []
+        # A name sharing at least `needed` trigrams must have one of the
+        # len(query) - needed + 1 rarest ones
+        needed = max(1, round(MIN_SIMILARITY * len(query)))
+        rarest = sorted(query, key=lambda t: len(self.postings.get(t, ())))
+        hits = {}
+        scanned = 0
+        for trigram in rarest[: len(query) - needed + 1]:
+            posting = self.postings.get(trigram, ())
+            for key in islice(posting, MAX_SCANNED - scanned):
+                hits[key] = hits.get(key, 0) + 1
+            scanned += len(posting)
+            if scanned >= MAX_SCANNED:
+                break
+        candidates = hits
+        if len(hits) > MAX_CANDIDATES:
+            candidates = heapq.nlargest(MAX_CANDIDATES, hits, key=hits.get)
+
+        scored = []
+        for key in candidates:
+            shared = len(query & self.name_trigrams[key])
+            if shared >= needed:
+                # Shorter names win ties, so "Ben" comes before "Bennett"
+                scored.append((-shared / len(query), len(key), key))
+        scored.sort()
+        return [(-score, key) for score, _, key in scored[:limit]]
+
+    def member_ids(self, key):
+        """
+        Get the members with a name returned by match().
+
+        :param key: Name key
+        :return: List of member IDs
+        """
+        return list(self.names.get(key, ()))
+
+    def close(self):
+        """Stop following changes to the tree."""
+        self.family_tree.remove_listener(self._on_change)
+
+    def _on_change(self, event, member_id, old, new):
+        """Move a member between names after an add, rename or remove."""
+        if event == "update" and "name" not in new:
+            return
+        if event != "add":
+            self._remove(member_id, old["name"])
+        if event != "remove":
+            self._add(member_id, new["name"])
+
+    def _add(self, member_id, name):
+        key = name.casefold()
+        ids = self.names.get(key)
+        if ids is None:
+            ids = self.names[key] = {}
+            self.name_trigrams[key] = trigrams(name)
+            for trigram in self.name_trigrams[key]:
+                self.postings.setdefault(trigram, {})[key] = None
+        ids[member_id] = None
+
+    def _remove(self, member_id, name):
+        key = name.casefold()
+        ids = self.names[key]
+        del ids[member_id]
+        if ids:
+            return
+        del self.names[key]
+        for trigram in self.name_trigrams.pop(key):
+            posting = self.postings[trigram]
+            del posting[key]
+            if not posting:
+                del self.postings[trigram]
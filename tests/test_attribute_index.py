@@ -0,0 +1,95 @@
+import pytest
+
+from scripts.attribute_index import AttributeIndex
+from scripts.family_tree import FamilyTree
+
+
+@pytest.fixture
+def family_tree():
+    """Create members spread over a few towns, jobs and ages"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson", "age": "Elder", "location": "Newcrest"},
+            {
+                "id": 2,
+                "name": "Brooke Robertson",
+                "age": "Elder",
+                "gender": "Female",
+                "location": "Newcrest",
+                "occupation": "Doctor",
+            },
+            {
+                "id": 3,
+                "name": "Sage Robertson",
+                "age": "Adult",
+                "location": "Newcrest",
+                "occupation": "Doctor",
+                "cause_of_death": "Old Age",
+            },
+            {
+                "id": 4,
+                "name": "Mortimer Goth",
+                "age": "Elder",
+                "location": "Willow Creek",
+                "aspiration": "Nerd Brain",
+            },
+            {"id": 5, "name": "Nina Caliente", "occupation": "doctor"},
+        ]
+    )
+    return family_tree
+
+
+class TestAttributeIndex:
+    def test_conjunctive_queries(self, family_tree):
+        """Test that every filter must match, ignoring case"""
+        assert family_tree.query(age="Elder", location="Newcrest") == [1, 2]
+        assert family_tree.query(occupation="Doctor") == [2, 3, 5]
+        assert family_tree.query(age="elder", occupation="DOCTOR") == [2]
+        assert family_tree.query(gender="female", age="Adult") == []
+        assert family_tree.query(location="Oasis Springs") == []
+        assert family_tree.query() == [1, 2, 3, 4, 5]
+
+    def test_field_is_set(self, family_tree):
+        """Test that True matches any value in a field"""
+        assert family_tree.query(cause_of_death=True) == [3]
+        assert family_tree.query(aspiration=True, age="Elder") == [4]
+
+    def test_unknown_field(self, family_tree):
+        """Test that filtering on a field without an index is rejected"""
+        with pytest.raises(ValueError, match="Cannot filter on name"):
+            family_tree.query(name="Ben Robertson")
+
+    def test_starts_from_the_most_selective_index(self, family_tree):
+        """Test that only the smallest ID set is walked"""
+        index = AttributeIndex(family_tree)
+        walked = []
+
+        class Recording(dict):
+            def __iter__(self):
+                walked.append(len(self))
+                return super().__iter__()
+
+        index.has_value["cause_of_death"] = Recording(index.has_value["cause_of_death"])
+        index.values["location"]["newcrest"] = Recording(
+            index.values["location"]["newcrest"]
+        )
+        assert index.query(location="Newcrest", cause_of_death=True) == [3]
+        assert walked == [1]
+
+    def test_edits_update_the_index(self, family_tree):
+        """Test that adds, updates and removals move members between values"""
+        index = family_tree.attribute_index
+
+        family_tree.add_member(id=6, name="Bella Goth", location="Newcrest")
+        family_tree.update_member(1, location="Willow Creek", cause_of_death="Fire")
+        family_tree.update_member(3, cause_of_death=None)
+        family_tree.remove_member(2)
+
+        assert family_tree.query(location="Newcrest") == [3, 6]
+        assert family_tree.query(location="Willow Creek") == [1, 4]
+        assert family_tree.query(cause_of_death=True) == [1]
+        assert family_tree.query(cause_of_death="fire") == [1]
+        assert "old age" not in index.values["cause_of_death"]
+        assert index.choices("occupation") == ["Doctor"]
+        assert index.choices("location") == ["Newcrest", "Willow Creek"]
@@ -0,0 +1,528 @@
+import json
+import random
+
+import pytest
+
+from scripts.family_tree import (
+    FamilyTree,
+    create_family_tree,
+    iter_member_records,
+    stream_member_data_from_json,
+)
+from utils.validate import validate_parent
+
+
+@pytest.fixture
+def family_tree():
+    """Create a small three-generation family tree"""
+    family_tree = FamilyTree()
+    family_tree.add_member(id=1, name="Ben Robertson", gender="Male")
+    family_tree.add_member(
+        id=2, name="Brooke Robertson", gender="Female", spouses=["Ben Robertson"]
+    )
+    family_tree.add_member(
+        id=3, name="Sage Robertson", father="Ben Robertson", mother="Brooke Robertson"
+    )
+    family_tree.add_member(
+        id=4, name="Leo Robertson", father="Ben Robertson", mother="Brooke Robertson"
+    )
+    return family_tree
+
+
+class TestMemberStore:
+    def test_members_are_keyed_by_id(self, family_tree):
+        """Test that members with the same name no longer overwrite each other"""
+        member_id = family_tree.add_member(name="Leo Robertson")
+
+        assert member_id == 5
+        assert family_tree.get_member(4)["name"] == "Leo Robertson"
+        assert family_tree.get_member(5)["name"] == "Leo Robertson"
+        assert len(family_tree.find_members("leo robertson")) == 2
+
+    def test_id_allocator_skips_explicit_ids(self, family_tree):
+        """Test that allocated IDs never collide with explicitly set ones"""
+        family_tree.add_member(id=10, name="Jamie Fraser")
+
+        assert family_tree.next_id == 11
+        assert family_tree.add_member(name="Joanie Fraser") == 11
+
+    def test_duplicate_id_is_rejected(self, family_tree):
+        """Test that adding a member with a used ID raises an error"""
+        with pytest.raises(ValueError, match="ID 1 already exists"):
+            family_tree.add_member(id=1, name="Someone Else")
+
+    def test_id_cannot_be_changed(self, family_tree):
+        """Test that update_member refuses to change a member's ID"""
+        with pytest.raises(ValueError, match="cannot be changed"):
+            family_tree.update_member(1, id=7)
+
+
+class TestRelationshipIndex:
+    def test_edits_keep_name_resolution(self):
+        """Test that editing a member keeps which member a shared name means"""
+        family_tree = FamilyTree()
+        family_tree.add_member(id=1, name="Ann")
+        family_tree.add_member(id=2, name="Ann")
+        family_tree.add_member(id=3, name="Bo", mother="Ann")
+        assert family_tree.ancestors(3) == [1]
+
+        family_tree.update_member(1, location="Newcrest")
+        family_tree.update_member(1, father="Cy", spouses=["Dee"])
+        assert family_tree.find_member("Ann")["id"] == 1
+        assert family_tree.ancestors(3) == [1]
+        assert family_tree._ids_by_name("Ann") == [1, 2]
+
+        family_tree.update_member(1, name="Ann Goth")
+        assert family_tree.find_member("Ann")["id"] == 2
+        assert family_tree.ancestors(3) == [2]
+
+    def test_shared_names_resolve_to_the_lowest_id(self, tmp_path):
+        """Test that a shared name means the same member after a reload"""
+        family_tree = FamilyTree()
+        family_tree.add_member(id=1, name="Ann")
+        family_tree.add_member(id=2, name="Ann")
+        family_tree.add_member(id=3, name="Kit", father="Ann")
+        family_tree.update_member(1, name="Cat")
+        assert family_tree.ancestors(3) == [2]
+
+        family_tree.update_member(1, name="Ann")
+        assert family_tree.find_member("Ann")["id"] == 1
+        assert family_tree.ancestors(3) == [1]
+
+        path = tmp_path / "members.json"
+        path.write_text(json.dumps(family_tree.to_records()))
+        assert create_family_tree(path).ancestors(3) == [1]
+
+    def test_taking_a_name_closing_cycle_is_refused(self):
+        """Test that a namesake with a lower ID cannot take over their own parent"""
+        family_tree = FamilyTree()
+        family_tree.add_member(id=5, name="Ann")
+        family_tree.add_member(id=6, name="Bo", father="Ann")
+        family_tree.add_member(id=3, name="Cy")
+
+        with pytest.raises(ValueError, match="Father would make Ann their own"):
+            family_tree.add_member(id=1, name="Ann", father="Bo")
+        with pytest.raises(ValueError, match="Father would make Ann their own"):
+            family_tree.update_member(3, name="Ann", father="Bo")
+        family_tree.add_member(id=8, name="Ann", father="Bo")
+        assert family_tree.ancestors(6) == [5]
+
+    def test_children_are_indexed_on_add(self, family_tree):
+        """Test that children can be looked up from either parent"""
+        assert family_tree.get_children(1) == [3, 4]
+        assert family_tree.get_children(2) == [3, 4]
+        assert family_tree.get_children(4) == []
+
+    def test_children_resolve_forward_references(self):
+        """Test that children added before their parent are found later"""
+        family_tree = FamilyTree()
+        family_tree.add_member(id=1, name="Sage Robertson", father="Ben Robertson")
+        family_tree.add_member(id=2, name="Ben Robertson")
+
+        assert family_tree.get_children(2) == [1]
+
+    def test_spouses_include_reverse_links(self, family_tree):
+        """Test that a spouse listed on one side is visible from both"""
+        assert family_tree.get_spouses(2) == [1]
+        assert family_tree.get_spouses(1) == [2]
+
+    def test_update_member_moves_child_between_parents(self, family_tree):
+        """Test that changing a parent updates the children index"""
+        family_tree.add_member(id=5, name="Jamie Fraser", gender="Male")
+        family_tree.update_member(4, father="Jamie Fraser")
+
+        assert family_tree.get_children(1) == [3]
+        assert family_tree.get_children(5) == [4]
+
+    def test_remove_member_clears_links(self, family_tree):
+        """Test that removing a parent clears their children's parent fields"""
+        family_tree.remove_member(1)
+
+        assert family_tree.get_member(3)["father"] is None
+        assert family_tree.get_member(2)["spouses"] == []
+        assert family_tree.get_children_by_name("Ben Robertson") == []
+        assert family_tree.get_children(2) == [3, 4]
+
+    def test_print_family_tree_lists_children(self, family_tree, capsys):
+        """Test that printing the tree includes indexed children"""
+        family_tree.print_family_tree()
+
+        assert "Child: Leo Robertson" in capsys.readouterr().out
+
+
+class TestNameIndex:
+    def test_find_member_ignores_case(self, family_tree):
+        """Test that members can be found regardless of letter case"""
+        assert family_tree.find_member("ben ROBERTSON")["id"] == 1
+        assert family_tree.find_member("Nobody") is None
+
+    def test_name_index_follows_rename_and_removal(self, family_tree):
+        """Test that the name index is kept in sync with edits"""
+        family_tree.update_member(3, name="Sage Fraser")
+        family_tree.remove_member(4)
+
+        assert family_tree.find_member("sage fraser")["id"] == 3
+        assert family_tree.find_member("sage robertson") is None
+        assert family_tree.find_member("leo robertson") is None
+
+    def test_validate_parent_uses_name_index(self, family_tree):
+        """Test parent validation against the case-insensitive index"""
+        assert validate_parent("brooke robertson", family_tree)
+        assert validate_parent("", family_tree)
+        assert not validate_parent("Mortimer Goth", family_tree)
+
+
+class TestStreamingLoader:
+    @pytest.fixture
+    def members_file(self, tmp_path):
+        """Write a members file where children come before their parents"""
+        members = [
+            {"id": 3, "name": "Sage Robertson", "father": "Ben Robertson"},
+            {"id": 1, "name": "Ben Robertson", "spouses": ["Brooke Robertson"]},
+            {"id": 2, "name": "Brooke Robertson", "extra_information": "x" * 500},
+        ]
+        path = tmp_path / "members.json"
+        path.write_text(json.dumps(members, indent=4))
+        return path
+
+    def test_records_span_chunks(self, members_file):
+        """Test that records split across read chunks are parsed whole"""
+        records = list(iter_member_records(members_file, chunk_size=7))
+
+        assert [record["id"] for record in records] == [3, 1, 2]
+        assert records[2]["extra_information"] == "x" * 500
+
+    def test_forward_references_resolve_in_one_pass(self, members_file):
+        """Test that parents and spouses listed later in the file are linked"""
+        family_tree = create_family_tree(members_file)
+
+        assert family_tree.get_children(1) == [3]
+        assert family_tree.get_spouses(2) == [1]
+
+    def test_members_usable_before_file_is_parsed(self, members_file):
+        """Test that members can be read while loading is still in progress"""
+        family_tree = FamilyTree()
+        loader = stream_member_data_from_json(family_tree, members_file, batch_size=1)
+
+        assert next(loader) == 3
+        assert family_tree.get_member(3)["father"] == "Ben Robertson"
+        assert 1 not in family_tree.members
+
+    def test_invalid_json_is_reported(self, tmp_path):
+        """Test that truncated files raise a ValueError"""
+        path = tmp_path / "members.json"
+        path.write_text('[{"id": 1, "name": "Ben')
+
+        with pytest.raises(ValueError, match="Invalid JSON format"):
+            create_family_tree(path)
+
+    def test_non_list_is_rejected(self, tmp_path):
+        """Test that a JSON object at the top level is rejected"""
+        path = tmp_path / "members.json"
+        path.write_text('{"id": 1}')
+
+        with pytest.raises(ValueError, match="must contain a list"):
+            create_family_tree(path)
+
+
+class TestBulkAdd:
+    def test_add_members_reports_errors_by_row(self):
+        """Test that invalid rows are skipped and reported with their field"""
+        family_tree = FamilyTree()
+        added, errors = family_tree.add_members(
+            [
+                {"id": 1, "name": "Ben Robertson", "gender": "male"},
+                {"id": 2, "name": "Brooke Robertson", "age": "Ancient"},
+                {"name": ""},
+                {"id": 1, "name": "Duplicate"},
+                {"id": "x", "name": "Bad ID"},
+            ]
+        )
+
+        assert added == [1]
+        assert family_tree.get_member(1)["gender"] == "Male"
+        assert [(error.row, error.field) for error in errors] == [
+            (1, "age"),
+            (2, "name"),
+            (3, "id"),
+            (4, "id"),
+        ]
+        assert errors[0].reason.startswith("Age must be one of")
+
+    def test_ids_are_allocated_after_explicit_ones(self):
+        """Test that rows without an ID never take an ID used later in the batch"""
+        family_tree = FamilyTree()
+        added, errors = family_tree.add_members(
+            [{"name": "No ID"}, {"id": 1, "name": "Explicit ID"}]
+        )
+
+        assert errors == []
+        assert sorted(added) == [1, 2]
+        assert family_tree.get_member(2)["name"] == "No ID"
+
+    def test_add_member_raises_first_error(self):
+        """Test that the single-member API still raises ValueError"""
+        family_tree = FamilyTree()
+
+        with pytest.raises(ValueError, match="Gender must be one of"):
+            family_tree.add_member(name="Ben Robertson", gender="Robot")
+
+
+class TestAncestry:
+    @pytest.fixture
+    def legacy(self, family_tree):
+        """Add a third and fourth generation below Sage Robertson"""
+        family_tree.add_member(id=5, name="Jamie Robertson", father="Sage Robertson")
+        family_tree.add_member(id=6, name="Joanie Robertson", mother="Jamie Robertson")
+        return family_tree
+
+    def test_ancestors_and_descendants(self, legacy):
+        """Test that queries follow every generation through both parents"""
+        assert sorted(legacy.ancestors(6)) == [1, 2, 3, 5]
+        assert legacy.descendants(2) == [3, 4, 5, 6]
+        assert legacy.is_ancestor(1, 6)
+        assert not legacy.is_ancestor(4, 6)
+        assert not legacy.is_ancestor(6, 1)
+
+    def test_labels_follow_parent_changes(self, legacy):
+        """Test that changing a parent relabels the whole subtree"""
+        legacy.ancestors(6)
+        legacy.update_member(5, father="Leo Robertson")
+
+        assert legacy.is_ancestor(4, 6)
+        assert not legacy.is_ancestor(3, 6)
+        assert legacy.descendants(3) == []
+
+    def test_labels_follow_adds_renames_and_removals(self, legacy):
+        """Test that name-based links are re-resolved after edits"""
+        legacy.ancestors(6)
+        legacy.add_member(id=7, name="Mortimer Goth")
+        legacy.update_member(1, father="Mortimer Goth")
+        assert legacy.is_ancestor(7, 6)
+
+        legacy.update_member(3, name="Sage Fraser")
+        assert not legacy.is_ancestor(1, 5)
+
+        legacy.add_member(id=8, name="Sage Robertson")
+        assert legacy.ancestors(6) == [5, 8]
+
+        legacy.remove_member(5)
+        assert legacy.ancestors(6) == []
+        assert legacy.descendants(8) == []
+
+    def test_matches_a_full_search(self):
+        """Test that interval labels agree with walking every parent link"""
+        rng = random.Random(5)
+        family_tree = FamilyTree()
+        family_tree.add_members(
+            [
+                {
+                    "id": member_id,
+                    "name": f"Sim {member_id}",
+                    "father": f"Sim {rng.randrange(1, member_id)}"
+                    if member_id > 1
+                    else None,
+                    "mother": f"Sim {rng.randrange(1, member_id)}"
+                    if member_id > 2
+                    else None,
+                }
+                for member_id in range(1, 81)
+            ]
+        )
+        index = family_tree.ancestry
+        # Reattaching members widens labels until they are rebuilt
+        for member_id in range(40, 81):
+            family_tree.update_member(member_id, mother=f"Sim {rng.randrange(1, 40)}")
+        family_tree.add_member(id=81, name="Sim 81", father="Sim 80")
+
+        for member_id in family_tree.members:
+            expected = set()
+            stack = [member_id]
+            while stack:
+                for parent_id in index.parents.get(stack.pop(), ()):
+                    if parent_id not in expected:
+                        expected.add(parent_id)
+                        stack.append(parent_id)
+            assert set(family_tree.ancestors(member_id)) == expected
+            for other_id in family_tree.members:
+                assert family_tree.is_ancestor(other_id, member_id) == (
+                    other_id in expected
+                )
+
+
+class TestGenerations:
+    def test_depths_and_topological_order(self, family_tree):
+        """Test that every member comes after their parents"""
+        family_tree.add_member(id=5, name="Jamie Robertson", father="Sage Robertson")
+
+        assert [family_tree.generation(i) for i in range(1, 6)] == [0, 0, 1, 1, 2]
+        order = family_tree.topological_order()
+        assert sorted(order) == [1, 2, 3, 4, 5]
+        assert order.index(3) < order.index(5)
+        assert order.index(1) < order.index(3)
+
+    def test_depths_follow_parent_changes(self, family_tree):
+        """Test that moving a subtree updates every depth below it"""
+        family_tree.add_member(id=5, name="Jamie Robertson", father="Sage Robertson")
+        family_tree.update_member(3, father=None, mother=None)
+
+        assert family_tree.generation(3) == 0
+        assert family_tree.generation(5) == 1
+
+        family_tree.remove_member(5)
+        assert family_tree.generation(5) is None
+
+    def test_update_creating_cycle_is_rejected(self, family_tree):
+        """Test that nobody can become their own grandparent"""
+        family_tree.add_member(id=5, name="Jamie Robertson", father="Sage Robertson")
+
+        with pytest.raises(ValueError, match="Ben Robertson their own ancestor"):
+            family_tree.update_member(1, father="Jamie Robertson")
+        with pytest.raises(ValueError, match="their own ancestor"):
+            family_tree.update_member(3, mother="Sage Robertson")
+        assert family_tree.get_member(1)["father"] is None
+        assert family_tree.is_ancestor(1, 5)
+
+    def test_add_closing_cycle_is_reported(self):
+        """Test that a forward reference completing a loop loses that link"""
+        family_tree = FamilyTree()
+        added, errors = family_tree.add_members(
+            [
+                {"id": 1, "name": "Ben Robertson", "father": "Leo Robertson"},
+                {"id": 2, "name": "Leo Robertson", "father": "Ben Robertson"},
+                {"id": 3, "name": "Sage Robertson", "mother": "Sage Robertson"},
+            ]
+        )
+
+        # Every record is kept, without the links that close the loops
+        assert added == [1, 2, 3]
+        assert [(error.row, error.field) for error in errors] == [
+            (1, "father"),
+            (2, "mother"),
+        ]
+        assert not any(error.skipped for error in errors)
+        assert errors[0].reason == (
+            "Father would make Leo Robertson their own ancestor; the link was removed"
+        )
+        assert family_tree.get_member(1)["father"] == "Leo Robertson"
+        assert family_tree.get_member(2)["father"] is None
+        assert family_tree.get_member(3)["mother"] is None
+        assert family_tree.ancestors(1) == [2]
+
+    def test_add_closing_cycle_with_index_built(self):
+        """Test that batches checked against a built index keep their records"""
+        family_tree = FamilyTree()
+        family_tree.add_member(id=1, name="Ann Goth", father="Zed Goth")
+        assert family_tree.ancestors(1) == []
+
+        added, errors = family_tree.add_members(
+            [{"id": 2, "name": "Zed Goth", "father": "Ann Goth"}]
+        )
+
+        assert added == [2]
+        assert [(error.row, error.field) for error in errors] == [(0, "father")]
+        assert family_tree.get_member(2)["father"] is None
+        assert family_tree.ancestors(1) == [2]
+
+    def test_cycle_search_covers_the_finished_walk(self):
+        """Test that a loop is found when ancestors run out before descendants"""
+        family_tree = FamilyTree()
+        family_tree.add_members(
+            [{"name": f"Child {i}", "father": "Xan Goth"} for i in range(5)]
+            + [
+                {"name": "Pat Goth", "mother": "Xan Goth"},
+                {"name": "Quin Goth", "father": "Pat Goth"},
+            ]
+        )
+
+        added, errors = family_tree.add_members(
+            [{"name": "Xan Goth", "father": "Quin Goth"}]
+        )
+
+        assert [(error.row, error.field) for error in errors] == [(0, "father")]
+        assert family_tree.get_member(added[0])["father"] is None
+
+    def test_batch_loads_never_leave_cycles(self):
+        """Test that random batches sharing names never leave anyone their own ancestor"""
+        rng = random.Random(3)
+        names = [f"Sim {i}" for i in range(12)]
+        for trial in range(60):
+            family_tree = FamilyTree()
+            if trial % 2:
+                # Check the batches against a built index as well
+                assert family_tree.ancestry is not None
+            ids = rng.sample(range(1, 200), 80)
+            for _ in range(3):
+                family_tree.add_members(
+                    [
+                        {
+                            "id": ids.pop() if rng.random() < 0.5 else None,
+                            "name": rng.choice(names),
+                            "father": rng.choice(names),
+                            "mother": rng.choice([*names, None]),
+                        }
+                        for _ in range(rng.randint(1, 25))
+                    ]
+                )
+
+            for member_id in family_tree.members:
+                ancestors = set()
+                stack = [member_id]
+                while stack:
+                    member = family_tree.get_member(stack.pop())
+                    for field in ("father", "mother"):
+                        parent = family_tree.find_member(member[field] or "")
+                        if parent is None or parent["id"] == member["id"]:
+                            continue
+                        if parent["id"] not in ancestors:
+                            ancestors.add(parent["id"])
+                            stack.append(parent["id"])
+                assert member_id not in ancestors
+
+    def test_add_member_closing_cycle_is_refused(self, family_tree):
+        """Test that a single interactive add is refused rather than changed"""
+        with pytest.raises(ValueError, match="their own ancestor"):
+            family_tree.add_member(id=5, name="Jamie Goth", father="Jamie Goth")
+        assert 5 not in family_tree.members
+
+    def test_giving_up_a_name_closing_cycle_is_refused(self, family_tree):
+        """Test that children cannot pass to a namesake who descends from them"""
+        family_tree.add_member(id=5, name="Ben Robertson", father="Sage Robertson")
+
+        with pytest.raises(ValueError, match="Renaming Ben Robertson would make"):
+            family_tree.update_member(1, name="Ben Fraser")
+        with pytest.raises(ValueError, match="Removing Ben Robertson would make"):
+            family_tree.remove_member(1)
+        assert family_tree.ancestors(3) == [1, 2]
+
+        family_tree.update_member(5, father=None)
+        family_tree.remove_member(1)
+        assert family_tree.ancestors(3) == [2, 5]
+
+    def test_load_order_does_not_matter(self, tmp_path):
+        """Test that loading children before their parents finds the same cycles"""
+        records = [
+            {"id": 3, "name": "Sage Robertson", "father": "Ben Robertson"},
+            {"id": 1, "name": "Ben Robertson", "father": "Sage Robertson"},
+            {"id": 2, "name": "Brooke Robertson"},
+        ]
+        path = tmp_path / "members.json"
+        path.write_text(json.dumps(records))
+
+        family_tree = create_family_tree(path)
+
+        assert sorted(family_tree.members) == [1, 2, 3]
+        assert family_tree.get_member(3)["father"] == "Ben Robertson"
+        assert family_tree.get_member(1)["father"] is None
+        order = family_tree.topological_order()
+        assert order.index(1) < order.index(3)
+
+    def test_neighborhood_stops_at_depth_and_limit(self, family_tree):
+        """Test that the neighborhood takes the nearest generations first"""
+        family_tree.add_member(id=5, name="Jamie Robertson", father="Sage Robertson")
+        family_tree.add_member(id=6, name="Nina Caliente", spouses=["Sage Robertson"])
+
+        assert family_tree.neighborhood(3, generations=1) == [3, 6, 1, 2, 5]
+        assert family_tree.neighborhood(3, generations=1, limit=3) == [3, 6, 1]
+        assert sorted(family_tree.neighborhood(5, generations=2)) == [1, 2, 3, 5, 6]
+        assert family_tree.neighborhood(99) == []
@@ -1,29 +1,43 @@
+import json
+import os
+import threading
 import pytest
 import tkinter as tk
 from unittest.mock import Mock, patch, mock_open
 from gui.main_window import FamilyTreeUI
+from gui.member_list import VirtualListbox
 from gui.add_member_dialog import AddMemberDialog
 from gui.member_details_frame import MemberDetailsFrame
+from gui.tree_visualizer import BackgroundRenderer, FamilyTreeVisualization, RenderCache
+from scripts.family_tree import FamilyTree
+from scripts.journal import MemberJournal
+from utils.sorted_list import SortedList
 
 
 @pytest.fixture
-def sample_family_tree():
-    """Create a mock family tree with sample data"""
-    return {
-        "1": {
-            "id": 1,
-            "name": "Test Person",
-            "age": "Child",
-            "gender": "Male",
-            "location": "Test City",
-            "occupation": "Tester",
-            "aspiration": "Write tests",
-            "extra_information": "Loves testing",
-            "father": None,
-            "mother": None,
-            "spouses": [],
-        }
-    }
+def sample_family_tree(tmp_path):
+    """Create a journaled family tree with sample data"""
+    family_tree = FamilyTree()
+    family_tree.add_member(
+        id=1,
+        name="Test Person",
+        age="Child",
+        gender="Male",
+        location="Test City",
+        occupation="Tester",
+        aspiration="Write tests",
+        extra_information="Loves testing",
+    )
+    MemberJournal(tmp_path / "members.json").attach(family_tree)
+    yield family_tree
+    family_tree.journal.close()
+
+
+def read_journal(family_tree):
+    """Return the entries appended to the tree's journal so far"""
+    family_tree.journal.flush()
+    with open(family_tree.journal.journal_file, "r") as f:
+        return [json.loads(line) for line in f]
 
 
 @pytest.fixture
@@ -69,16 +83,14 @@ class TestMemberDetailsFrame:
     def details_frame(self, mock_tk, sample_family_tree):
         """Create a MemberDetailsFrame instance with mocked Tkinter"""
         mock_save_callback = Mock()
-        mock_family_tree = Mock()
-        mock_family_tree.members = sample_family_tree
 
         with patch("tkinter.ttk.Entry"), patch("tkinter.ttk.Combobox"), patch(
             "tkinter.ttk.Button"
         ), patch("tkinter.ttk.Label"), patch("tkinter.ttk.Frame"), patch(
             "tkinter.ttk.LabelFrame"
         ), patch("tkinter.ttk.Style"):
-            frame = MemberDetailsFrame(mock_tk, mock_family_tree, mock_save_callback)
-            frame.current_member_id = "1"
+            frame = MemberDetailsFrame(mock_tk, sample_family_tree, mock_save_callback)
+            frame.current_member_id = 1
             return frame
 
     def test_update_details(self, details_frame):
@@ -139,14 +151,10 @@ class TestMemberDetailsFrame:
 
     @patch("tkinter.messagebox.askyesno", return_value=True)
     @patch("tkinter.messagebox.showinfo")
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("json.dump")
-    def test_no_changes_detected(
-        self, mock_json_dump, mock_file, mock_showinfo, mock_askyesno, details_frame
-    ):
+    def test_no_changes_detected(self, mock_showinfo, mock_askyesno, details_frame):
         """Test that no changes are detected when values haven't changed"""
         # Get the original member
-        member = details_frame.family_tree.members["1"]
+        member = details_frame.family_tree.members[1]
 
         # Configure the Text widget mock to return the same value that was set
         original_extra_info = member.get("extra_information", "")
@@ -162,20 +170,16 @@ class TestMemberDetailsFrame:
         mock_showinfo.assert_called_once_with(
             "No Changes", "No changes were made to the member details."
         )
-        # Verify that json.dump was not called
-        assert not mock_json_dump.called
+        # Verify that nothing was journaled
+        assert read_journal(details_frame.family_tree) == []
         # Verify that askyesno was not called
         assert not mock_askyesno.called
 
     @patch("tkinter.messagebox.askyesno", return_value=True)
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("json.dump")
-    def test_id_not_in_changes(
-        self, mock_json_dump, mock_file, mock_askyesno, details_frame
-    ):
+    def test_id_not_in_changes(self, mock_askyesno, details_frame):
         """Test that ID is not included in change detection"""
         # Setup initial values
-        details_frame.update_details(details_frame.family_tree.members["1"])
+        details_frame.update_details(details_frame.family_tree.members[1])
 
         # Set the ID to the same value
         details_frame.detail_vars["id"].set("1")
@@ -193,14 +197,10 @@ class TestMemberDetailsFrame:
         assert "Name: 'Test Person' → 'New Name'" in confirm_message
 
     @patch("tkinter.messagebox.askyesno", return_value=True)
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("json.dump")
-    def test_extra_information_changes(
-        self, mock_json_dump, mock_file, mock_askyesno, details_frame
-    ):
+    def test_extra_information_changes(self, mock_askyesno, details_frame):
         """Test that extra information changes are properly detected"""
         # Setup initial values
-        member = details_frame.family_tree.members["1"]
+        member = details_frame.family_tree.members[1]
         details_frame.update_details(member)
 
         # Change extra information
@@ -219,14 +219,10 @@ class TestMemberDetailsFrame:
         )
 
     @patch("tkinter.messagebox.askyesno", return_value=True)
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("json.dump")
-    def test_empty_extra_information(
-        self, mock_json_dump, mock_file, mock_askyesno, details_frame
-    ):
+    def test_empty_extra_information(self, mock_askyesno, details_frame):
         """Test handling empty extra information"""
         # Setup initial values with extra information
-        member = details_frame.family_tree.members["1"]
+        member = details_frame.family_tree.members[1]
         details_frame.update_details(member)
 
         # Change extra information to empty
@@ -242,10 +238,52 @@ class TestMemberDetailsFrame:
         assert "Extra Information: Removed 'Loves testing'" in confirm_message
 
         # Verify that the saved value is None
-        save_calls = mock_json_dump.call_args_list
-        assert len(save_calls) == 1
-        saved_data = save_calls[0][0][0]  # First argument of first call
-        assert saved_data[0]["extra_information"] is None
+        entries = read_journal(details_frame.family_tree)
+        assert len(entries) == 1
+        assert entries[0]["fields"]["extra_information"] is None
+
+    def test_show_relationship(self, details_frame):
+        """Test describing how the named relative is related to the member"""
+        details_frame.family_tree.add_member(
+            name="Test Child", gender="Female", father="Test Person"
+        )
+
+        details_frame.relative_var.set("test child")
+        details_frame.show_relationship()
+        assert (
+            details_frame.relationship_var.get()
+            == "Test Child is Test Person's daughter"
+        )
+
+        details_frame.relative_var.set("Nobody")
+        details_frame.show_relationship()
+        assert details_frame.relationship_var.get() == "No member named Nobody"
+
+    def test_parent_fields_autocomplete(self, details_frame):
+        """Test that parent fields suggest plausible members despite typos"""
+        details_frame.family_tree.add_member(
+            name="Ben Robertson", gender="Male", age="Adult"
+        )
+        details_frame.family_tree.add_member(
+            name="Brooke Robertson", gender="Female", age="Adult"
+        )
+        details_frame.detail_vars["age"].set("Child")
+        completion = details_frame.parent_completions["father"]
+
+        details_frame.detail_vars["father"].set("ben robrtson")
+        with patch("tkinter.Listbox"):
+            completion._on_key(Mock(keysym="n"))
+        assert completion.suggestions == ["Ben Robertson"]
+        completion.listbox.insert.assert_called_with(tk.END, "Ben Robertson")
+
+        completion.listbox.curselection.return_value = (0,)
+        completion._on_list_choose(None)
+        assert details_frame.detail_vars["father"].get() == "Ben Robertson"
+        completion.popup.withdraw.assert_called()
+
+        assert details_frame._suggest_parents("robertson", "mother") == [
+            "Brooke Robertson"
+        ]
 
 
 class TestAddMemberDialog:
@@ -257,11 +295,9 @@ class TestAddMemberDialog:
         ), patch("tkinter.ttk.Label"), patch("tkinter.ttk.Frame"), patch(
             "tkinter.ttk.LabelFrame"
         ), patch("tkinter.ttk.Style"):
-            mock_family_tree = Mock()
-            mock_family_tree.members = sample_family_tree
             mock_callback = Mock()
 
-            dialog = AddMemberDialog(mock_tk, mock_family_tree, mock_callback)
+            dialog = AddMemberDialog(mock_tk, sample_family_tree, mock_callback)
 
             # Mock the family tree's add_member method
             dialog.family_tree.add_member = Mock()
@@ -296,9 +332,6 @@ class TestFamilyTreeUI:
     @pytest.fixture
     def ui(self, mock_tk, sample_family_tree):
         """Create a FamilyTreeUI instance with mocked Tkinter"""
-        mock_family_tree = Mock()
-        mock_family_tree.members = sample_family_tree
-
         # Mock the Listbox
         mock_listbox = Mock()
         mock_listbox.size.return_value = 1
@@ -312,25 +345,410 @@ class TestFamilyTreeUI:
         ), patch("tkinter.ttk.Frame"), patch("tkinter.ttk.LabelFrame"), patch(
             "tkinter.ttk.Style"
         ):
-            ui = FamilyTreeUI(mock_family_tree)
+            ui = FamilyTreeUI(sample_family_tree)
             ui.member_listbox = mock_listbox
             return ui
 
-    @patch("json.dump")
-    @patch("builtins.open", new_callable=mock_open)
-    def test_save_member_changes(self, mock_file, mock_json_dump, ui):
+    def test_save_member_changes(self, ui):
         """Test saving member changes"""
-        ui.current_member_id = "1"
+        ui.current_member_id = 1
         ui.details_frame.detail_vars["name"].set("Updated Name")
 
         # Mock the message box to return True (user clicks "Yes")
         with patch("tkinter.messagebox.askyesno", return_value=True):
             ui._save_member_changes()
 
-            # Verify json.dump was called
-            assert mock_json_dump.call_count == 1
-            # Verify file was opened
-            mock_file.assert_called_once_with("./data/members.json", "w")
+            # Verify a single change was journaled
+            entries = read_journal(ui.family_tree)
+            assert len(entries) == 1
+            assert entries[0] == {
+                "op": "update",
+                "id": 1,
+                "fields": {"name": "Updated Name", "extra_information": ""},
+            }
+
+    def test_save_results_update_status(self, ui):
+        """Test that finished background saves are reported on the event loop"""
+        ui.save_results.put(None)
+
+        ui._poll_save_results()
+
+        ui.save_status.configure.assert_called_with(text="All changes saved")
+        ui.root.after.assert_called_with(100, ui._poll_save_results)
+
+    def test_edits_move_single_rows(self, ui):
+        """Test that adds, renames and removals update the sorted rows in place"""
+        ui.family_tree.add_member(id=2, name="Anna Zimmer")
+        ui.family_tree.add_member(id=3, name="Zoe Adams")
+        assert [row[-1] for row in ui.member_rows] == [3, 1, 2]
+
+        ui.family_tree.update_member(3, name="Zoe Young")
+        assert [row[-1] for row in ui.member_rows] == [1, 3, 2]
+
+        ui.family_tree.remove_member(1)
+        assert [row[-2] for row in ui.member_rows] == ["Zoe Young", "Anna Zimmer"]
+
+    def test_toggle_sort_switches_orderings(self, ui):
+        """Test that both orderings follow edits and toggling only switches views"""
+        ui.family_tree.add_member(id=2, name="Şahin Ayhan")
+        ui.family_tree.add_member(id=3, name="Sara Zimmer")
+        ui.family_tree.add_member(id=4, name="Tom Baker")
+
+        assert [row[-1] for row in ui.member_rows] == [2, 4, 1, 3]
+        by_last_name = ui.member_rows
+
+        with patch.object(SortedList, "__init__") as rebuild:
+            ui._toggle_sort()
+            assert not rebuild.called
+        assert [row[-1] for row in ui.member_rows] == [2, 3, 1, 4]
+
+        ui._toggle_sort()
+        assert ui.member_rows is by_last_name
+
+    def test_search_box_filters_the_list(self, ui):
+        """Test that the list shows search results and follows edits to them"""
+        ui.family_tree.add_member(id=2, name="Anna Zimmer", occupation="Doctor")
+        ui.family_tree.add_member(id=3, name="Zoe Adams")
+
+        ui.search_var.set("doc")
+        ui._update_results()
+        assert ui.member_list.rows == [("Anna Zimmer", 2)]
+
+        ui.family_tree.update_member(3, occupation="Doctor")
+        ui.root.after_idle.assert_called_with(ui._update_results)
+        ui._update_results()
+        assert ui.member_list.rows == [("Anna Zimmer", 2), ("Zoe Adams", 3)]
+
+        ui.select_member(1)
+        assert ui.search_var.get() == ""
+        assert ui.member_list.rows is ui.member_rows
+
+    def test_filter_panel_narrows_the_list(self, ui):
+        """Test that filters list matching members in sort order and combine with search"""
+        ui.family_tree.add_member(id=2, name="Anna Zimmer", age="Elder")
+        ui.family_tree.add_member(id=3, name="Zoe Adams", age="Elder")
+        ui.family_tree.add_member(id=4, name="Ben Adams", age="Adult")
+
+        ui.filter_vars["age"].set("Elder")
+        ui._update_results()
+        assert [row[-1] for row in ui.member_list.rows] == [3, 2]
+        ui._toggle_sort()
+        assert [row[-1] for row in ui.member_list.rows] == [2, 3]
+
+        ui.search_var.set("adams")
+        ui._update_results()
+        assert ui.member_list.rows == [("Zoe Adams", 3)]
+
+        ui.search_var.set("")
+        ui.filter_vars["age"].set("")
+        ui.cause_of_death_var.set("1")
+        ui.family_tree.update_member(4, cause_of_death="Old Age")
+        ui._update_results()
+        assert [row[-1] for row in ui.member_list.rows] == [4]
+
+        ui._clear_filters()
+        assert ui.member_list.rows is ui.member_rows
+
+
+class FakeListbox:
+    """List-backed stand-in for tk.Listbox"""
+
+    def __init__(self, *args, **kwargs):
+        self.items = []
+        self.selection = []
+
+    def insert(self, index, *items):
+        index = len(self.items) if index == tk.END else index
+        self.items[index:index] = items
+
+    def delete(self, first, last=None):
+        if last == tk.END:
+            del self.items[first:]
+        else:
+            del self.items[first]
+
+    def size(self):
+        return len(self.items)
+
+    def selection_set(self, index):
+        self.selection = [index]
+
+    def selection_clear(self, first, last):
+        self.selection = []
+
+    def curselection(self):
+        return tuple(self.selection)
+
+    def pack(self, **kwargs):
+        pass
+
+    def bind(self, *args):
+        pass
+
+    def see(self, index):
+        pass
+
+
+class TestVirtualListbox:
+    @pytest.fixture
+    def member_list(self):
+        """Create a ten-row page over a thousand rows"""
+        rows = SortedList((f"{i:04}", f"Member {i:04}", i) for i in range(0, 2000, 2))
+        with patch("tkinter.Listbox", FakeListbox), patch("tkinter.ttk.Scrollbar"):
+            member_list = VirtualListbox(Mock(), rows, on_select=Mock())
+        member_list.page_size = 10
+        member_list.top = 100
+        member_list.refresh()
+        return member_list
+
+    def visible(self, member_list):
+        rows = member_list.rows[member_list.top : member_list.top + 10]
+        return [row[1] for row in rows]
+
+    def test_only_one_page_is_in_the_listbox(self, member_list):
+        """Test that the listbox holds the visible rows and the scrollbar the rest"""
+        assert member_list.listbox.items == self.visible(member_list)
+        member_list.scrollbar.set.assert_called_with(0.1, 0.11)
+
+        member_list.yview("scroll", 1, "pages")
+        assert member_list.top == 110
+        member_list.yview("moveto", 1.0)
+        assert member_list.top == 990
+        assert member_list.listbox.items[-1] == "Member 1998"
+
+    def test_inserts_and_removals_keep_the_page(self, member_list):
+        """Test that rows added above the page shift it and rows inside update it"""
+        rows = member_list.rows
+        member_list.inserted(rows.add(("0001", "Member 0001", 1)))
+        assert member_list.top == 101
+        member_list.inserted(rows.add(("0205", "Member 0205", 205)))
+        assert member_list.listbox.items == self.visible(member_list)
+        assert "Member 0205" in member_list.listbox.items
+
+        member_list.removed(rows.remove(("0204", "Member 0204", 204)))
+        member_list.removed(rows.remove(("0000", "Member 0000", 0)))
+        assert member_list.top == 100
+        assert member_list.listbox.items == self.visible(member_list)
+
+    def test_select_scrolls_to_row(self, member_list):
+        """Test that selecting a row off the page brings it into view"""
+        member_list.select(700)
+        assert member_list.top == 695
+        assert member_list.listbox.curselection() == (5,)
+
+        member_list._on_listbox_select(None)
+        member_list.on_select.assert_called_once_with(1400)
+
+
+class TestFamilyTreeVisualization:
+    def test_generations_share_a_rank(self, sample_family_tree):
+        """Test that nodes are keyed by ID and grouped by generation"""
+        sample_family_tree.add_member(id=2, name="Test Child", father="Test Person")
+        sample_family_tree.add_member(id=3, name="Test Child", father="Test Person")
+
+        with patch.object(FamilyTreeVisualization, "_create_visualization"):
+            dot = FamilyTreeVisualization(sample_family_tree).build_graph()
+
+        source = dot.source
+        assert '2 [label="Test Child"' in source
+        assert '3 [label="Test Child"' in source
+        assert "1 -> 2" in source and "1 -> 3" in source
+        assert "{\n\t\trank=same\n\t\t2\n\t\t3\n\t}" in source
+
+    def test_edits_only_reemit_affected_fragments(self, sample_family_tree):
+        """Test that a rename re-emits the member and the children linked by name"""
+        sample_family_tree.add_member(id=2, name="Test Child", father="Test Person")
+        sample_family_tree.add_member(id=3, name="Other Person")
+        cache = RenderCache(sample_family_tree)
+        cache.build_graph()
+        other = cache.fragments[3]
+
+        sample_family_tree.update_member(1, name="Renamed Person")
+        assert 1 not in cache.fragments and 2 not in cache.fragments
+        source = cache.build_graph().source
+
+        assert cache.fragments[3] is other
+        assert '1 [label="Renamed Person' in source
+        assert '"Test Person" -> 2' in source
+
+    def test_unchanged_tree_is_not_rendered_again(self, sample_family_tree, tmp_path):
+        """Test that the rendered file is reused until the DOT source changes"""
+        rendered = tmp_path / "family_tree.pdf"
+        rendered.touch()
+        cache = RenderCache(sample_family_tree)
+
+        with patch("graphviz.Digraph.render", return_value=str(rendered)) as render, patch(
+            "graphviz.view"
+        ) as view:
+            cache.render()
+            cache.render()
+            assert render.call_count == 1
+            view.assert_called_once_with(str(rendered))
+
+            # An edit that is undone leaves the source unchanged
+            sample_family_tree.update_member(1, age="Adult")
+            sample_family_tree.update_member(1, age="Child")
+            cache.render()
+            assert render.call_count == 1
+
+            sample_family_tree.update_member(1, age="Teen")
+            cache.render()
+            assert render.call_count == 2
+
+    def test_focused_render_draws_only_the_neighborhood(self, sample_family_tree):
+        """Test that a focused render leaves out members and edges outside it"""
+        sample_family_tree.add_member(id=2, name="Test Child", father="Test Person")
+        sample_family_tree.add_member(id=3, name="Test Grandchild", father="Test Child")
+
+        with patch.object(FamilyTreeVisualization, "_create_visualization"):
+            visualization = FamilyTreeVisualization(
+                sample_family_tree, focus_id=3, generations=1
+            )
+        source = visualization.build_graph().source
+
+        assert visualization.member_ids == [3, 2]
+        assert "2 -> 3" in source
+        assert "1 [" not in source and "1 -> 2" not in source
+
+    def test_throwaway_cache_stops_listening(self, sample_family_tree):
+        """Test that a cache made by the visualization is closed after rendering"""
+        shared = RenderCache(sample_family_tree)
+
+        with patch("graphviz.Digraph.render", return_value="family_tree.pdf"):
+            FamilyTreeVisualization(sample_family_tree)
+            FamilyTreeVisualization(sample_family_tree, cache=shared)
+
+        caches = [
+            listener.__self__
+            for listener in sample_family_tree.listeners
+            if isinstance(listener.__self__, RenderCache)
+        ]
+        assert caches == [shared]
+
+    def test_household_view_expands_on_demand(self, sample_family_tree):
+        """Test that households stay summaries until they are expanded"""
+        sample_family_tree.add_member(id=2, name="Test Child", father="Test Person")
+        sample_family_tree.add_member(id=3, name="Test Grandchild", father="Test Child")
+        cache = RenderCache(sample_family_tree)
+
+        source = cache.build_household_graph().source
+        assert (
+            'household1 [label="Test Person\n1 children\n1 households below"' in source
+        )
+        assert "household2" not in source
+
+        expanded = cache.households.around(3)
+        source = cache.build_household_graph(expanded).source
+        assert "1 -> 2" in source and "2 -> 3" in source
+        assert "household" not in source
+
+        source = cache.build_household_graph([(1,)]).source
+        assert "2 -> household2" in source
+        source = cache.build_household_graph([(1,)], limit=1).source
+        assert "household2" not in source
+        assert "1 more households" in source
+
+    def test_households_are_regrouped_only_by_family_edits(self, sample_family_tree):
+        """Test that edits to other fields keep the grouped households"""
+        cache = RenderCache(sample_family_tree)
+        households = cache.households
+
+        sample_family_tree.update_member(1, occupation="Doctor", age="Elder")
+        assert cache.households is households
+
+        sample_family_tree.add_member(id=2, name="Test Spouse", spouses=["Test Person"])
+        assert cache.households is not households
+        assert cache.households.children[(1, 2)] == []
+
+
+class FakeDot:
+    """Stand-in for a dot process that writes its output when released"""
+
+    def __init__(self, args, **kwargs):
+        self.path = args[-1]
+        self.returncode = 0
+        self.released = threading.Event()
+
+    def communicate(self, source):
+        self.released.wait(5)
+        if self.returncode == 0:
+            with open(self.path, "wb") as f:
+                f.write(source)
+        return b"", b""
+
+    def kill(self):
+        self.returncode = -9
+        self.released.set()
+
+
+class TestBackgroundRenderer:
+    @pytest.fixture
+    def renderer(self, sample_family_tree, tmp_path, monkeypatch):
+        """Create a renderer whose dot processes are FakeDot instances"""
+        monkeypatch.chdir(tmp_path)
+        renderer = BackgroundRenderer(
+            Mock(), RenderCache(sample_family_tree), on_busy=Mock()
+        )
+        with patch("subprocess.Popen", side_effect=FakeDot), patch(
+            "graphviz.view"
+        ) as view:
+            renderer.view = view
+            yield renderer
+
+    def test_repeated_requests_share_one_render(self, renderer, tmp_path):
+        """Test that clicks during a render are coalesced and the result is opened"""
+        job = renderer.render()
+        assert renderer.render() is None
+        renderer.root.after.assert_called_once_with(100, renderer._poll)
+
+        while job.process is None:
+            pass
+        job.process.released.set()
+        job.join()
+        renderer._poll()
+
+        renderer.view.assert_called_once_with("family_tree.pdf")
+        assert (tmp_path / "family_tree.pdf").exists()
+        assert [c.args for c in renderer.on_busy.call_args_list] == [(True,), (False,)]
+
+        # The finished render is reused without starting dot again
+        assert renderer.render() is None
+        assert renderer.view.call_count == 2
+
+    def test_replaced_render_keeps_its_own_partial_file(
+        self, renderer, sample_family_tree, tmp_path
+    ):
+        """Test that a cancelled render cleaning up leaves the new one alone"""
+        first = renderer.render()
+        while first.process is None:
+            pass
+        sample_family_tree.update_member(1, age="Teen")
+        second = renderer.render()
+        while second.process is None:
+            pass
+        first.join()
+
+        assert first.process.path != second.process.path
+        assert os.path.exists(second.process.path)
+        second.process.released.set()
+        second.join()
+        renderer._poll()
+
+        renderer.view.assert_called_once_with("family_tree.pdf")
+        assert [p.name for p in tmp_path.glob("family_tree*")] == ["family_tree.pdf"]
+
+    def test_cancel_kills_dot(self, renderer, tmp_path):
+        """Test that a cancelled render is dropped and leaves no file behind"""
+        job = renderer.render()
+        while job.process is None:
+            pass
+        renderer.cancel()
+        job.join()
+        renderer._poll()
+
+        assert not renderer.view.called
+        assert list(tmp_path.glob("family_tree*")) == []
+        renderer.on_busy.assert_called_with(False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import pytest
+
+from scripts.family_tree import FamilyTree
+from scripts.households import Households
+
+
+@pytest.fixture
+def family_tree():
+    """Create three generations with a second partner on one side"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson"},
+            {"id": 2, "name": "Brooke Robertson", "spouses": ["Ben Robertson"]},
+            {
+                "id": 3,
+                "name": "Sage Robertson",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {
+                "id": 4,
+                "name": "Leo Robertson",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {"id": 5, "name": "Nina Caliente"},
+            {
+                "id": 6,
+                "name": "Jamie Robertson",
+                "father": "Ben Robertson",
+                "mother": "Nina Caliente",
+            },
+            {"id": 7, "name": "Mortimer Goth"},
+            {
+                "id": 8,
+                "name": "Joanie Goth",
+                "father": "Mortimer Goth",
+                "mother": "Sage Robertson",
+            },
+            {"id": 9, "name": "Max Robertson", "father": "Leo Robertson"},
+        ]
+    )
+    return family_tree
+
+
+class TestHouseholds:
+    def test_households_are_keyed_by_parents(self, family_tree):
+        """Test that each set of parents makes one household"""
+        households = Households(family_tree)
+
+        assert households.children == {
+            (1, 2): [3, 4],
+            (1, 5): [6],
+            (3, 7): [8],
+            (4,): [9],
+        }
+        assert households.roots() == [(1, 2), (1, 5)]
+        assert households.child_households((1, 2)) == [(3, 7), (4,)]
+        assert households.household_of(8) == (3, 7)
+        assert households.household_of(1) is None
+
+    def test_around_opens_the_line_to_a_member(self, family_tree):
+        """Test that the households of ancestors and the member's own are listed"""
+        households = Households(family_tree)
+
+        assert sorted(households.around(3)) == [(1, 2), (3, 7)]
+        assert sorted(households.around(8)) == [(1, 2), (3, 7)]
+        assert households.around(7) == [(3, 7)]
+
+    def test_couples_without_children_are_households(self, family_tree):
+        """Test that spouses make a household even before they have children"""
+        family_tree.add_member(id=10, name="Lily Feng", spouses=["Max Robertson"])
+        family_tree.update_member(7, spouses=["Nina Caliente"])
+        households = Households(family_tree)
+
+        assert households.children[(9, 10)] == []
+        assert households.children[(5, 7)] == []
+        assert households.child_households((4,)) == [(9, 10)]
+        assert households.around(10) == [(9, 10)]
+        assert households.roots() == [(1, 2), (1, 5), (5, 7)]
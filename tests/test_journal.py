@@ -0,0 +1,188 @@
+import json
+import os
+
+import pytest
+
+from scripts.family_tree import create_family_tree
+from scripts.journal import MemberJournal
+
+
+@pytest.fixture
+def members_file(tmp_path):
+    """Write a small members.json snapshot"""
+    path = tmp_path / "members.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"id": 1, "name": "Ben Robertson", "gender": "Male"},
+                {"id": 2, "name": "Brooke Robertson", "gender": "Female"},
+            ]
+        )
+    )
+    return path
+
+
+class TestMemberJournal:
+    def test_edits_append_without_rewriting_snapshot(self, members_file):
+        """Test that each edit appends one line and leaves the snapshot alone"""
+        snapshot = members_file.read_text()
+        family_tree = create_family_tree(members_file, use_journal=True)
+
+        family_tree.add_member(name="Sage Robertson", father="Ben Robertson")
+        family_tree.update_member(2, location="Newcrest")
+        family_tree.remove_member(1)
+
+        journal_file = family_tree.journal.journal_file
+        with open(journal_file, "r") as f:
+            ops = [json.loads(line)["op"] for line in f]
+        assert ops == ["add", "update", "remove", "update"]
+        assert members_file.read_text() == snapshot
+
+    def test_replay_restores_edits(self, members_file):
+        """Test that a restarted tree sees the journaled edits"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        family_tree.add_member(name="Sage Robertson", father="Ben Robertson")
+        family_tree.update_member(2, location="Newcrest")
+        family_tree.remove_member(1)
+
+        reloaded = create_family_tree(members_file, use_journal=True)
+
+        assert sorted(reloaded.members) == [2, 3]
+        assert reloaded.get_member(2)["location"] == "Newcrest"
+        assert reloaded.get_member(3)["father"] is None
+
+    def test_compaction_rewrites_snapshot(self, members_file):
+        """Test that compaction folds the journal into the snapshot"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        family_tree.journal.compact_every = 2
+
+        family_tree.update_member(1, location="Newcrest")
+        family_tree.update_member(2, location="Newcrest")
+
+        with open(family_tree.journal.journal_file, "r") as f:
+            assert f.read() == ""
+        snapshot = json.loads(members_file.read_text())
+        assert [member["location"] for member in snapshot] == ["Newcrest"] * 2
+
+    def test_replay_is_idempotent_and_skips_torn_lines(self, members_file, capsys):
+        """Test replay after a crash between compaction and truncation"""
+        journal_file = f"{members_file}.journal"
+        with open(journal_file, "w") as f:
+            f.write(json.dumps({"op": "add", "id": 2, "fields": {"id": 2}}) + "\n")
+            f.write(json.dumps({"op": "remove", "id": 9}) + "\n")
+            f.write('{"op": "update", "id": 1, "fie')
+
+        family_tree = create_family_tree(members_file)
+        replayed = MemberJournal(members_file).replay(family_tree)
+
+        assert replayed == 2
+        assert sorted(family_tree.members) == [1, 2]
+        assert "incomplete journal entry" in capsys.readouterr().out
+
+    def test_replay_onto_a_newer_snapshot_starts(self, members_file, capsys):
+        """Test that entries the snapshot already moved past do not stop startup"""
+        # The snapshot was written after all three edits, then the app
+        # stopped before the journal was emptied
+        members_file.write_text(
+            json.dumps(
+                [
+                    {"id": 1, "name": "Ben Robertson"},
+                    {"id": 2, "name": "Brooke Robertson", "father": "Ben Robertson"},
+                ]
+            )
+        )
+        with open(f"{members_file}.journal", "w") as f:
+            for member_id, father in [
+                (1, "Brooke Robertson"),
+                (1, None),
+                (2, "Ben Robertson"),
+            ]:
+                entry = {"op": "update", "id": member_id, "fields": {"father": father}}
+                f.write(json.dumps(entry) + "\n")
+
+        family_tree = create_family_tree(members_file, use_journal=True)
+
+        assert family_tree.get_member(1)["father"] is None
+        assert family_tree.ancestors(2) == [1]
+        assert "Skipping journal entry" in capsys.readouterr().out
+
+
+class TestBackgroundPersistence:
+    def test_burst_of_edits_is_coalesced(self, members_file):
+        """Test that rapid edits to one member are written as one entry"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        results = []
+        family_tree.journal.start_worker(on_complete=results.append, delay=0.05)
+
+        for location in ("Newcrest", "Willow Creek", "San Myshuno"):
+            family_tree.update_member(1, location=location)
+        family_tree.update_member(1, occupation="Doctor")
+        family_tree.journal.flush()
+
+        with open(family_tree.journal.journal_file, "r") as f:
+            entries = [json.loads(line) for line in f]
+        assert entries == [
+            {
+                "op": "update",
+                "id": 1,
+                "fields": {"location": "San Myshuno", "occupation": "Doctor"},
+            }
+        ]
+        family_tree.journal.close()
+        assert None in results
+
+    def test_close_writes_snapshot_atomically(self, members_file):
+        """Test that closing compacts through a temp file and rename"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        family_tree.journal.start_worker(delay=0.05)
+        family_tree.add_member(name="Sage Robertson")
+
+        family_tree.journal.close()
+
+        snapshot = json.loads(members_file.read_text())
+        assert [member["name"] for member in snapshot][-1] == "Sage Robertson"
+        assert not os.path.exists(f"{members_file}.tmp")
+        assert os.path.getsize(f"{members_file}.journal") == 0
+
+    def test_write_errors_are_reported(self, members_file, tmp_path):
+        """Test that a failed background write reaches on_complete"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        results = []
+        family_tree.journal.start_worker(on_complete=results.append, delay=0.01)
+        family_tree.journal.snapshot_file = tmp_path / "missing" / "members.json"
+
+        family_tree.journal.compact()
+        family_tree.journal.flush()
+
+        assert isinstance(results[-1], OSError)
+
+    def test_failed_writes_are_retried(self, members_file):
+        """Test that edits from a failed write are written with the next batch"""
+        family_tree = create_family_tree(members_file, use_journal=True)
+        journal = family_tree.journal
+        write = journal._write
+        attempts = []
+
+        def write_failing_once(operations):
+            attempts.append(operations)
+            if len(attempts) == 1:
+                raise OSError("No space left on device")
+            write(operations)
+
+        journal._write = write_failing_once
+        results = []
+        journal.start_worker(on_complete=results.append, delay=0.01)
+        family_tree.update_member(1, location="Newcrest")
+        journal.flush()
+        family_tree.update_member(2, location="Willow Creek")
+        journal.flush()
+
+        assert isinstance(results[0], OSError)
+        assert results[-1] is None
+        # Read back as after a crash, before the journal is compacted
+        reloaded = create_family_tree(members_file, use_journal=True)
+        assert [reloaded.get_member(i)["location"] for i in (1, 2)] == [
+            "Newcrest",
+            "Willow Creek",
+        ]
+        journal.close()
@@ -0,0 +1,67 @@
+import pytest
+
+from scripts.family_tree import FamilyTree
+from scripts.kinship import KinshipTable, iter_inbreeding_by_generation
+
+
+@pytest.fixture
+def family_tree():
+    """Create a family with a first-cousin and a sibling marriage"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson"},
+            {"id": 2, "name": "Brooke Robertson"},
+            {
+                "id": 3,
+                "name": "Sage",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {
+                "id": 4,
+                "name": "Leo",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {"id": 5, "name": "Nina Caliente"},
+            {"id": 6, "name": "Mortimer Goth"},
+            {"id": 7, "name": "Jamie", "father": "Sage", "mother": "Nina Caliente"},
+            {"id": 8, "name": "Joanie", "father": "Mortimer Goth", "mother": "Leo"},
+            {"id": 9, "name": "Lily", "father": "Jamie", "mother": "Joanie"},
+            {"id": 10, "name": "Max", "father": "Sage", "mother": "Leo"},
+        ]
+    )
+    return family_tree
+
+
+class TestKinship:
+    def test_inbreeding_coefficients(self, family_tree):
+        """Test the textbook coefficients for cousin and sibling parents"""
+        table = KinshipTable(family_tree)
+
+        assert table.inbreeding(9) == 1 / 16
+        assert table.inbreeding(10) == 1 / 4
+        assert table.inbreeding(7) == 0
+
+    def test_kinship_between_pairs(self, family_tree):
+        """Test kinship of siblings, cousins and unrelated members"""
+        table = KinshipTable(family_tree)
+
+        assert table.kinship(3, 4) == 1 / 4
+        assert table.kinship(7, 8) == table.kinship(8, 7) == 1 / 16
+        assert table.kinship(1, 2) == 0
+        assert table.kinship(3, 3) == 1 / 2
+
+    def test_streaming_by_generation(self, family_tree):
+        """Test that the streaming mode yields each generation in order"""
+        generations = list(iter_inbreeding_by_generation(family_tree))
+
+        assert [sorted(generation) for generation in generations] == [
+            [1, 2, 5, 6],
+            [3, 4],
+            [7, 8, 10],
+            [9],
+        ]
+        assert generations[2][10] == 1 / 4
+        assert generations[3][9] == 1 / 16
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from scripts.family_tree import create_family_tree
+from scripts.lazy_tree import LazyFamilyTree
+
+
+@pytest.fixture
+def members_file(tmp_path):
+    """Write a members file with non-ASCII text and an invalid row"""
+    members = [
+        {"id": 1, "name": "Ben Robertson", "extra_information": "Çiftçi " * 200},
+        {"id": 2, "name": "Brooke Robertson", "gender": "female"},
+        {"id": 3, "name": "Sage Robertson", "father": "Ben Robertson"},
+        {"id": 4, "name": "Robot", "gender": "Robot"},
+        {"name": "Leo Robertson", "mother": "Brooke Robertson"},
+    ]
+    path = tmp_path / "members.json"
+    path.write_text(json.dumps(members, indent=4, ensure_ascii=False), "utf-8")
+    return path
+
+
+class TestLazyFamilyTree:
+    def test_index_is_built_without_keeping_records(self, members_file, capsys):
+        """Test that loading only keeps names, offsets and relationships"""
+        family_tree = create_family_tree(members_file, lazy=True)
+
+        assert isinstance(family_tree, LazyFamilyTree)
+        assert list(family_tree.member_names()) == [
+            (1, "Ben Robertson"),
+            (2, "Brooke Robertson"),
+            (3, "Sage Robertson"),
+            (4, "Leo Robertson"),
+        ]
+        assert family_tree.get_children(1) == [3]
+        assert family_tree.get_children(2) == [4]
+        assert len(family_tree.members.cache) == 0
+        assert "row 3, gender" in capsys.readouterr().out
+
+    def test_members_are_parsed_on_first_read(self, members_file):
+        """Test that records are read back from their byte offsets"""
+        family_tree = LazyFamilyTree(members_file)
+
+        assert family_tree.get_member(2)["gender"] == "Female"
+        assert family_tree.get_member(1)["extra_information"] == "Çiftçi " * 200
+        assert family_tree.get_member(4)["id"] == 4
+        assert list(family_tree.members.cache) == [2, 1, 4]
+
+    def test_cache_is_bounded(self, members_file):
+        """Test that the least recently used member is evicted first"""
+        family_tree = LazyFamilyTree(members_file, cache_size=2)
+        for member_id in (1, 2, 1, 3):
+            family_tree.get_member(member_id)
+
+        assert list(family_tree.members.cache) == [1, 3]
+
+    def test_edits_override_file_records(self, members_file):
+        """Test that updated and removed members are not read from the file"""
+        family_tree = create_family_tree(members_file, use_journal=True, lazy=True)
+        family_tree.update_member(3, name="Sage Fraser")
+        family_tree.remove_member(1)
+
+        assert dict(family_tree.member_names())[3] == "Sage Fraser"
+        assert family_tree.get_member(3)["father"] is None
+        assert 1 not in family_tree.members
+        assert len(family_tree.members) == 3
+
+        family_tree.journal.close()
+        family_tree.close()
+        reloaded = create_family_tree(members_file)
+        assert [member["name"] for member in reloaded.to_records()] == [
+            "Brooke Robertson",
+            "Sage Fraser",
+            "Leo Robertson",
+        ]
+
+    def test_cycles_are_cleared_like_an_eager_load(self, tmp_path, capsys):
+        """Test that a link closing a loop is dropped as when loading eagerly"""
+        path = tmp_path / "members.json"
+        path.write_text(
+            json.dumps(
+                [
+                    {"id": 1, "name": "Ann Goth", "father": "Bo Goth"},
+                    {"id": 2, "name": "Bo Goth", "father": "Ann Goth"},
+                ]
+            )
+        )
+
+        family_tree = LazyFamilyTree(path)
+
+        assert "Cleared father of member data (row 1)" in capsys.readouterr().out
+        assert family_tree.get_member(2)["father"] is None
+        assert family_tree.get_children(2) == [1]
+        assert family_tree.get_children(1) == []
+        assert family_tree.ancestors(1) == [2]
+        eager = create_family_tree(path)
+        assert [member["father"] for member in eager.to_records()] == [
+            "Bo Goth",
+            None,
+        ]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from scripts.member import Member
+from scripts.memory_report import compare_member_memory
+
+
+@pytest.fixture
+def member():
+    """Create a compact member record"""
+    return Member(
+        id=1,
+        name="Brooke Robertson",
+        age="Adult",
+        gender="Female",
+        location="Newcrest",
+        spouses=["Ben Robertson"],
+    )
+
+
+class TestMember:
+    def test_behaves_like_a_dict(self, member):
+        """Test the dict-like view used by the GUI"""
+        assert member["name"] == "Brooke Robertson"
+        assert member.get("occupation") is None
+        assert member.get("missing", "default") == "default"
+        assert member["spouses"] == ["Ben Robertson"]
+        assert "father" in member
+        assert json.loads(json.dumps(member.copy()))["age"] == "Adult"
+
+    def test_age_and_gender_are_stored_as_codes(self, member):
+        """Test that age and gender are encoded as small integers"""
+        assert member.age_code == 6
+        assert member.gender_code == 2
+
+        member.update(age="Elder", gender=None)
+
+        assert member.age_code == 7
+        assert member["gender"] is None
+
+    def test_invalid_age_is_rejected(self, member):
+        """Test that unknown age values raise the same error as add_member"""
+        with pytest.raises(ValueError, match="Age must be one of"):
+            member["age"] = "Ancient"
+        with pytest.raises(ValueError, match="Gender must be one of"):
+            member["gender"] = 3
+
+    def test_age_and_gender_ignore_case(self, member):
+        """Test that edits accept the same spellings as add_member"""
+        member.update(age="elder", gender="MALE")
+        assert member["age"] == "Elder"
+        assert member["gender"] == "Male"
+        assert Member(age="young adult")["age"] == "Young Adult"
+
+    def test_repeated_strings_are_interned(self):
+        """Test that equal location strings share one object"""
+        first = Member(name="A", location="".join(["New", "crest"]))
+        second = Member(name="B", location="".join(["New", "crest"]))
+
+        assert first["location"] is second["location"]
+
+    def test_memory_report_shows_savings(self):
+        """Test that compact records use less memory than dictionaries"""
+        with open("./data/members.json", "r") as f:
+            members_data = json.load(f)
+
+        report = compare_member_memory(members_data, copies=20)
+
+        assert report["members"] == len(members_data) * 20
+        assert report["member_bytes"] < report["dict_bytes"]
@@ -0,0 +1,139 @@
+import pytest
+
+from scripts.family_tree import FamilyTree
+
+
+@pytest.fixture
+def family_tree():
+    """Create four generations with a second marriage on each side"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson", "gender": "Male"},
+            {
+                "id": 2,
+                "name": "Brooke Robertson",
+                "gender": "Female",
+                "spouses": ["Ben Robertson"],
+            },
+            {
+                "id": 3,
+                "name": "Sage Robertson",
+                "gender": "Female",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {
+                "id": 4,
+                "name": "Leo Robertson",
+                "gender": "Male",
+                "father": "Ben Robertson",
+                "mother": "Brooke Robertson",
+            },
+            {
+                "id": 5,
+                "name": "Jamie Robertson",
+                "gender": "Male",
+                "father": "Ben Robertson",
+                "mother": "Nina Caliente",
+            },
+            {"id": 6, "name": "Nina Caliente", "gender": "Female"},
+            {
+                "id": 7,
+                "name": "Joanie Robertson",
+                "gender": "Female",
+                "mother": "Sage Robertson",
+            },
+            {
+                "id": 8,
+                "name": "Max Robertson",
+                "gender": "Male",
+                "father": "Leo Robertson",
+            },
+            {
+                "id": 9,
+                "name": "Lily Robertson",
+                "gender": "Female",
+                "mother": "Joanie Robertson",
+            },
+            {
+                "id": 10,
+                "name": "Mortimer Goth",
+                "gender": "Male",
+                "spouses": ["Sage Robertson"],
+            },
+            {
+                "id": 11,
+                "name": "Cassandra Goth",
+                "gender": "Female",
+                "father": "Mortimer Goth",
+            },
+        ]
+    )
+    return family_tree
+
+
+class TestRelationships:
+    def test_direct_line(self, family_tree):
+        """Test parents, grandparents and their reverse"""
+        assert family_tree.relationship(3, 1) == "father"
+        assert family_tree.relationship(9, 1) == "great-grandfather"
+        assert family_tree.relationship(1, 9) == "great-granddaughter"
+        assert family_tree.relationship(1, 7) == "granddaughter"
+
+    def test_collateral_lines(self, family_tree):
+        """Test siblings, aunts and uncles and cousins through the LCA"""
+        assert family_tree.relationship(3, 4) == "brother"
+        assert family_tree.relationship(3, 5) == "half-brother"
+        assert family_tree.relationship(7, 4) == "uncle"
+        assert family_tree.relationship(4, 9) == "great-niece"
+        assert family_tree.relationship(7, 8) == "first cousin"
+        assert family_tree.relationship(9, 8) == "first cousin once removed"
+
+    def test_distant_generations_are_numbered(self):
+        """Test that long lines read "3rd great-" and "21st cousin" """
+        family_tree = FamilyTree()
+        family_tree.add_members(
+            [{"id": 1, "name": "Sim 1", "gender": "Male"}]
+            + [
+                {
+                    "id": member_id,
+                    "name": f"Sim {member_id}",
+                    "gender": "Female",
+                    "father": f"Sim {1 if member_id in (2, 102) else member_id - 1}",
+                }
+                for line in (0, 100)
+                for member_id in range(line + 2, line + 24)
+            ]
+        )
+
+        assert family_tree.relationship(5, 1) == "great-great-grandfather"
+        assert family_tree.relationship(6, 1) == "3rd great-grandfather"
+        assert family_tree.relationship(1, 15) == "12th great-granddaughter"
+        assert family_tree.relationship(6, 102) == "3rd great-aunt"
+        assert family_tree.relationship(23, 123) == "21st cousin"
+        assert family_tree.relationship(12, 123) == "tenth cousin 11 times removed"
+
+    def test_relationships_by_marriage(self, family_tree):
+        """Test spouses, step-relatives and in-laws through spouses"""
+        assert family_tree.relationship(1, 2) == "wife"
+        assert family_tree.relationship(7, 10) == "stepfather"
+        assert family_tree.relationship(10, 7) == "stepdaughter"
+        assert family_tree.relationship(7, 11) == "stepsister"
+        assert family_tree.relationship(1, 10) == "son-in-law"
+        assert family_tree.relationship(10, 1) == "father-in-law"
+        assert family_tree.relationship(10, 4) == "brother-in-law"
+
+    def test_unrelated_members(self, family_tree):
+        """Test that members with no link are reported as unrelated"""
+        assert family_tree.relationship(6, 8) is None
+        assert family_tree.relationship(6, 6) is None
+        assert family_tree.relationship(6, 99) is None
+
+    def test_relationships_follow_edits(self, family_tree):
+        """Test that the calculator sees updated parents"""
+        family_tree.relationship(7, 8)
+        family_tree.update_member(8, father="Mortimer Goth")
+
+        assert family_tree.relationship(11, 8) == "brother"
+        assert family_tree.relationship(7, 8) == "stepbrother"
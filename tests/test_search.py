@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from scripts.family_tree import FamilyTree
+from scripts.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def family_tree():
+    """Create members sharing names, places and jobs"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson", "location": "Newcrest"},
+            {"id": 2, "name": "Brooke Robertson", "occupation": "Doctor"},
+            {"id": 3, "name": "Sage Robbins", "location": "Willow Creek"},
+            {
+                "id": 4,
+                "name": "Nina Caliente",
+                "occupation": "Doctor",
+                "location": "Newcrest",
+            },
+            {"id": 5, "name": "Şahin Ayhan", "location": "San Myshuno"},
+            {
+                "id": 6,
+                "name": "Mortimer Goth",
+                "extra_information": "Wrote a book about Robertson history",
+            },
+        ]
+    )
+    return family_tree
+
+
+class TestSearchIndex:
+    def test_tokenize_folds_case_and_accents(self):
+        """Test that words are split, lowercased and stripped of accents"""
+        assert tokenize("Şahin AYHAN, San-Myshuno") == [
+            "sahin",
+            "ayhan",
+            "san",
+            "myshuno",
+        ]
+        assert tokenize(None) == []
+
+    def test_prefix_matches_rank_whole_words_first(self, family_tree):
+        """Test that names outrank other fields and whole words outrank prefixes"""
+        assert family_tree.search("robertson") == [1, 2, 6]
+        assert family_tree.search("rob") == [3, 1, 2, 6]
+        assert family_tree.search("sahin") == [5]
+        assert family_tree.search("Şah") == [5]
+        assert family_tree.search("nobody") == []
+        assert family_tree.search("") == []
+
+    def test_every_word_must_match(self, family_tree):
+        """Test that multi-word queries only return members matching all words"""
+        assert family_tree.search("doctor newcrest") == [4]
+        assert family_tree.search("newcrest") == [1, 4]
+        assert family_tree.search("rob doctor") == [2]
+        assert family_tree.search("ben doctor") == []
+
+    def test_within(self, family_tree):
+        """Test that searches can be limited to a set of members"""
+        assert family_tree.search("robertson", within={2, 6}) == [2, 6]
+        assert family_tree.search("rob", limit=1, within={6}) == [6]
+
+    def test_limit(self, family_tree):
+        """Test that only the best results are returned"""
+        assert family_tree.search("rob", limit=2) == [3, 1]
+        assert family_tree.search("rob", limit=0) == []
+
+    def test_edits_update_the_index(self, family_tree):
+        """Test that adds, updates and removals are followed incrementally"""
+        index = family_tree.search_index
+
+        family_tree.add_member(id=7, name="Bella Goth", occupation="Doctor")
+        family_tree.update_member(1, occupation="Doctor")
+        family_tree.remove_member(2)
+        assert family_tree.search("doctor") == [1, 4, 7]
+
+        family_tree.update_member(6, extra_information="")
+        assert family_tree.search("history") == []
+        assert "history" not in index.words
+        assert family_tree.search_index is index
+
+    def test_matches_scoring_every_member(self):
+        """Test that stopping early gives the same results as scoring everyone"""
+        rng = random.Random(7)
+        words = ["ann", "anna", "annabel", "bo", "bob", "bobby", "cal", "carl"]
+        family_tree = FamilyTree()
+        family_tree.add_members(
+            [
+                {
+                    "id": member_id,
+                    "name": " ".join(rng.sample(words, 2)),
+                    "location": rng.choice(words),
+                    "occupation": rng.choice(words),
+                }
+                for member_id in range(1, 301)
+            ]
+        )
+        index = SearchIndex(family_tree)
+
+        for query in ["ann", "bo", "an bob", "c ann", "bobby carl"]:
+            terms = tokenize(query)
+            scores = {}
+            for member_id, member_words in index.member_words.items():
+                score = 0.0
+                for term in terms:
+                    term_score = max(
+                        (
+                            weight * len(term) / len(word)
+                            for word, weight in member_words.items()
+                            if word.startswith(term)
+                        ),
+                        default=0.0,
+                    )
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    scores[member_id] = score
+            expected = sorted(scores.values(), reverse=True)[:10]
+
+            results = index.search(query, limit=10)
+            assert [scores[member_id] for member_id in results] == expected
@@ -0,0 +1,126 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from scripts.family_tree import create_family_tree
+from scripts.snapshot import SnapshotFamilyTree, convert, write_snapshot
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    """Write a small family tree snapshot"""
+    path = tmp_path / "members.snap"
+    write_snapshot(
+        path,
+        [
+            {
+                "id": 2,
+                "name": "Brooke Robertson",
+                "gender": "Female",
+                "age": "Adult",
+                "spouses": ["Ben Robertson"],
+            },
+            {"id": 1, "name": "Ben Robertson", "gender": "Male"},
+            {"id": 3, "name": "Sage Robertson", "father": "ben robertson"},
+            {"id": 4, "name": "Leo Robertson", "mother": "Brooke Robertson"},
+        ],
+    )
+    return path
+
+
+class TestSnapshot:
+    def test_create_family_tree_opens_snapshot(self, snapshot_file):
+        """Test that members and lookups are read from the mapped file"""
+        family_tree = create_family_tree(snapshot_file)
+
+        assert isinstance(family_tree, SnapshotFamilyTree)
+        assert list(family_tree.members) == [1, 2, 3, 4]
+        assert family_tree.next_id == 5
+        assert family_tree.get_member(2)["age"] == "Adult"
+        assert family_tree.find_member("SAGE robertson")["father"] == "ben robertson"
+        assert family_tree.get_children(1) == [3]
+        assert family_tree.get_children(2) == [4]
+        assert family_tree.get_spouses(1) == [2]
+
+    def test_edits_shadow_snapshot_records(self, snapshot_file):
+        """Test that updates, additions and removals apply over the snapshot"""
+        family_tree = SnapshotFamilyTree(snapshot_file)
+        family_tree.update_member(3, father="Jamie Fraser")
+        family_tree.add_member(name="Jamie Fraser")
+        family_tree.remove_member(2)
+
+        assert family_tree.get_children(1) == []
+        assert family_tree.get_children(5) == [3]
+        assert family_tree.get_member(4)["mother"] is None
+        assert family_tree.get_spouses(1) == []
+        assert len(family_tree.members) == 4
+        assert 2 not in family_tree.members
+
+    def test_edits_keep_name_resolution(self, tmp_path):
+        """Test that editing a member keeps which member a shared name means"""
+        path = tmp_path / "members.snap"
+        write_snapshot(
+            path,
+            [
+                {"id": 1, "name": "Ann"},
+                {"id": 2, "name": "Ann"},
+                {"id": 3, "name": "Bo", "mother": "Ann"},
+            ],
+        )
+        family_tree = SnapshotFamilyTree(path)
+        family_tree.update_member(1, location="Newcrest")
+
+        assert family_tree.find_member("Ann")["id"] == 1
+        assert family_tree.ancestors(3) == [1]
+
+        family_tree.update_member(1, name="Ann Goth")
+        assert family_tree.find_member("Ann")["id"] == 2
+
+    def test_journal_compacts_to_snapshot(self, snapshot_file):
+        """Test that a journaled snapshot tree is compacted in binary form"""
+        family_tree = create_family_tree(snapshot_file, use_journal=True)
+        family_tree.update_member(1, location="Newcrest")
+        family_tree.journal.close()
+
+        reopened = create_family_tree(snapshot_file)
+        assert reopened.get_member(1)["location"] == "Newcrest"
+
+    def test_compaction_remaps_the_snapshot(self, snapshot_file):
+        """Test that the mapped file is only replaced while it is unmapped"""
+        family_tree = create_family_tree(snapshot_file, use_journal=True)
+        family_tree.add_member(name="Jamie Fraser", father="Ben Robertson")
+        family_tree.remove_member(2)
+        replace = os.replace
+
+        def replace_unmapped(source, destination):
+            # Windows refuses to replace a file that is still mapped
+            assert family_tree.snapshot._map.closed
+            replace(source, destination)
+
+        with patch("scripts.snapshot.os.replace", side_effect=replace_unmapped):
+            family_tree.journal.compact()
+
+        assert family_tree.snapshot.member_count == 4
+        assert list(family_tree.members) == [1, 3, 4, 5]
+        assert len(family_tree.members) == 4
+        assert family_tree.get_children(1) == [3, 5]
+        family_tree.journal.close()
+
+    def test_convert_round_trips_json(self, snapshot_file, tmp_path):
+        """Test converting a snapshot to members.json and back"""
+        convert(snapshot_file, tmp_path / "members.json")
+        convert(tmp_path / "members.json", tmp_path / "copy.snap")
+
+        exported = json.loads((tmp_path / "members.json").read_text())
+        assert exported[1]["spouses"] == ["Ben Robertson"]
+        assert create_family_tree(tmp_path / "copy.snap").to_records() == exported
+
+    def test_other_files_are_rejected(self, tmp_path):
+        """Test that opening a file without the snapshot header fails"""
+        path = tmp_path / "members.snap"
+        path.write_text("[]")
+
+        with pytest.raises(ValueError, match="Not a family tree snapshot"):
+            SnapshotFamilyTree(path)
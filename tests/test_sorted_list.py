@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from utils.sorted_list import SortedList
+
+
+class TestSortedList:
+    def test_matches_a_sorted_list(self):
+        """Test random adds and removes against list.sort() with tiny buckets"""
+        rng = random.Random(0)
+        values = SortedList(rng.sample(range(1000), 100), load=4)
+        expected = sorted(values)
+
+        for _ in range(1000):
+            if expected and rng.random() < 0.5:
+                value = rng.choice(expected)
+                assert values.remove(value) == expected.index(value)
+                expected.remove(value)
+            else:
+                value = rng.random() * 1000
+                expected.append(value)
+                expected.sort()
+                assert values.add(value) == expected.index(value)
+
+        assert list(values) == expected
+        assert len(values) == len(expected)
+        assert [values[i] for i in range(len(expected))] == expected
+        assert values[10:57] == expected[10:57]
+        assert values.index(expected[42]) == 42
+
+    def test_missing_values(self):
+        """Test lookups of values that are not in the list"""
+        values = SortedList([3, 1, 2])
+
+        assert 2 in values and 4 not in values
+        with pytest.raises(ValueError):
+            values.remove(4)
+        with pytest.raises(IndexError):
+            values[3]
+        assert values[-1] == 3
+        assert SortedList()[0:10] == []
@@ -0,0 +1,138 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from scripts.family_tree import create_family_tree
+from scripts.sqlite_store import SQLiteFamilyTree, SQLiteMembers, convert
+
+
+@pytest.fixture
+def database_file(tmp_path):
+    """Create a small family tree database"""
+    path = tmp_path / "members.db"
+    family_tree = SQLiteFamilyTree(path)
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson", "gender": "Male"},
+            {
+                "id": 2,
+                "name": "Brooke Robertson",
+                "gender": "Female",
+                "spouses": ["Ben Robertson"],
+            },
+            {"id": 3, "name": "Sage Robertson", "father": "ben robertson"},
+            {"id": 4, "name": "Leo Robertson", "mother": "Brooke Robertson"},
+        ]
+    )
+    family_tree.close()
+    return path
+
+
+class TestSQLiteFamilyTree:
+    def test_create_family_tree_opens_database(self, database_file):
+        """Test that a .db path opens the tree without loading every member"""
+        family_tree = create_family_tree(database_file)
+
+        assert isinstance(family_tree, SQLiteFamilyTree)
+        assert family_tree.next_id == 5
+        assert family_tree.find_member("BEN ROBERTSON")["id"] == 1
+        assert family_tree.get_children(1) == [3]
+        assert family_tree.get_children(2) == [4]
+        assert family_tree.get_spouses(1) == [2]
+
+    def test_edits_are_committed(self, database_file):
+        """Test that each edit is visible to a second connection"""
+        family_tree = SQLiteFamilyTree(database_file)
+        family_tree.update_member(3, location="Newcrest")
+        family_tree.add_member(name="Jamie Fraser", spouses=["Brooke Robertson"])
+
+        reopened = SQLiteFamilyTree(database_file)
+        assert reopened.get_member(3)["location"] == "Newcrest"
+        assert reopened.get_spouses(2) == [1, 5]
+
+    def test_remove_member_clears_links(self, database_file):
+        """Test that removing a member updates children and spouses"""
+        family_tree = SQLiteFamilyTree(database_file)
+        family_tree.remove_member(1)
+
+        assert 1 not in family_tree.members
+        assert family_tree.get_member(3)["father"] is None
+        assert family_tree.get_member(2)["spouses"] == []
+        assert len(family_tree.members) == 3
+
+    def test_failed_update_is_rolled_back(self, database_file):
+        """Test that an invalid update leaves the stored member unchanged"""
+        family_tree = SQLiteFamilyTree(database_file)
+
+        with pytest.raises(ValueError, match="Age must be one of"):
+            family_tree.update_member(1, location="Newcrest", age="Ancient")
+
+        assert family_tree.get_member(1)["location"] is None
+
+    def test_indexes_read_only_the_columns_they_need(self, database_file):
+        """Test that names and indexes are built without loading whole members"""
+        family_tree = SQLiteFamilyTree(database_file)
+
+        with (
+            patch.object(SQLiteMembers, "values", side_effect=AssertionError),
+            patch.object(SQLiteMembers, "__getitem__", side_effect=AssertionError),
+        ):
+            assert list(family_tree.member_names()) == [
+                (1, "Ben Robertson"),
+                (2, "Brooke Robertson"),
+                (3, "Sage Robertson"),
+                (4, "Leo Robertson"),
+            ]
+            assert family_tree.query(gender="male") == [1]
+            assert family_tree.search("sage") == [3]
+            assert family_tree.ancestors(3) == [1]
+            assert family_tree.trigram_index.member_ids("leo robertson") == [4]
+
+    def test_cycles_are_checked_without_the_ancestry_index(self, database_file):
+        """Test that edits are checked for cycles by querying the database"""
+        family_tree = SQLiteFamilyTree(database_file)
+
+        with pytest.raises(ValueError, match="their own ancestor"):
+            family_tree.update_member(1, father="Sage Robertson")
+        family_tree.update_member(4, father="Sage Robertson")
+        assert family_tree.is_ancestor(1, 4)
+        assert not family_tree.is_ancestor(2, 3)
+        assert family_tree._ancestry is None
+
+    def test_shared_names_resolve_like_json(self, tmp_path):
+        """Test that a shared name means the same member in either store"""
+        json_file = tmp_path / "members.json"
+        json_file.write_text("[]")
+        stores = [create_family_tree(json_file), SQLiteFamilyTree(tmp_path / "a.db")]
+        for family_tree in stores:
+            family_tree.add_member(id=1, name="Ann")
+            family_tree.add_member(id=2, name="Ann")
+            family_tree.add_member(id=3, name="Kit", father="Ann")
+            family_tree.update_member(1, name="Cat")
+            family_tree.update_member(1, name="Ann")
+
+        assert [family_tree.relationship(3, 1) for family_tree in stores] == [
+            "parent",
+            "parent",
+        ]
+
+    def test_convert_round_trips_json(self, tmp_path):
+        """Test converting members.json to a database and back"""
+        members = [
+            {"id": 1, "name": "Ben Robertson", "spouses": ["Brooke Robertson"]},
+            {"id": 2, "name": "Brooke Robertson", "age": "Adult"},
+        ]
+        source = tmp_path / "members.json"
+        source.write_text(json.dumps(members))
+
+        convert(source, tmp_path / "members.db")
+        convert(tmp_path / "members.db", tmp_path / "exported.json")
+
+        exported = json.loads((tmp_path / "exported.json").read_text())
+        assert [member["name"] for member in exported] == [
+            "Ben Robertson",
+            "Brooke Robertson",
+        ]
+        assert exported[0]["spouses"] == ["Brooke Robertson"]
+        assert exported[1]["age"] == "Adult"
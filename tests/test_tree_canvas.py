@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from gui.tree_canvas import (
+    COLUMN_WIDTH,
+    ROW_HEIGHT,
+    SpatialIndex,
+    TreeCanvas,
+    TreeLayout,
+)
+from scripts.family_tree import FamilyTree
+
+
+@pytest.fixture
+def family_tree():
+    """Create a couple with two children and many unrelated founders"""
+    family_tree = FamilyTree()
+    records = [
+        {"id": 1, "name": "Ben Robertson", "gender": "Male"},
+        {"id": 2, "name": "Anna Lee", "gender": "Female"},
+        {"id": 3, "name": "Brooke Robertson", "spouses": ["Ben Robertson"]},
+        {"id": 4, "name": "Sage Robertson", "father": "Ben Robertson"},
+        {
+            "id": 5,
+            "name": "Leo Robertson",
+            "father": "Ben Robertson",
+            "mother": "Brooke Robertson",
+        },
+    ]
+    records += [{"id": i, "name": f"Founder {i}"} for i in range(6, 1006)]
+    family_tree.add_members(records)
+    return family_tree
+
+
+class TestSpatialIndex:
+    def test_query_and_hit(self):
+        """Test that only overlapping boxes are returned"""
+        index = SpatialIndex(cell_size=100)
+        index.insert("a", (0, 0, 50, 50))
+        index.insert("b", (450, 0, 1050, 20))
+        index.insert("c", (-200, -200, -150, -150))
+
+        assert index.query((40, 10, 500, 30)) == {"a", "b"}
+        assert index.query((900, 0, 1000, 10)) == {"b"}
+        assert index.hit(-175, -175) == {"c"}
+        assert index.hit(60, 60) == set()
+
+    def test_lines_are_listed_by_their_ends(self):
+        """Test that a long line is only listed in the cells of its ends"""
+        index = SpatialIndex(cell_size=100)
+        index.insert("line", (0, 0, 10000, 100), points=((0, 0), (10000, 100)))
+
+        assert len(index.cells) == 2
+        assert index.query((9950, 50, 10050, 150)) == {"line"}
+        assert index.query((5000, 0, 5100, 100)) == set()
+        index.remove("line")
+        assert index.cells == {} and index.boxes == {}
+
+
+class TestTreeLayout:
+    def test_generations_are_rows(self, family_tree):
+        """Test that spouses sit together and children sit below their parents"""
+        layout = TreeLayout(family_tree)
+        positions = layout.positions
+
+        assert positions[1] == (0, 0)
+        assert positions[3] == (COLUMN_WIDTH, 0)
+        assert positions[5][1] == positions[4][1] == ROW_HEIGHT
+        assert positions[5][0] - positions[4][0] >= COLUMN_WIDTH
+        assert positions[5][0] >= COLUMN_WIDTH / 2
+        assert layout.edges.hit(COLUMN_WIDTH, ROW_HEIGHT / 2) >= {(1, 5), (3, 5)}
+
+
+class TestTreeCanvas:
+    @pytest.fixture
+    def view(self, family_tree):
+        """Create a 400x300 pixel view with a mocked canvas"""
+        with patch("tkinter.Canvas") as mock_canvas:
+            canvas = mock_canvas.return_value
+            canvas.winfo_width.return_value = 400
+            canvas.winfo_height.return_value = 300
+            view = TreeCanvas(Mock(), family_tree, on_select=Mock())
+            view.redraw()
+            return view
+
+    def test_only_visible_members_are_drawn(self, view):
+        """Test that the canvas holds the viewport, not the whole tree"""
+        members = {item for item in view.drawn if not isinstance(item, tuple)}
+        assert members == {1, 3, 2, 4, 5}
+        assert len(view.drawn) < 20
+
+        view.pan(-COLUMN_WIDTH * 500, 0)
+        members = {item for item in view.drawn if not isinstance(item, tuple)}
+        assert 1 not in members
+        assert len(members) < 10
+        view.canvas.move.assert_called_with("all", -COLUMN_WIDTH * 500, 0)
+
+    def test_zooming_out_hides_labels(self, view):
+        """Test that crossing the label zoom redraws nodes without text"""
+        view.canvas.create_text.reset_mock()
+        view.zoom(0.4, 0, 0)
+
+        assert view.scale == pytest.approx(0.4)
+        view.canvas.delete.assert_called_with("all")
+        assert not view.canvas.create_text.called
+
+    def test_click_selects_member(self, view):
+        """Test hit-testing a click against the spatial index"""
+        x, y = view._to_canvas(*view.layout.positions[3])
+        view._on_press(SimpleNamespace(x=x, y=y))
+        view._on_release(SimpleNamespace(x=x, y=y))
+
+        view.on_select.assert_called_once_with(3)
+        assert view.selected_id == 3
+
+    def test_edits_move_only_the_changed_subtree(self, view, family_tree):
+        """Test that a batch of edits updates the layout in place once"""
+        layout = view.layout
+        before = dict(layout.positions)
+        family_tree.update_member(2, father="Ben Robertson")
+        family_tree.update_member(2, name="Anna Robertson")
+        family_tree.add_member(id=1006, name="Max Robertson", father="Leo Robertson")
+
+        view.canvas.after_idle.assert_called_once_with(view.redraw)
+        view.redraw()
+        assert view.layout is layout
+        assert layout.positions[2][1] == layout.positions[5][1] == ROW_HEIGHT
+        assert layout.positions[1006][1] == 2 * ROW_HEIGHT
+        assert abs(layout.positions[2][0] - layout.positions[4][0]) >= COLUMN_WIDTH
+        assert {i: before[i] for i in before if i != 2} == {
+            i: layout.positions[i] for i in before if i != 2
+        }
+        assert layout.edges.hit(*layout.positions[2]) == {(1, 2)}
+
+        family_tree.remove_member(5)
+        view.redraw()
+        assert 5 not in layout.positions and 1006 not in layout.children
+        assert layout.positions[1006][1] == 0
+        assert (5, 1006) not in view.drawn
+
+    def test_edits_elsewhere_are_ignored(self, view, family_tree):
+        """Test that fields not drawn leave the layout and canvas alone"""
+        family_tree.update_member(4, location="Newcrest", occupation="Doctor")
+        assert not view.canvas.after_idle.called
+
+        view.canvas.create_rectangle.reset_mock()
+        family_tree.update_member(4, gender="Female")
+        view.redraw()
+        view.canvas.delete.assert_called_with(*view.drawn[4])
+        view.canvas.create_rectangle.assert_called_once()
+        assert view.canvas.create_rectangle.call_args.kwargs["fill"] == "pink"
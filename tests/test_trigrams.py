@@ -0,0 +1,96 @@
+import pytest
+
+from scripts.family_tree import FamilyTree
+from scripts.trigrams import TrigramIndex, trigrams
+
+
+@pytest.fixture
+def family_tree():
+    """Create parents of both genders and ages, with one shared name"""
+    family_tree = FamilyTree()
+    family_tree.add_members(
+        [
+            {"id": 1, "name": "Ben Robertson", "gender": "Male", "age": "Adult"},
+            {"id": 2, "name": "Brooke Robertson", "gender": "Female", "age": "Adult"},
+            {"id": 3, "name": "Bella Robertson", "gender": "Female", "age": "Child"},
+            {"id": 4, "name": "Bennett Robertson", "age": "Young Adult"},
+            {"id": 5, "name": "Roberta Robertson", "gender": "Female", "age": "Elder"},
+            {"id": 6, "name": "Ben Robertson", "gender": "Male", "age": "Elder"},
+            {"id": 7, "name": "Şahin Ayhan", "gender": "Male", "age": "Adult"},
+        ]
+    )
+    return family_tree
+
+
+class TestTrigramIndex:
+    def test_trigrams(self):
+        """Test that names are padded and typed text is left open at the end"""
+        assert trigrams("Ben") == {"  b", " be", "ben", "en "}
+        assert trigrams("Ben", complete=False) == {"  b", " be", "ben"}
+        assert trigrams("Şah  In", complete=False) == {
+            "  s",
+            " sa",
+            "sah",
+            "ah ",
+            "h i",
+            " in",
+        }
+
+    def test_match_tolerates_typos(self, family_tree):
+        """Test that prefixes and misspelled names find the closest names"""
+        index = TrigramIndex(family_tree)
+
+        assert index.match("ben rob")[0] == (1.0, "ben robertson")
+        assert index.match("ben robertsin")[0][1] == "ben robertson"
+        assert index.match("brook robrtson")[0][1] == "brooke robertson"
+        assert index.match("sahin")[0][1] == "şahin ayhan"
+        assert index.match("zzz") == []
+        assert index.member_ids("ben robertson") == [1, 6]
+
+    def test_edits_update_the_index(self, family_tree):
+        """Test that adds, renames and removals are followed"""
+        index = family_tree.trigram_index
+
+        family_tree.update_member(7, name="Sahin Aydin")
+        family_tree.remove_member(1)
+        family_tree.add_member(id=8, name="Nina Caliente")
+
+        assert index.match("aydin")[0][1] == "sahin aydin"
+        assert "şahin ayhan" not in index.names
+        assert index.member_ids("ben robertson") == [6]
+        assert index.match("nina cal")[0][1] == "nina caliente"
+
+        family_tree.remove_member(8)
+        assert index.match("nina") == []
+        assert not any("nina caliente" in keys for keys in index.postings.values())
+
+
+class TestSuggestParents:
+    def test_filters_by_gender(self, family_tree):
+        """Test that fathers are not female and mothers are not male"""
+        assert family_tree.suggest_parents("b robertson", "father") == [
+            "Ben Robertson",
+            "Bennett Robertson",
+        ]
+        assert family_tree.suggest_parents("b robertson", "mother") == [
+            "Brooke Robertson",
+            "Bennett Robertson",
+            "Roberta Robertson",
+        ]
+
+    def test_filters_by_age(self, family_tree):
+        """Test that parents are adults at least as old as the child"""
+        assert "Bella Robertson" not in family_tree.suggest_parents("bella", "mother")
+        assert family_tree.suggest_parents("b robertson", "father", "Elder") == [
+            "Ben Robertson"
+        ]
+        assert family_tree.suggest_parents("b robertson", "father", "Adult") == [
+            "Ben Robertson"
+        ]
+
+    def test_excludes_the_child(self, family_tree):
+        """Test that a member is not suggested as their own parent"""
+        # Another member named Ben Robertson can still be the father
+        suggestions = family_tree.suggest_parents("ben robertson", "father", exclude=1)
+        assert suggestions[0] == "Ben Robertson"
+        assert family_tree.suggest_parents("bennett", "father", exclude=4) == []
@@ -0,0 +1,28 @@
+import locale
+import unicodedata
+
+
+def fold(text):
+    """Case-fold text and strip accents, so "Şahin" compares as "sahin"."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def get_collation_key():
+    """
+    Get a sort key function following the current collation locale.
+
+    When a collation locale is set (for example with
+    ``locale.setlocale(locale.LC_COLLATE, "")``), keys come from
+    locale.strxfrm(), so names sort the way that language expects. Under
+    the default C locale, which only compares code points, accents are
+    folded away first so accented names sort next to unaccented ones, with
+    the exact text breaking ties.
+
+    :return: Function turning a string into a sort key
+    """
+    if locale.setlocale(locale.LC_COLLATE) in ("C", "POSIX"):
+        return lambda text: (fold(text), text.casefold())
+    return lambda text: (locale.strxfrm(text.casefold()), text.casefold())
@@ -0,0 +1,186 @@
+from bisect import bisect_left, insort
+from itertools import chain
+
+
+class SortedList:
+    """
+    List kept in sorted order with cheap insertion, removal and indexing.
+
+    Values are stored in buckets of at most ``2 * load`` values, with the
+    largest value of each bucket kept for binary search and the bucket
+    sizes kept in a Fenwick tree. Adding or removing a value is a binary
+    search, an insertion into one small bucket and an O(log N) tree
+    update; finding the value at a position or the position of a value is
+    O(log N) as well. Buckets are only split or dropped every ``load``
+    changes or so, which rebuilds the tree.
+    """
+
+    def __init__(self, values=(), load=512):
+        """
+        :param values: Initial values, in any order
+        :param load: Typical bucket size
+        """
+        self.load = load
+        values = sorted(values)
+        self._buckets = [values[i : i + load] for i in range(0, len(values), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(values)
+        self._rebuild_tree()
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._buckets)
+
+    def __contains__(self, value):
+        b = bisect_left(self._maxes, value)
+        if b == len(self._maxes):
+            return False
+        bucket = self._buckets[b]
+        i = bisect_left(bucket, value)
+        return i < len(bucket) and bucket[i] == value
+
+    def __getitem__(self, index):
+        """
+        Get the value at a position, or a list of values for a slice.
+
+        Slices are read bucket by bucket from the first position, so
+        reading a page of rows costs O(log N) plus the page length.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            values = []
+            if start >= stop:
+                return values
+            b, i = self._locate(start)
+            while len(values) < stop - start:
+                bucket = self._buckets[b]
+                values.extend(bucket[i : i + stop - start - len(values)])
+                b, i = b + 1, 0
+            return values
+
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SortedList index out of range")
+        b, i = self._locate(index)
+        return self._buckets[b][i]
+
+    def add(self, value):
+        """
+        Insert a value in sorted position.
+
+        :return: Position the value was inserted at
+        """
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+            self._len = 1
+            self._rebuild_tree()
+            return 0
+
+        b = bisect_left(self._maxes, value)
+        if b == len(self._maxes):
+            b -= 1
+        bucket = self._buckets[b]
+        insort(bucket, value)
+        self._maxes[b] = bucket[-1]
+        self._len += 1
+        position = self._prefix(b) + bisect_left(bucket, value)
+
+        if len(bucket) > 2 * self.load:
+            half = len(bucket) // 2
+            self._buckets[b : b + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[b : b + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(b, 1)
+        return position
+
+    def remove(self, value):
+        """
+        Remove a value.
+
+        :return: Position the value was at
+        :raises ValueError: If the value is not in the list
+        """
+        b, i = self._find(value)
+        position = self._prefix(b) + i
+        bucket = self._buckets[b]
+        del bucket[i]
+        self._len -= 1
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._tree_add(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._rebuild_tree()
+        return position
+
+    def index(self, value):
+        """
+        Get the position of a value.
+
+        :raises ValueError: If the value is not in the list
+        """
+        b, i = self._find(value)
+        return self._prefix(b) + i
+
+    def bisect_left(self, value):
+        """
+        Get the position a value would be inserted at, before equal values.
+        """
+        b = bisect_left(self._maxes, value)
+        if b == len(self._maxes):
+            return self._len
+        return self._prefix(b) + bisect_left(self._buckets[b], value)
+
+    def _find(self, value):
+        """Return the bucket and offset of a value, or raise ValueError."""
+        b = bisect_left(self._maxes, value)
+        if b < len(self._maxes):
+            bucket = self._buckets[b]
+            i = bisect_left(bucket, value)
+            if i < len(bucket) and bucket[i] == value:
+                return b, i
+        raise ValueError(f"{value!r} is not in the list")
+
+    def _rebuild_tree(self):
+        """Rebuild the Fenwick tree of bucket sizes in O(number of buckets)."""
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, b, delta):
+        """Change the size recorded for bucket ``b``."""
+        i = b + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, b):
+        """Return the number of values in the buckets before bucket ``b``."""
+        total = 0
+        i = b
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index):
+        """Return the bucket and offset of the value at a position."""
+        b = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if b + step < len(self._tree) and self._tree[b + step] <= index:
+                b += step
+                index -= self._tree[b]
+            step >>= 1
+        return b, index
@@ -12,8 +12,5 @@ def validate_parent(parent_name, family_tree):
     if not parent_name:  # Empty parent field is valid
         return True
 
-    # Check if parent exists in members list
-    return any(
-        member.get("name", "").lower() == parent_name.lower()
-        for member in family_tree.members.values()
-    )
+    # Check if parent exists using the tree's case-insensitive name index
+    return family_tree.find_member(parent_name) is not None